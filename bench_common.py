@@ -0,0 +1,99 @@
+"""
+벤치마크 공용 유틸리티
+
+- 퍼센타일 계산
+- 결과 JSON 메타데이터 (커밋, 파이썬 버전 등)
+- 기준(baseline) 결과와의 비교
+"""
+
+import json
+import math
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank 퍼센타일 (값이 없으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+def latency_summary(values_ms: List[float]) -> Dict[str, Optional[float]]:
+    """지연 시간 요약 통계 (ms)"""
+    def _round(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        "count": len(values_ms),
+        "mean": _round(sum(values_ms) / len(values_ms)) if values_ms else None,
+        "p50": _round(percentile(values_ms, 50)),
+        "p95": _round(percentile(values_ms, 95)),
+        "p99": _round(percentile(values_ms, 99)),
+        "max": _round(max(values_ms)) if values_ms else None,
+    }
+
+def git_commit() -> Optional[str]:
+    """현재 git 커밋 해시 (git이 없으면 None)"""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent, capture_output=True, text=True, timeout=5
+        )
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_metadata(**settings) -> dict:
+    """결과 비교를 위한 실행 환경 메타데이터"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": settings,
+    }
+
+def save_results(path: str, results: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Results saved to: {path}")
+
+def load_results(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _lookup(data: dict, dotted_key: str):
+    for key in dotted_key.split("."):
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+def compare_metrics(current: dict, baseline: dict, metrics: Iterable[tuple],
+                    threshold_pct: float) -> List[str]:
+    """
+    기준 결과와 비교하여 표를 출력하고 회귀(regression)된 지표 목록을 반환
+
+    metrics: (dotted_key, higher_is_better) 튜플 목록
+    """
+    regressions = []
+    print(f"\n📊 Comparison against baseline (commit {baseline.get('meta', {}).get('commit')})")
+    print(f"{'metric':<40} {'baseline':>12} {'current':>12} {'delta':>9}")
+    print("-" * 76)
+    for key, higher_is_better in metrics:
+        old, new = _lookup(baseline, key), _lookup(current, key)
+        if old is None or new is None:
+            continue
+        delta_pct = ((new - old) / old * 100) if old else 0.0
+        worse = -delta_pct if higher_is_better else delta_pct
+        marker = ""
+        if worse > threshold_pct:
+            marker = " ⚠️"
+            regressions.append(key)
+        print(f"{key:<40} {old:>12.2f} {new:>12.2f} {delta_pct:>+8.1f}%{marker}")
+    return regressions
@@ -0,0 +1,81 @@
+"""
+합성 명함 코퍼스 생성기 (벤치마크/정확도 비교용)
+
+시드 기반으로 재현 가능한 명함 데이터, OCR 텍스트, Pillow 이미지를 생성합니다.
+이미지 렌더링은 test_ocr_url.create_test_image와 같은 방식을 따릅니다.
+"""
+
+import io
+import random
+from typing import Dict, List
+
+COMPANIES = ["TechCorp Inc.", "주식회사 코리아", "(주)한빛소프트", "Blue Ocean Ltd.", "㈜미래에너지",
+             "Nova Systems LLC", "서울데이터 주식회사", "Greenfield Co."]
+POSITIONS = ["Senior Software Engineer", "대표이사", "개발팀 팀장", "Marketing Manager", "영업부 과장",
+             "CTO", "Product Designer", "연구소장"]
+FIRST_NAMES = ["John", "Emily", "Michael", "Sarah", "David", "Grace"]
+LAST_NAMES = ["Smith", "Clark", "Lee", "Park", "Johnson", "Kim"]
+KOREAN_NAMES = ["김철수", "이영희", "박민준", "최서연", "정도윤", "강지우"]
+DOMAINS = ["techcorp.com", "korea.com", "hanbit.co.kr", "blueocean.io", "nova.dev", "gf.co"]
+
+def generate_cards(count: int, seed: int = 42) -> List[Dict[str, str]]:
+    """재현 가능한 합성 명함 데이터 목록 생성"""
+    rng = random.Random(seed)
+    cards = []
+    for i in range(count):
+        if rng.random() < 0.5:
+            name = rng.choice(KOREAN_NAMES)
+            local = f"user{i}"
+        else:
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            name = f"{first} {last}"
+            local = f"{first}.{last}".lower()
+        if rng.random() < 0.6:
+            phone = f"010-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+        else:
+            phone = f"+1 (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}"
+        cards.append({
+            "company": rng.choice(COMPANIES),
+            "position": rng.choice(POSITIONS),
+            "name": name,
+            "phone": phone,
+            "email": f"{local}@{rng.choice(DOMAINS)}",
+        })
+    return cards
+
+def card_to_text(card: Dict[str, str]) -> str:
+    """명함 데이터를 OCR 결과와 비슷한 여러 줄 텍스트로 변환"""
+    return "\n".join([card["company"], card["name"], card["position"], card["email"], card["phone"]])
+
+def render_card_image(card: Dict[str, str], width: int = 600, height: int = 350, fmt: str = "PNG") -> bytes:
+    """명함 데이터를 이미지로 렌더링"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    img = Image.new('RGB', (width, height), color='white')
+    draw = ImageDraw.Draw(img)
+
+    try:
+        font_large = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 36)
+        font_medium = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 24)
+        font_small = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 18)
+    except OSError:
+        font_large = ImageFont.load_default()
+        font_medium = ImageFont.load_default()
+        font_small = ImageFont.load_default()
+
+    y_offset = 40
+    draw.text((50, y_offset), card["company"], fill='black', font=font_large)
+    y_offset += 60
+    draw.text((50, y_offset), card["name"], fill='black', font=font_medium)
+    y_offset += 40
+    draw.text((50, y_offset), card["position"], fill='gray', font=font_small)
+    y_offset += 40
+    draw.text((50, y_offset), card["email"], fill='black', font=font_small)
+    y_offset += 30
+    draw.text((50, y_offset), card["phone"], fill='black', font=font_small)
+
+    draw.rectangle([10, 10, width - 10, height - 10], outline='gray', width=2)
+
+    img_bytes = io.BytesIO()
+    img.save(img_bytes, format=fmt)
+    return img_bytes.getvalue()
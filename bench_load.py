@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+부하 테스트 / 벤치마크 하네스
+
+로컬 Mistral 대역 서버(fake_mistral.py)를 띄우고, 대상 FastAPI 서버를 그 대역으로 향하게 한 뒤
+지정한 동시성으로 요청을 보내 처리량, p50/p95/p99 지연 시간, 메모리 최고치(high-water mark),
+이벤트 루프 블로킹(/health 응답 지연)을 측정합니다. 실제 Mistral API 키가 필요 없습니다.
+
+Usage:
+    python bench_load.py --target main --concurrency 16 --requests 500
+    python bench_load.py --target regex --output bench_regex.json
+    python bench_load.py --target main --compare bench_baseline.json --fail-threshold 10
+
+결과 JSON에는 커밋 해시와 설정이 함께 기록되므로 커밋 간 비교가 가능합니다.
+모든 요청이 같은 이미지를 보내므로, 대상 서버의 동시 요청 합류(COALESCE_INFLIGHT)와
+근접 중복 이미지 처리(DEDUP_MODE)는 끄고 실행합니다 (켜면 업스트림 호출 없이 응답해 결과가 왜곡됨).
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+
+from bench_common import compare_metrics, latency_summary, load_results, run_metadata, save_results
+
+BASE_DIR = Path(__file__).parent
+
+# 같은 이미지 반복 요청이 캐시/합류로 처리되지 않도록 대상 서버에 주는 환경 변수
+APP_ENV = {"COALESCE_INFLIGHT": "0", "DEDUP_MODE": "off"}
+
+# 대상 서버: (uvicorn app 경로, 업로드 엔드포인트)
+TARGETS = {
+    "main": ("main:app", "/ocr/business-card"),
+    "regex": ("main_regex:app", "/ocr/business-card"),
+    "ocr-only": ("main_ocr_only:app", "/ocr/extract-text"),
+    "vision-only": ("main_vision_only:app", "/ocr/vision-extract"),
+}
+
+# --compare 시 비교할 지표 (dotted key, 높을수록 좋은지 여부)
+COMPARE_METRICS = [
+    ("results.throughput_rps", True),
+    ("results.latency_ms.p50", False),
+    ("results.latency_ms.p95", False),
+    ("results.latency_ms.p99", False),
+    ("results.memory_hwm_mb", False),
+    ("results.loop_probe_ms.p99", False),
+    ("results.loop_probe_ms.max", False),
+]
+
+def start_process(args: List[str], env: Optional[dict] = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args], cwd=BASE_DIR, env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+def wait_for_health(url: str, timeout: float = 30.0):
+    """서버가 /health에 응답할 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not become healthy: {url}")
+
+def read_memory_hwm_mb(pid: int) -> Optional[float]:
+    """프로세스의 메모리 최고치 (VmHWM, Linux 전용)"""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 2)
+    except OSError:
+        pass
+    return None
+
+def load_image(path: Optional[str]) -> tuple:
+    """벤치마크용 이미지 (파일이 없으면 합성 명함 이미지 생성)"""
+    if path:
+        return Path(path).name, Path(path).read_bytes()
+    from test_ocr_url import create_test_image
+    return "bench_card.png", create_test_image()
+
+async def run_load(base_url: str, endpoint: str, image: tuple, concurrency: int,
+                   total_requests: int, probe_interval: float) -> dict:
+    """지정 동시성으로 부하를 발생시키고 결과 수집"""
+    filename, image_bytes = image
+    content_type = "image/png" if filename.lower().endswith(".png") else "image/jpeg"
+    latencies_ms: List[float] = []
+    probe_ms: List[float] = []
+    statuses: Counter = Counter()
+    next_index = 0
+    done = asyncio.Event()
+
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+
+        async def worker():
+            nonlocal next_index
+            while next_index < total_requests:
+                next_index += 1
+                start = time.perf_counter()
+                try:
+                    response = await client.post(endpoint, files={"file": (filename, image_bytes, content_type)})
+                    statuses[str(response.status_code)] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies_ms.append((time.perf_counter() - start) * 1000)
+
+        async def loop_probe():
+            # 서버 이벤트 루프가 막히면 /health 응답이 늦어짐
+            while not done.is_set():
+                start = time.perf_counter()
+                try:
+                    await client.get("/health")
+                    probe_ms.append((time.perf_counter() - start) * 1000)
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(probe_interval)
+
+        probe_task = asyncio.create_task(loop_probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total_requests / elapsed, 2),
+        "latency_ms": latency_summary(latencies_ms),
+        "status_counts": dict(statuses),
+        "loop_probe_ms": latency_summary(probe_ms),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test against a local Mistral stand-in")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="main")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10, help="측정 전 워밍업 요청 수")
+    parser.add_argument("--image", help="업로드할 이미지 (기본: 합성 명함 이미지)")
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--ocr-latency", default="lognormal:800:0.3")
+    parser.add_argument("--chat-latency", default="lognormal:500:0.3")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--max-inflight", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="이벤트 루프 프로브 간격 (초)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON")
+    parser.add_argument("--fail-threshold", type=float, default=None,
+                        help="기준 대비 악화율(%%)이 이 값을 넘으면 exit code 1")
+    args = parser.parse_args()
+
+    app_path, endpoint = TARGETS[args.target]
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+
+    fake_args = [
+        "fake_mistral.py", "--port", str(args.fake_port),
+        "--ocr-latency", args.ocr_latency, "--chat-latency", args.chat_latency,
+        "--error-rate", str(args.error_rate), "--rate-429", str(args.rate_429),
+        "--seed", str(args.seed),
+    ]
+    if args.max_inflight is not None:
+        fake_args += ["--max-inflight", str(args.max_inflight)]
+
+    print(f"🚀 Starting fake Mistral on {fake_url}")
+    fake_proc = start_process(fake_args)
+    app_proc = None
+    try:
+        wait_for_health(fake_url)
+        print(f"🚀 Starting {app_path} on {app_url}")
+        app_proc = start_process(
+            ["-m", "uvicorn", app_path, "--port", str(args.app_port), "--log-level", "warning"],
+            env={**APP_ENV, "MISTRAL_SERVER_URL": fake_url, "MISTRAL_API_KEY": os.getenv("MISTRAL_API_KEY", "fake")},
+        )
+        wait_for_health(app_url)
+
+        image = load_image(args.image)
+        if args.warmup:
+            asyncio.run(run_load(app_url, endpoint, image, min(args.concurrency, args.warmup),
+                                 args.warmup, args.probe_interval))
+
+        print(f"🔥 {args.requests} requests @ concurrency {args.concurrency}...")
+        results = asyncio.run(run_load(app_url, endpoint, image, args.concurrency,
+                                       args.requests, args.probe_interval))
+        results["memory_hwm_mb"] = read_memory_hwm_mb(app_proc.pid)
+        results["upstream_stats"] = httpx.get(f"{fake_url}/__stats").json()
+    finally:
+        for proc in (app_proc, fake_proc):
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=10)
+
+    report = {
+        "meta": run_metadata(
+            target=args.target, concurrency=args.concurrency, requests=args.requests,
+            ocr_latency=args.ocr_latency, chat_latency=args.chat_latency,
+            error_rate=args.error_rate, rate_429=args.rate_429,
+            max_inflight=args.max_inflight, seed=args.seed, image=args.image, app_env=APP_ENV,
+        ),
+        "results": results,
+    }
+
+    latency = results["latency_ms"]
+    print("\n" + "=" * 50)
+    print(f"📈 Throughput: {results['throughput_rps']} req/s ({results['elapsed_s']}s)")
+    print(f"⏱️  Latency p50/p95/p99: {latency['p50']} / {latency['p95']} / {latency['p99']} ms")
+    print(f"🧠 Memory high-water mark: {results['memory_hwm_mb']} MB")
+    print(f"🔁 Loop probe p99/max: {results['loop_probe_ms']['p99']} / {results['loop_probe_ms']['max']} ms")
+    print(f"📋 Status counts: {results['status_counts']}")
+    print("=" * 50)
+
+    if args.output:
+        save_results(args.output, report)
+
+    if args.compare:
+        regressions = compare_metrics(report, load_results(args.compare), COMPARE_METRICS,
+                                      args.fail_threshold if args.fail_threshold is not None else float("inf"))
+        if args.fail_threshold is not None and regressions:
+            print(f"\n❌ Regressions beyond {args.fail_threshold}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
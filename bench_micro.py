@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+오프라인 마이크로 벤치마크 - 요청마다 실행되는 로컬 CPU 경로 측정
+
+측정 대상:
+    encode_image, build_extraction_prompt, compact_ocr_text, json.loads(chat 출력), BusinessCardInfo 검증,
+    extract_info_from_text, ApplicationLogger.log_* (직렬화 + 파일 sink),
+    save_response_file, API 응답 본문 직렬화 (SERIALIZER 환경 변수로 백엔드 비교)
+
+각 경로의 ops/sec과 1회 호출당 메모리 할당 최고치(tracemalloc)를 보고하고,
+저장된 기준 결과와 비교하여 회귀를 표시합니다. 네트워크나 API 키가 필요 없습니다.
+
+Usage:
+    python bench_micro.py
+    python bench_micro.py --output bench_micro_baseline.json
+    python bench_micro.py --compare bench_micro_baseline.json --fail-threshold 20
+    python bench_micro.py --only encode_image,extract_info_from_text
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import cycle
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from bench_common import compare_metrics, load_results, run_metadata, save_results
+from bench_corpus import card_to_text, generate_cards, render_card_image
+from serialization import get_serializer
+
+def measure(func: Callable[[], object], min_time: float, repeat: int) -> Dict[str, float]:
+    """ops/sec (best of repeat)과 호출당 할당 최고치 측정"""
+    # 워밍업 겸 반복 횟수 보정
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10 or iterations >= 1_000_000:
+            break
+        iterations *= 2
+    per_op = max(elapsed / iterations, 1e-9)
+    iterations = max(int(min_time / repeat / per_op), 1)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        best = min(best, (time.perf_counter() - start) / iterations)
+
+    # 할당 측정은 별도로 (tracemalloc 오버헤드가 타이밍에 섞이지 않도록)
+    samples = min(iterations, 50)
+    tracemalloc.start()
+    peak_total = 0
+    for _ in range(samples):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - baseline
+    tracemalloc.stop()
+
+    return {
+        "ops_per_sec": round(1 / best, 2),
+        "us_per_op": round(best * 1e6, 3),
+        "peak_alloc_bytes": round(peak_total / samples),
+        "iterations": iterations,
+    }
+
+def build_benchmarks(corpus_size: int, seed: int, workdir: Path) -> Dict[str, Callable[[], object]]:
+    """벤치마크 대상 경로별 호출 함수 구성"""
+    from config import set_config
+    from extraction import BusinessCardInfo, build_extraction_prompt, encode_image, extract_info_from_text
+    from prompt_compaction import compact_ocr_text
+    from structured_output import parse_business_card
+
+    cards = generate_cards(corpus_size, seed)
+    texts = [card_to_text(card) for card in cards]
+    chat_outputs = [json.dumps(card, ensure_ascii=False) for card in cards]
+    images = [render_card_image(card) for card in cards[:min(corpus_size, 16)]]
+
+    # 로그/응답 파일은 임시 디렉토리에 기록
+    config = set_config(env="production")
+    config.LOG_DIR = workdir / "logs"
+    config.RESPONSE_DIR = workdir / "responses"
+    config.LOG_DIR.mkdir(parents=True, exist_ok=True)
+    config.RESPONSE_DIR.mkdir(parents=True, exist_ok=True)
+
+    from loguru import logger
+    from logger import ApplicationLogger
+    app_logger = ApplicationLogger()
+    app_logger.setup()
+    # 콘솔 sink 제거, 파일 sink만 유지
+    logger.remove()
+    app_logger._add_file_logger("api_requests.log", "api_request")
+    app_logger._add_file_logger("app_responses.log", "app_response")
+    app_logger._add_file_logger("errors.log", "error")
+
+    image_iter, text_iter, chat_iter, card_iter = cycle(images), cycle(texts), cycle(chat_outputs), cycle(cards)
+    request_id = app_logger.generate_request_id()
+
+    def run_save_response():
+        text, card = next(text_iter), next(card_iter)
+        return app_logger.save_response_file(request_id, {
+            "request_id": request_id,
+            "timestamp": time.time(),
+            "file_name": "card.png",
+            "ocr_text": text,
+            "extracted_data": card,
+            "processing_time_ms": 1234.56,
+        })
+
+    return {
+        "encode_image": lambda: encode_image(next(image_iter)),
+        "build_extraction_prompt": lambda: build_extraction_prompt(next(text_iter)),
+        "compact_ocr_text": lambda: compact_ocr_text(next(text_iter), config.PROMPT_MAX_TOKENS),
+        "json_loads_chat_output": lambda: json.loads(next(chat_iter)),
+        "business_card_validation": lambda: BusinessCardInfo(**next(card_iter)),
+        "parse_business_card": lambda: parse_business_card(next(chat_iter)),
+        "extract_info_from_text": lambda: extract_info_from_text(next(text_iter)),
+        "log_api_request": lambda: app_logger.log_api_request(
+            request_id=request_id, endpoint="/ocr/business-card", method="POST",
+            client_ip="127.0.0.1", file_name="card.png", file_size_mb=0.12, content_type="image/png"),
+        "log_app_response": lambda: app_logger.log_app_response(
+            request_id=request_id, response_status="success",
+            response_file=f"response_{request_id}.json", processing_time_ms=1234.56, extracted_fields=5),
+        "save_response_file": run_save_response,
+        "serialize_api_response": lambda: get_serializer().dumps_bytes(next(card_iter)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks for hot local code paths")
+    parser.add_argument("--corpus-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-time", type=float, default=0.5, help="경로당 측정 시간 (초)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="측정할 경로 (쉼표 구분)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (기준 결과로 사용)")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON")
+    parser.add_argument("--fail-threshold", type=float, default=20.0,
+                        help="기준 대비 악화율(%%) 임계값 (초과 시 exit code 1)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        benchmarks = build_benchmarks(args.corpus_size, args.seed, Path(tmp))
+        selected: List[str] = args.only.split(",") if args.only else list(benchmarks)
+
+        results = {}
+        print(f"{'path':<28} {'ops/sec':>14} {'us/op':>12} {'peak alloc (B)':>16}")
+        print("-" * 74)
+        for name in selected:
+            stats = measure(benchmarks[name], args.min_time, args.repeat)
+            results[name] = stats
+            print(f"{name:<28} {stats['ops_per_sec']:>14,.0f} {stats['us_per_op']:>12.2f} "
+                  f"{stats['peak_alloc_bytes']:>16,}")
+
+    report = {
+        "meta": run_metadata(corpus_size=args.corpus_size, seed=args.seed,
+                             min_time=args.min_time, repeat=args.repeat,
+                             serializer=get_serializer().backend),
+        "results": results,
+    }
+
+    if args.output:
+        save_results(args.output, report)
+
+    if args.compare:
+        metrics = []
+        for name in results:
+            metrics.append((f"results.{name}.ops_per_sec", True))
+            metrics.append((f"results.{name}.peak_alloc_bytes", False))
+        regressions = compare_metrics(report, load_results(args.compare), metrics, args.fail_threshold)
+        if regressions:
+            print(f"\n❌ Regressions beyond {args.fail_threshold}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+콜드 스타트 벤치마크
+
+새 프로세스에서 측정합니다:
+    - import_ms: `import main` 소요 시간 (임포트 시 생성된 파일/디렉토리도 검사)
+    - health_ms: 프로세스 시작부터 첫 /health 200 응답까지 (LAZY_INIT=0 / LAZY_INIT=1)
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --runs 10 --output bench_startup.json
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from bench_common import run_metadata, save_results
+
+BASE_DIR = Path(__file__).parent
+
+IMPORT_SNIPPET = """
+import time, sys
+start = time.perf_counter()
+import main
+elapsed = (time.perf_counter() - start) * 1000
+heavy = [m for m in ("mistralai", "apscheduler", "httpx") if m in sys.modules]
+print(f"{elapsed:.2f}|{','.join(heavy)}")
+"""
+
+def measure_import(env: dict) -> tuple:
+    """import main 시간과 임포트된 무거운 모듈 목록"""
+    result = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=BASE_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    elapsed, heavy = result.stdout.strip().splitlines()[-1].split("|")
+    return float(elapsed), [m for m in heavy.split(",") if m]
+
+def measure_time_to_health(env: dict, port: int, timeout: float = 60.0) -> float:
+    """프로세스 시작부터 첫 /health 200 응답까지 (ms)"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5).status_code == 200:
+                    return (time.perf_counter() - start) * 1000
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError("Server did not become healthy")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+def snapshot_paths() -> set:
+    return {p for p in ("logs", "responses") if (BASE_DIR / p).exists()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8150)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    base_env = {**os.environ, "MISTRAL_API_KEY": os.getenv("MISTRAL_API_KEY", "fake")}
+
+    before = snapshot_paths()
+    import_runs = [measure_import(base_env) for _ in range(args.runs)]
+    created = sorted(snapshot_paths() - before)
+    import_ms = [elapsed for elapsed, _ in import_runs]
+    heavy_modules = import_runs[-1][1]
+
+    results = {
+        "import_ms": {"median": round(statistics.median(import_ms), 2), "min": round(min(import_ms), 2)},
+        "import_heavy_modules": heavy_modules,
+        "import_created_paths": created,
+    }
+    for lazy in ("0", "1"):
+        env = {**base_env, "LAZY_INIT": lazy}
+        runs = [measure_time_to_health(env, args.port) for _ in range(args.runs)]
+        results[f"health_ms_lazy_{lazy}"] = {"median": round(statistics.median(runs), 2), "min": round(min(runs), 2)}
+
+    print("=" * 50)
+    print(f"📦 import main: {results['import_ms']['median']} ms (median of {args.runs})")
+    print(f"   heavy modules imported: {heavy_modules or 'none'}")
+    print(f"   paths created on import: {created or 'none'}")
+    print(f"🚀 first /health (LAZY_INIT=0): {results['health_ms_lazy_0']['median']} ms")
+    print(f"🚀 first /health (LAZY_INIT=1): {results['health_ms_lazy_1']['median']} ms")
+    print("=" * 50)
+
+    if args.output:
+        save_results(args.output, {"meta": run_metadata(runs=args.runs), "results": results})
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+대량 명함 OCR 비동기 CLI 클라이언트
+
+디렉토리, glob 패턴, URL 목록 파일을 입력으로 받아 keep-alive 커넥션 풀을 재사용하며
+지정한 동시성으로 업로드합니다. 결과는 하나의 JSONL 파일에 기록되며,
+중단된 실행은 같은 출력 파일로 다시 실행하면 완료된 입력을 건너뛰고 이어서 처리합니다.
+
+Usage:
+    python bulk_ocr.py ./cards --output results.jsonl --concurrency 16
+    python bulk_ocr.py "scans/**/*.jpg" --output results.jsonl
+    python bulk_ocr.py --url-list urls.txt --output results.jsonl
+    python bulk_ocr.py ./cards --server http://localhost:8001 --retry-failed
+    python bulk_ocr.py ./cards --api-key $OCR_API_KEY
+
+JSONL 레코드:
+    {"input": "...", "status": "ok", "status_code": 200, "data": {...}, "elapsed_ms": 812.3, "timestamp": "..."}
+"""
+
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Set
+from urllib.parse import urlparse
+
+import httpx
+
+from url_fetcher import extract_google_drive_id, get_google_drive_download_url
+
+CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.bmp': 'image/bmp',
+    '.webp': 'image/webp'
+}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+def iter_inputs(sources: List[str], url_list: Optional[str]) -> Iterator[str]:
+    """입력 목록을 지연 생성 (대용량 디렉토리도 한 번에 메모리에 올리지 않음)"""
+    for source in sources:
+        if source.startswith(('http://', 'https://')):
+            yield source
+        elif os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                for name in sorted(files):
+                    if Path(name).suffix.lower() in CONTENT_TYPES:
+                        yield os.path.join(root, name)
+        elif os.path.isfile(source):
+            yield source
+        else:
+            for path in sorted(glob.iglob(source, recursive=True)):
+                if Path(path).suffix.lower() in CONTENT_TYPES:
+                    yield path
+    if url_list:
+        with open(url_list, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+
+def load_completed(output: Path, retry_failed: bool) -> Set[str]:
+    """이전 실행 결과에서 완료된 입력 목록 로드 (resume)"""
+    completed: Set[str] = set()
+    if not output.exists():
+        return completed
+    with open(output, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 중단 시 잘린 마지막 줄
+            if record.get("status") == "ok" or not retry_failed:
+                completed.add(record["input"])
+    return completed
+
+class Progress:
+    def __init__(self, skipped: int):
+        self.started = time.monotonic()
+        self.skipped = skipped
+        self.ok = 0
+        self.failed = 0
+        self._last_report = 0.0
+
+    def report(self, final: bool = False):
+        # 대량 처리 시 출력 비용을 줄이기 위해 0.5초 간격으로만 갱신
+        now = time.monotonic()
+        if not final and now - self._last_report < 0.5:
+            return
+        self._last_report = now
+        done = self.ok + self.failed
+        rate = done / max(now - self.started, 1e-9)
+        line = f"\r📦 done={done} ok={self.ok} failed={self.failed} skipped={self.skipped} ({rate:.1f} cards/s)"
+        print(line, end="\n" if final else "", flush=True)
+
+async def fetch_url(client: httpx.AsyncClient, url: str) -> tuple:
+    """URL 입력 다운로드 (Google Drive 링크 변환 포함)"""
+    download_url = url
+    if 'drive.google.com' in url:
+        file_id = extract_google_drive_id(url)
+        if not file_id:
+            raise ValueError("Could not extract Google Drive file ID")
+        download_url = get_google_drive_download_url(file_id)
+    response = await client.get(download_url, follow_redirects=True)
+    response.raise_for_status()
+    filename = os.path.basename(urlparse(url).path) or "downloaded_image.jpg"
+    content_type = response.headers.get("content-type", "").split(";")[0]
+    if not content_type.startswith("image/"):
+        content_type = CONTENT_TYPES.get(Path(filename).suffix.lower(), "image/jpeg")
+    return filename, response.content, content_type
+
+async def process_one(client: httpx.AsyncClient, args: argparse.Namespace, item: str) -> dict:
+    start = time.perf_counter()
+    record = {"input": item}
+    server = args.server.rstrip('/')
+    try:
+        if item.startswith(('http://', 'https://')) and not args.client_fetch:
+            # 서버가 직접 URL을 가져오도록 전달 (다운로드/재업로드 없음)
+            request_kwargs = {"url": f"{server}{args.url_endpoint}", "json": {"url": item}}
+        else:
+            if item.startswith(('http://', 'https://')):
+                filename, data, content_type = await fetch_url(client, item)
+            else:
+                path = Path(item)
+                filename, data = path.name, await asyncio.to_thread(path.read_bytes)
+                content_type = CONTENT_TYPES.get(path.suffix.lower(), 'image/jpeg')
+            request_kwargs = {"url": f"{server}{args.endpoint}", "files": {"file": (filename, data, content_type)}}
+        request_kwargs["headers"] = {"X-Priority": args.priority}
+        if "files" in request_kwargs:
+            # 재시도/재실행 시 서버에 저장된 응답을 재사용 (같은 이미지는 같은 키)
+            request_kwargs["headers"]["Idempotency-Key"] = hashlib.sha256(data).hexdigest()
+        if args.api_key:
+            request_kwargs["headers"]["X-API-Key"] = args.api_key
+
+        max_retries = args.max_retries
+        for attempt in range(max_retries + 1):
+            response = await client.post(**request_kwargs)
+            if response.status_code not in RETRY_STATUS or attempt == max_retries:
+                break
+            retry_after = response.headers.get("retry-after")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else min(2 ** attempt, 30)
+            await asyncio.sleep(delay)
+
+        record["status_code"] = response.status_code
+        if response.status_code == 200:
+            record["status"] = "ok"
+            record["data"] = response.json()
+        else:
+            record["status"] = "error"
+            record["error"] = response.text[:500]
+    except (httpx.HTTPError, OSError, ValueError) as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+
+    record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    record["timestamp"] = datetime.now().isoformat()
+    return record
+
+async def run(args: argparse.Namespace) -> int:
+    output = Path(args.output)
+    completed = load_completed(output, args.retry_failed)
+    progress = Progress(skipped=0)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 4)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        with open(output, "a", encoding="utf-8") as out:
+
+            async def worker():
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    record = await process_one(client, args, item)
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    if record["status"] == "ok":
+                        progress.ok += 1
+                    else:
+                        progress.failed += 1
+                    progress.report()
+
+            workers = [asyncio.create_task(worker()) for _ in range(args.concurrency)]
+            for item in iter_inputs(args.inputs, args.url_list):
+                if item in completed:
+                    progress.skipped += 1
+                    continue
+                completed.add(item)  # 같은 실행 안의 중복 입력 방지
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+    progress.report(final=True)
+    print(f"💾 Results appended to: {output}")
+    return 1 if progress.failed else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk business card OCR client")
+    parser.add_argument("inputs", nargs="*", help="디렉토리, glob 패턴, 파일 또는 URL")
+    parser.add_argument("--url-list", help="URL 목록 파일 (한 줄에 하나)")
+    parser.add_argument("--output", default="ocr_results.jsonl")
+    parser.add_argument("--server", default="http://localhost:8000")
+    parser.add_argument("--endpoint", default="/ocr/business-card")
+    parser.add_argument("--url-endpoint", default="/ocr/business-card/url")
+    parser.add_argument("--client-fetch", action="store_true",
+                        help="URL 입력을 클라이언트에서 다운로드 후 업로드 (URL 엔드포인트가 없는 서버용)")
+    parser.add_argument("--api-key", default=os.getenv("OCR_API_KEY"), help="테넌트 API 키 (기본: 환경 변수 OCR_API_KEY)")
+    parser.add_argument("--priority", default="bulk", choices=["bulk", "interactive"],
+                        help="서버 스케줄링 레인 (기본: bulk, 대화형 요청보다 뒤로 밀림)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--max-retries", type=int, default=3, help="429/5xx 재시도 횟수")
+    parser.add_argument("--retry-failed", action="store_true", help="이전 실행에서 실패한 입력도 다시 처리")
+    args = parser.parse_args()
+
+    if not args.inputs and not args.url_list:
+        parser.print_usage()
+        sys.exit(1)
+
+    try:
+        sys.exit(asyncio.run(run(args)))
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted - rerun with the same --output to resume")
+        sys.exit(130)
+
+if __name__ == "__main__":
+    main()
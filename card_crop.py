@@ -0,0 +1,250 @@
+"""
+명함 영역 검출 / 잘라내기 / 기울기 보정 (OCR 전처리)
+
+책상 위 명함 사진처럼 배경이 대부분인 이미지에서 명함 사각형만 잘라 업스트림에 보냅니다.
+
+    1. 축소 그레이스케일(WORK_SIZE)에서 Otsu 임계값으로 이진화, 테두리 쪽 색을 배경으로 판단
+    2. 가장 큰 연결 영역 = 명함 후보 (안쪽 글자 구멍은 채움)
+    3. 2차 모멘트로 기울기 계산 (±45° 이내로만 보정해 세로 명함 방향은 유지)
+    4. 회전한 좌표계의 경계 상자 -> 원본 좌표의 사각형(quadrilateral) -> Image.QUAD 변환으로 잘라내기 + 기울기 보정
+
+사각형을 얼마나 채우는지, 가로세로 비율, 테두리 접촉 여부로 신뢰도(0~1)를 계산하고,
+신뢰도가 낮거나 명함이 이미 프레임 대부분을 차지하면 원본 이미지를 그대로 사용합니다.
+Pillow 연산(축소, 임계값 LUT, 필터, 회전)은 C로 처리되고 Python 루프는 축소 이미지에서만 실행됩니다.
+"""
+
+import io
+import math
+from collections import deque
+from typing import List, Optional, Tuple
+
+WORK_SIZE = 192  # 검출용 축소 이미지 긴 변 (px)
+MIN_COVERAGE = 0.03  # 명함 영역이 프레임에서 차지하는 최소 비율
+MAX_COVERAGE = 0.85  # 이보다 크면 이미 잘린 이미지로 보고 그대로 사용
+ASPECT_RANGE = (1.2, 2.2)  # 명함 가로세로 비율 (표준 1.59~1.75)
+MARGIN = 0.02  # 잘라낼 때 사방에 더하는 여백 비율
+
+class CardRegion:
+    """검출된 명함 영역 (quad: 검출 이미지 좌표 좌상, 좌하, 우하, 우상 / angle: 보정한 기울기, 도)"""
+
+    __slots__ = ("quad", "size", "work_width", "angle", "confidence", "coverage")
+
+    def __init__(self, quad: Tuple[float, ...], size: Tuple[float, float], work_width: int, angle: float,
+                 confidence: float, coverage: float):
+        self.quad = quad
+        self.size = size
+        self.work_width = work_width
+        self.angle = angle
+        self.confidence = confidence
+        self.coverage = coverage
+
+class CropResult:
+    """OCR에 보낼 이미지 (applied=False면 원본 그대로)"""
+
+    __slots__ = ("content", "content_type", "applied", "confidence", "angle", "reason")
+
+    def __init__(self, content: bytes, content_type: str, applied: bool, confidence: Optional[float] = None,
+                 angle: Optional[float] = None, reason: Optional[str] = None):
+        self.content = content
+        self.content_type = content_type
+        self.applied = applied
+        self.confidence = confidence
+        self.angle = angle
+        self.reason = reason
+
+    def log_fields(self, original_bytes: int) -> dict:
+        fields = {"applied": self.applied, "bytes_before": original_bytes, "bytes_after": len(self.content)}
+        if self.confidence is not None:
+            fields["confidence"] = self.confidence
+        if self.angle is not None:
+            fields["angle"] = self.angle
+        if self.reason:
+            fields["reason"] = self.reason
+        return fields
+
+def _otsu_threshold(histogram: List[int]) -> int:
+    total = sum(histogram)
+    weighted_total = sum(i * count for i, count in enumerate(histogram))
+    background = weighted_background = 0
+    best, threshold = -1.0, 127
+    for i, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        weighted_background += i * count
+        mean_bg = weighted_background / background
+        mean_fg = (weighted_total - weighted_background) / foreground
+        between = background * foreground * (mean_bg - mean_fg) ** 2
+        if between > best:
+            best, threshold = between, i
+    return threshold
+
+def _foreground_mask(gray):
+    """Otsu 이진화 후 테두리 다수 색을 배경(0)으로 맞춘 마스크"""
+    from PIL import ImageFilter, ImageOps
+    threshold = _otsu_threshold(gray.histogram())
+    mask = gray.point(lambda v: 255 if v > threshold else 0)
+    width, height = mask.size
+    border = 0
+    for box in ((0, 0, width, 1), (0, height - 1, width, height), (0, 0, 1, height), (width - 1, 0, width, height)):
+        border += mask.crop(box).histogram()[255] / max(1, (box[2] - box[0]) * (box[3] - box[1]))
+    if border > 2:  # 네 변 평균 절반 이상이 밝으면 어두운 명함 / 밝은 배경
+        mask = ImageOps.invert(mask)
+    # 작은 잡음 제거 (opening)
+    return mask.filter(ImageFilter.MinFilter(3)).filter(ImageFilter.MaxFilter(3))
+
+def _largest_component(data: bytes, width: int, height: int) -> Tuple[bytearray, bool]:
+    """4-연결 최대 영역 마스크 (0/1)와 테두리 접촉 여부"""
+    seen = bytearray(width * height)
+    best: List[int] = []
+    for start in range(width * height):
+        if not data[start] or seen[start]:
+            continue
+        seen[start] = 1
+        component = [start]
+        queue = deque(component)
+        while queue:
+            index = queue.popleft()
+            x = index % width
+            for neighbor in (index - width, index + width, index - 1 if x > 0 else -1, index + 1 if x < width - 1 else -1):
+                if 0 <= neighbor < width * height and data[neighbor] and not seen[neighbor]:
+                    seen[neighbor] = 1
+                    component.append(neighbor)
+                    queue.append(neighbor)
+        if len(component) > len(best):
+            best = component
+    region = bytearray(width * height)
+    touches_border = False
+    for index in best:
+        region[index] = 1
+        x, y = index % width, index // width
+        if x == 0 or y == 0 or x == width - 1 or y == height - 1:
+            touches_border = True
+    return region, touches_border
+
+def _fill_holes(region: bytearray, width: int, height: int) -> bytearray:
+    """바깥에서 닿지 않는 빈 칸(명함 안쪽 글자 등)을 영역에 포함"""
+    outside = bytearray(width * height)
+    queue = deque()
+    for x in range(width):
+        queue.extend((x, (height - 1) * width + x))
+    for y in range(height):
+        queue.extend((y * width, y * width + width - 1))
+    while queue:
+        index = queue.popleft()
+        if outside[index] or region[index]:
+            continue
+        outside[index] = 1
+        x = index % width
+        if index >= width:
+            queue.append(index - width)
+        if index < (height - 1) * width:
+            queue.append(index + width)
+        if x > 0:
+            queue.append(index - 1)
+        if x < width - 1:
+            queue.append(index + 1)
+    return bytearray(0 if o else 1 for o in outside)
+
+def _principal_angle(region: bytearray, width: int) -> float:
+    """2차 모멘트 주축 각도 (도, 이미지 좌표계 시계 방향 양수)"""
+    count = sx = sy = sxx = syy = sxy = 0
+    for index, inside in enumerate(region):
+        if inside:
+            x, y = index % width, index // width
+            count += 1
+            sx += x
+            sy += y
+            sxx += x * x
+            syy += y * y
+            sxy += x * y
+    mx, my = sx / count, sy / count
+    mu20, mu02, mu11 = sxx / count - mx * mx, syy / count - my * my, sxy / count - mx * my
+    return math.degrees(0.5 * math.atan2(2 * mu11, mu20 - mu02))
+
+def detect_card(image) -> Optional[CardRegion]:
+    """명함 사각형 검출 (좌표는 WORK_SIZE로 축소한 이미지 기준, 검출할 영역이 없으면 None)"""
+    from PIL import Image, ImageFilter
+    gray = image.convert("L")
+    gray.thumbnail((WORK_SIZE, WORK_SIZE))
+    gray = gray.filter(ImageFilter.GaussianBlur(1))
+    width, height = gray.size
+    if width < 16 or height < 16:
+        return None
+    mask = _foreground_mask(gray)
+    region, touches_border = _largest_component(mask.tobytes(), width, height)
+    filled = _fill_holes(region, width, height)
+    area = sum(filled)
+    coverage = area / (width * height)
+    if area < 16:
+        return None
+
+    # 기울기 보정 각도는 가까운 축 기준 ±45° 이내 (세로 명함을 눕히지 않음)
+    angle = _principal_angle(filled, width)
+    angle = (angle + 45) % 90 - 45
+    filled_mask = Image.frombytes("L", (width, height), bytes(v * 255 for v in filled))
+    rotated = filled_mask.rotate(angle, resample=Image.NEAREST, expand=True)
+    box = rotated.getbbox()
+    if box is None:
+        return None
+    x0, y0, x1, y1 = box
+    box_width, box_height = x1 - x0, y1 - y0
+    rectangularity = min(1.0, area / max(1, box_width * box_height))
+    aspect = max(box_width, box_height) / max(1, min(box_width, box_height))
+
+    confidence = rectangularity
+    if touches_border:
+        confidence *= 0.5  # 일부가 프레임 밖이거나 배경과 구분되지 않음
+    if not ASPECT_RANGE[0] <= aspect <= ASPECT_RANGE[1]:
+        confidence *= 0.5
+    if coverage < MIN_COVERAGE:
+        confidence *= 0.5
+
+    # 회전 좌표계의 경계 상자(여백 포함) 꼭짓점을 회전 전 좌표로 되돌림
+    mx, my = box_width * MARGIN, box_height * MARGIN
+    x0, y0, x1, y1 = x0 - mx, y0 - my, x1 + mx, y1 + my
+    theta = math.radians(angle)
+    cos_t, sin_t = math.cos(theta), math.sin(theta)
+    rcx, rcy = rotated.width / 2, rotated.height / 2
+    cx, cy = width / 2, height / 2
+
+    def unrotate(qx: float, qy: float) -> Tuple[float, float]:
+        dx, dy = qx - rcx, qy - rcy
+        return (cx + dx * cos_t - dy * sin_t, cy + dx * sin_t + dy * cos_t)
+
+    quad = (*unrotate(x0, y0), *unrotate(x0, y1), *unrotate(x1, y1), *unrotate(x1, y0))
+    return CardRegion(quad, (x1 - x0, y1 - y0), width, round(angle, 2), round(confidence, 3), round(coverage, 3))
+
+def crop_card(content: bytes, content_type: str, min_confidence: float, max_side: int = 2048) -> CropResult:
+    """명함 영역만 잘라 기울기를 보정한 JPEG (검출 신뢰도가 낮으면 원본)"""
+    from PIL import Image, ImageOps
+    try:
+        # 검출은 축소 디코딩(JPEG draft)으로, 전체 해상도 디코딩은 잘라낼 때만
+        preview = Image.open(io.BytesIO(content))
+        preview.draft("RGB", (WORK_SIZE * 2, WORK_SIZE * 2))
+        region = detect_card(ImageOps.exif_transpose(preview))
+    except Exception as e:
+        return CropResult(content, content_type, False, reason=f"decode failed: {type(e).__name__}")
+    if region is None:
+        return CropResult(content, content_type, False, reason="no region")
+    if region.coverage > MAX_COVERAGE:
+        return CropResult(content, content_type, False, region.confidence, reason="fills frame")
+    if region.confidence < min_confidence:
+        return CropResult(content, content_type, False, region.confidence, reason="low confidence")
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(content)))
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    scale = image.width / region.work_width
+    quad = tuple(v * scale for v in region.quad)
+    width, height = max(1, round(region.size[0] * scale)), max(1, round(region.size[1] * scale))
+    if max(width, height) > max_side:
+        ratio = max_side / max(width, height)
+        width, height = max(1, round(width * ratio)), max(1, round(height * ratio))
+    card = image.transform((width, height), Image.QUAD, quad, resample=Image.BILINEAR)
+    output = io.BytesIO()
+    card.save(output, format="JPEG", quality=90)
+    return CropResult(output.getvalue(), "image/jpeg", True, region.confidence, region.angle)
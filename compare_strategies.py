@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+추출 전략 비교 러너 - 정확도 + 지연 시간 + 비용
+
+라벨이 있는 명함 디렉토리를 모든 전략(서버)에 동시에 보내고,
+전략별 필드 정확도, 지연 시간 퍼센타일, 전송 바이트를 하나의 리포트로 출력합니다.
+
+라벨 형식: 이미지와 같은 이름의 JSON 파일 (예: card_001.png + card_001.json)
+    {"company": "...", "position": "...", "name": "...", "phone": "...", "email": "..."}
+
+Usage:
+    python compare_strategies.py ./cards
+    python compare_strategies.py ./cards --strategies main,regex --accuracy-target 0.9
+    python compare_strategies.py ./cards --strategy hybrid=http://localhost:8004/ocr/business-card,fields
+    python compare_strategies.py --generate 50 ./synthetic_cards   # 합성 라벨 코퍼스 생성
+
+텍스트만 반환하는 전략(ocr-only, vision-only)은 extract_info_from_text 규칙으로 필드를 추출해 채점합니다.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from bench_common import latency_summary, run_metadata, save_results
+from extraction import FIELDS, extract_info_from_text, normalize
+
+IMAGE_TYPES = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png",
+               ".gif": "image/gif", ".bmp": "image/bmp", ".webp": "image/webp"}
+
+# 기본 전략: 이름 -> (URL, 응답 종류, 요청당 Mistral 호출 수)
+DEFAULT_STRATEGIES = {
+    "main": ("http://localhost:8000/ocr/business-card", "fields", 2),
+    "regex": ("http://localhost:8001/ocr/business-card", "fields", 1),
+    "ocr-only": ("http://localhost:8002/ocr/extract-text", "text", 1),
+    "vision-only": ("http://localhost:8003/ocr/vision-extract", "text", 1),
+}
+
+def load_corpus(directory: Path) -> List[dict]:
+    """이미지 + 라벨 JSON 쌍 로드"""
+    corpus = []
+    for image_path in sorted(directory.iterdir()):
+        if image_path.suffix.lower() not in IMAGE_TYPES:
+            continue
+        label_path = image_path.with_suffix(".json")
+        if not label_path.exists():
+            print(f"⚠️  No label for {image_path.name}, skipping")
+            continue
+        with open(label_path, "r", encoding="utf-8") as f:
+            label = json.load(f)
+        corpus.append({"path": image_path, "label": label})
+    return corpus
+
+def generate_corpus(directory: Path, count: int, seed: int):
+    """합성 라벨 코퍼스 생성 (bench_corpus 사용)"""
+    from bench_corpus import generate_cards, render_card_image
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for i, card in enumerate(generate_cards(count, seed)):
+        stem = f"card_{i:04d}"
+        (directory / f"{stem}.png").write_bytes(render_card_image(card))
+        with open(directory / f"{stem}.json", "w", encoding="utf-8") as f:
+            json.dump(card, f, ensure_ascii=False, indent=2)
+    print(f"✅ Generated {count} labelled cards in {directory}")
+
+def parse_strategies(names: Optional[str], extra: List[str]) -> Dict[str, tuple]:
+    strategies = dict(DEFAULT_STRATEGIES)
+    for spec in extra:
+        # name=url[,fields|text[,upstream_calls]]
+        name, rest = spec.split("=", 1)
+        parts = rest.split(",")
+        kind = parts[1] if len(parts) > 1 else "fields"
+        calls = int(parts[2]) if len(parts) > 2 else None
+        strategies[name] = (parts[0], kind, calls)
+    if names:
+        selected = names.split(",")
+        selected += [spec.split("=", 1)[0] for spec in extra if spec.split("=", 1)[0] not in selected]
+        strategies = {name: strategies[name] for name in selected}
+    return strategies
+
+def score(label: dict, predicted: dict) -> Dict[str, bool]:
+    """라벨에 값이 있는 필드만 채점"""
+    return {
+        field: normalize(field, predicted.get(field)) == normalize(field, label.get(field))
+        for field in FIELDS if label.get(field)
+    }
+
+async def run_strategy(client: httpx.AsyncClient, name: str, url: str, kind: str,
+                       corpus: List[dict], concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies_ms: List[float] = []
+    field_hits = {field: 0 for field in FIELDS}
+    field_totals = {field: 0 for field in FIELDS}
+    stats = {"errors": 0, "bytes_sent": 0, "bytes_received": 0}
+
+    async def process(item: dict):
+        image_bytes = item["path"].read_bytes()
+        content_type = IMAGE_TYPES[item["path"].suffix.lower()]
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, files={"file": (item["path"].name, image_bytes, content_type)})
+            except httpx.HTTPError:
+                response = None  # 전송 실패도 빈 예측으로 채점 (정확도에서 빠지지 않도록)
+            else:
+                latencies_ms.append((time.perf_counter() - start) * 1000)
+
+        stats["bytes_sent"] += len(image_bytes)
+        if response is not None:
+            stats["bytes_received"] += len(response.content)
+        if response is None or response.status_code != 200:
+            stats["errors"] += 1
+            predicted = {}
+        else:
+            data = response.json()
+            predicted = data if kind == "fields" else extract_info_from_text(data.get("text", "")).dict()
+
+        for field, hit in score(item["label"], predicted).items():
+            field_totals[field] += 1
+            field_hits[field] += hit
+
+    await asyncio.gather(*(process(item) for item in corpus))
+
+    total_hits, total_fields = sum(field_hits.values()), sum(field_totals.values())
+    return {
+        "url": url,
+        "kind": kind,
+        "requests": len(corpus),
+        "errors": stats["errors"],
+        "field_accuracy": {
+            field: round(field_hits[field] / field_totals[field], 4) if field_totals[field] else None
+            for field in FIELDS
+        },
+        "overall_accuracy": round(total_hits / total_fields, 4) if total_fields else None,
+        "latency_ms": latency_summary(latencies_ms),
+        "bytes_sent_per_card": round(stats["bytes_sent"] / len(corpus)) if corpus else 0,
+        "bytes_received_per_card": round(stats["bytes_received"] / len(corpus)) if corpus else 0,
+    }
+
+async def run_all(strategies: Dict[str, tuple], corpus: List[dict], concurrency: int, timeout: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency * len(strategies))
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        names = list(strategies)
+        results = await asyncio.gather(*(
+            run_strategy(client, name, strategies[name][0], strategies[name][1], corpus, concurrency)
+            for name in names
+        ))
+    report = {}
+    for name, result in zip(names, results):
+        result["upstream_calls_per_card"] = strategies[name][2]
+        report[name] = result
+    return report
+
+def print_report(report: dict, accuracy_target: Optional[float]):
+    print("\n" + "=" * 96)
+    header = f"{'strategy':<14}" + "".join(f"{field:>10}" for field in FIELDS)
+    print(header + f"{'overall':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    print("-" * 96)
+    for name, result in report.items():
+        accuracy = result["field_accuracy"]
+        row = f"{name:<14}" + "".join(
+            f"{accuracy[field]:>10.2%}" if accuracy[field] is not None else f"{'-':>10}" for field in FIELDS
+        )
+        overall = result["overall_accuracy"]
+        row += f"{overall:>10.2%}" if overall is not None else f"{'-':>10}"
+        row += f"{result['latency_ms']['p50'] or 0:>10.0f}{result['latency_ms']['p95'] or 0:>10.0f}{result['errors']:>8}"
+        print(row)
+    print("=" * 96)
+
+    if accuracy_target is None:
+        return
+    # 목표 정확도를 만족하는 전략 중 업스트림 호출 수 -> 전송 바이트 -> p95 순으로 가장 저렴한 전략
+    candidates = [
+        (name, result) for name, result in report.items()
+        if result["overall_accuracy"] is not None and result["overall_accuracy"] >= accuracy_target
+    ]
+    if not candidates:
+        print(f"\n❌ No strategy meets accuracy target {accuracy_target:.0%}")
+        return
+    best_name, best = min(candidates, key=lambda item: (
+        item[1]["upstream_calls_per_card"] if item[1]["upstream_calls_per_card"] is not None else float("inf"),
+        item[1]["bytes_sent_per_card"],
+        item[1]["latency_ms"]["p95"] or float("inf"),
+    ))
+    print(f"\n🏆 Cheapest strategy meeting {accuracy_target:.0%}: {best_name} "
+          f"(accuracy {best['overall_accuracy']:.2%}, p95 {best['latency_ms']['p95']} ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare extraction strategies on a labelled corpus")
+    parser.add_argument("directory", help="라벨이 있는 명함 이미지 디렉토리")
+    parser.add_argument("--strategies", help="사용할 전략 (쉼표 구분, 기본: 전체)")
+    parser.add_argument("--strategy", action="append", default=[],
+                        help="추가 전략: name=url[,fields|text[,upstream_calls]]")
+    parser.add_argument("--concurrency", type=int, default=4, help="전략별 동시 요청 수")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--accuracy-target", type=float, help="목표 정확도 (0~1)")
+    parser.add_argument("--output", default="strategy_comparison.json")
+    parser.add_argument("--generate", type=int, metavar="N", help="합성 라벨 코퍼스 N개 생성 후 종료")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    if args.generate:
+        generate_corpus(directory, args.generate, args.seed)
+        return
+
+    if not directory.is_dir():
+        print(f"❌ Directory not found: {directory}")
+        sys.exit(1)
+
+    corpus = load_corpus(directory)
+    if not corpus:
+        print(f"❌ No labelled images in {directory}")
+        sys.exit(1)
+
+    strategies = parse_strategies(args.strategies, args.strategy)
+    print(f"🖼️ {len(corpus)} labelled cards x {len(strategies)} strategies: {', '.join(strategies)}")
+
+    report = asyncio.run(run_all(strategies, corpus, args.concurrency, args.timeout))
+    print_report(report, args.accuracy_target)
+    save_results(args.output, {
+        "meta": run_metadata(directory=str(directory), cards=len(corpus), concurrency=args.concurrency,
+                             accuracy_target=args.accuracy_target),
+        "results": report,
+    })
+
+if __name__ == "__main__":
+    main()
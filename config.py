@@ -1,8 +1,12 @@
 from enum import Enum
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
+from typing import Tuple
 import os
 
+# 용량 예산 때문에 현재 기간을 나눈 경우 기록 중인 하위 구간 이름을 담는 파일 (LOG_DIR, RESPONSE_DIR 각각)
+ACTIVE_PERIOD_FILE = ".active_period"
+
 class Environment(Enum):
     DEV = "dev"
     PRODUCTION = "production"
@@ -12,6 +16,21 @@ class RotationPeriod(Enum):
     WEEKLY = "weekly"
     MONTHLY = "monthly"
 
+def split_period_name(name: str) -> Tuple[str, int]:
+    """기간 디렉토리 이름을 (기간, 하위 구간 번호)로 분리 ("2026-10-19.2" -> ("2026-10-19", 2), 나누지 않은 기간은 0)"""
+    period, sep, segment = name.rpartition(".")
+    if sep and segment.isdigit():
+        return period, int(segment)
+    return name, 0
+
+def parse_bytes(value: str) -> int:
+    """"500MB", "2GB", "1048576" 형식의 크기를 바이트로 변환 (0 = 무제한)"""
+    value = value.strip().upper().rstrip("B")
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value or 0)
+
 class Config:
     def __init__(self, env: Environment = Environment.DEV, rotation_period: RotationPeriod = None):
         self.env = env
@@ -30,16 +49,131 @@ class Config:
         # 보관 정책
         self.KEEP_LOG_DAYS = 30 if env == Environment.DEV else 7
         self.KEEP_RESPONSE_DAYS = 30 if env == Environment.DEV else 7
+        # 용량 기반 보관 (0 = 무제한): 기간 디렉토리 합계가 예산을 넘으면 오래된 기간부터 앞당겨 아카이브,
+        # archive/가 예산을 넘으면 오래된 ZIP부터 삭제
+        self.LOG_DIR_MAX_BYTES = parse_bytes(os.getenv("LOG_DIR_MAX_BYTES", "0"))
+        self.RESPONSE_DIR_MAX_BYTES = parse_bytes(os.getenv("RESPONSE_DIR_MAX_BYTES", "0"))
+        self.LOG_ARCHIVE_MAX_BYTES = parse_bytes(os.getenv("LOG_ARCHIVE_MAX_BYTES", "0"))
+        self.RESPONSE_ARCHIVE_MAX_BYTES = parse_bytes(os.getenv("RESPONSE_ARCHIVE_MAX_BYTES", "0"))
+        self.DISK_CHECK_INTERVAL_SECONDS = int(os.getenv("DISK_CHECK_INTERVAL_SECONDS", "60"))
+        
+        # URL 입력 설정
+        self.URL_FETCH_MAX_BYTES = 10 * 1024 * 1024  # 10MB
+        self.URL_FETCH_TIMEOUT = 15.0  # seconds
+        self.URL_FETCH_MAX_CONNECTIONS = 20
+        # 사설/loopback/메타데이터 주소 허용 (로컬 테스트 전용, 운영에서는 SSRF 위험)
+        self.URL_FETCH_ALLOW_PRIVATE = os.getenv("URL_FETCH_ALLOW_PRIVATE", "0").lower() in ("1", "true", "yes")
+        self.URL_PASSTHROUGH = True  # Drive 외 URL은 Mistral OCR에 직접 전달
+        
+        # 프롬프트 설정 (chat 추출 단계에 넣는 OCR 텍스트 토큰 예산)
+        self.PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "1024"))
+        
+        # chat 출력 형식: json_schema (BusinessCardInfo 스키마 제약) | json_object
+        self.STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "json_schema")
+        
+        # 추측 병렬 추출 설정 (/ocr/business-card/speculative)
+        self.SPECULATIVE_MERGE_WINDOW_MS = int(os.getenv("SPECULATIVE_MERGE_WINDOW_MS", "1500"))
+        
+        # 테넌트/스케줄링 설정
+        self.TENANTS_FILE = os.getenv("TENANTS_FILE")  # 미설정 시 인증 없이 기본 테넌트 사용
+        self.UPSTREAM_CONCURRENCY = int(os.getenv("UPSTREAM_CONCURRENCY", "8"))  # 워커당 Mistral 동시 호출 수
+        self.TENANT_MAX_QUEUED = int(os.getenv("TENANT_MAX_QUEUED", "200"))  # 테넌트별 업스트림 대기열 한도
+        # interactive 레인 전용 슬롯 (bulk 레인은 나머지 슬롯만 사용)
+        self.INTERACTIVE_RESERVED_SLOTS = int(os.getenv(
+            "INTERACTIVE_RESERVED_SLOTS", str(max(1, self.UPSTREAM_CONCURRENCY // 4))
+        ))
+        
+        # 처리 중인 동일 이미지 업로드(재전송)는 업스트림 호출을 공유
+        self.COALESCE_INFLIGHT = os.getenv("COALESCE_INFLIGHT", "1").lower() in ("1", "true", "yes")
+        
+        # Idempotency-Key: 저장된 응답 보관 시간, 처리 중인 같은 키를 기다리는 최대 시간,
+        # 처리 중 표시 임대 시간 (요청 최대 처리 시간보다 길어야 하며, 지나면 소유 워커가 죽은 것으로 보고 재처리)
+        self.IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+        self.IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "120"))
+        self.IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "900"))
+        
+        # 근접 중복 이미지 처리 (off | flag: 표시만 | serve: 저장된 결과 반환)
+        # 같은 템플릿의 다른 사람 명함도 저해상도 해시는 가까울 수 있어, serve는 flag 로그로 임계값을 검증한 뒤 사용
+        self.DEDUP_MODE = os.getenv("DEDUP_MODE", "flag")
+        self.DEDUP_HASH_SIZE = int(os.getenv("DEDUP_HASH_SIZE", "16"))  # dHash 한 변 크기 (비트 수 = 제곱)
+        self.DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "12"))  # dHash 해밍 거리 임계값
+        self.DEDUP_MAX_PHASH_DISTANCE = int(os.getenv("DEDUP_MAX_PHASH_DISTANCE", "6"))  # pHash(64비트) 확인 임계값
+        
+        # OCR 백엔드: mistral | local (Tesseract) | auto (요청별 라우팅, ocr_backends.py 참고)
+        self.OCR_BACKEND = os.getenv("OCR_BACKEND", "mistral")
+        self.OCR_FALLBACK_LOCAL = os.getenv("OCR_FALLBACK_LOCAL", "0").lower() in ("1", "true", "yes")  # Mistral 제한/장애 시 로컬 대체
+        self.OCR_LOCAL_WORKERS = int(os.getenv("OCR_LOCAL_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+        self.OCR_LOCAL_LANGUAGES = os.getenv("OCR_LOCAL_LANGUAGES", "kor+eng")
+        self.OCR_LOCAL_MIN_CONFIDENCE = float(os.getenv("OCR_LOCAL_MIN_CONFIDENCE", "0.8"))  # auto: 미만이면 Mistral로 재처리
+        self.OCR_LOCAL_MIN_CONTRAST = float(os.getenv("OCR_LOCAL_MIN_CONTRAST", "60"))  # auto: 그레이스케일 표준편차 기준
+        self.OCR_LOCAL_MAX_PIXELS = int(os.getenv("OCR_LOCAL_MAX_PIXELS", str(4_000_000)))  # auto: 큰 사진은 Mistral
+        self.OCR_LOCAL_QUEUE_THRESHOLD = int(os.getenv("OCR_LOCAL_QUEUE_THRESHOLD", "0"))  # auto: 업스트림 대기 수가 이상이면 로컬 (0 = 미사용)
+
+        # 명함 영역 검출: 배경이 많은 사진은 명함만 잘라 기울기 보정 후 OCR (card_crop.py)
+        self.CARD_CROP = os.getenv("CARD_CROP", "1").lower() in ("1", "true", "yes")
+        self.CARD_CROP_MIN_CONFIDENCE = float(os.getenv("CARD_CROP_MIN_CONFIDENCE", "0.8"))  # 미만이면 원본 사용
+        
+        # 연락처 인덱스: 국가 번호 없는 전화번호에 사용할 기본 국가 번호 (E.164 정규화)
+        self.CONTACT_DEFAULT_COUNTRY_CODE = os.getenv("CONTACT_DEFAULT_COUNTRY_CODE", "82")
         
         # 로깅 설정
         self.LOG_LEVEL = "DEBUG" if env == Environment.DEV else "INFO"
+        self.LOG_CONSOLE_LEVEL = os.getenv("LOG_CONSOLE_LEVEL", "DEBUG" if env == Environment.DEV else "WARNING")
+        # 로그 샘플링: 에러/실패 응답과 느린 요청은 항상, 정상 성공 요청은 LOG_SAMPLE_RATE 비율만 기록
+        self.LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+        self.LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "5000"))
+        # 응답 파일 저장 방식 (느린 요청은 항상 full): full | hash (ocr_text 대신 해시) | ref (파일 없이 response_refs.jsonl에 해시만)
+        self.RESPONSE_STORE = os.getenv("RESPONSE_STORE", "full")
         self.LOG_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
         
-        # 디렉토리 생성
+        # JSON 직렬화: auto(orjson > msgspec > json) | orjson | msgspec | json
+        self.SERIALIZER = os.getenv("SERIALIZER", "auto")
+        # 응답 파일을 들여쓰기 없이 저장 (production 기본값, dev는 사람이 읽기 쉽게 indent=2)
+        self.COMPACT_JSON = os.getenv(
+            "COMPACT_JSON", "0" if env == Environment.DEV else "1"
+        ).lower() in ("1", "true", "yes")
+        
+        # 이벤트 루프 블로킹 감시: threshold 이상 멈춘 콜백의 스택을 errors.log에 기록 (loop_watchdog.py)
+        self.LOOP_WATCHDOG = os.getenv("LOOP_WATCHDOG", "1").lower() in ("1", "true", "yes")
+        self.LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+        
+        # 관리자 엔드포인트(/admin/*) 인증 키 (X-Admin-Key 헤더, 미설정 시 관리자 엔드포인트 비활성화)
+        self.ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+        self.PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", "60"))
+        
+        # 지연 초기화: 무거운 구성 요소를 lifespan에서 기다리지 않고 백그라운드/첫 사용 시 생성
+        self.LAZY_INIT = os.getenv("LAZY_INIT", "0").lower() in ("1", "true", "yes")
+        
+        self._directories_ready = False
+    
+    def current_period_name(self) -> str:
+        """현재 로테이션 주기의 디렉토리 이름 (로그/응답 기간 디렉토리)"""
+        now = datetime.now()
+        if self.rotation_period == RotationPeriod.DAILY:
+            return now.strftime("%Y-%m-%d")
+        elif self.rotation_period == RotationPeriod.WEEKLY:
+            return now.strftime("%Y-W%U")
+        return now.strftime("%Y-%m")
+    
+    def active_period_name(self, base_dir: Path) -> str:
+        """base_dir에서 지금 기록할 기간 디렉토리 이름 (현재 기간이 나뉘었으면 마지막 하위 구간)"""
+        current = self.current_period_name()
+        try:
+            name = (base_dir / ACTIVE_PERIOD_FILE).read_text(encoding="utf-8").strip()
+        except OSError:
+            return current
+        # 다음 기간으로 넘어가면 이전 기간의 하위 구간 표시는 무시
+        return name if split_period_name(name)[0] == current else current
+    
+    def ensure_directories(self):
+        """디렉토리 생성 (임포트 시가 아닌 첫 사용 시 호출)"""
+        if self._directories_ready:
+            return
         self.LOG_DIR.mkdir(exist_ok=True)
         self.RESPONSE_DIR.mkdir(exist_ok=True)
         (self.LOG_DIR / "archive").mkdir(exist_ok=True)
         (self.RESPONSE_DIR / "archive").mkdir(exist_ok=True)
+        self._directories_ready = True
 
 # Singleton pattern for configuration
 _config = None
@@ -49,7 +183,9 @@ def get_config() -> Config:
     if _config is None:
         env_str = os.getenv("ENVIRONMENT", "dev")
         env = Environment.DEV if env_str == "dev" else Environment.PRODUCTION
-        _config = Config(env=env)
+        rotation_str = os.getenv("ROTATION_PERIOD")
+        rotation = RotationPeriod(rotation_str) if rotation_str else None
+        _config = Config(env=env, rotation_period=rotation)
     return _config
 
 def set_config(env: str = None, rotation: str = None) -> Config:
@@ -0,0 +1,288 @@
+"""
+추출된 명함 정보의 연락처(엔티티) 인덱스
+
+정규화된 키로 연락처를 묶어 "이미 알고 있는 연락처인가?"를 O(1) 딕셔너리 조회로 답합니다.
+    - email: 소문자/공백 제거
+    - phone: E.164 (+821012345678), 국가 번호가 없으면 CONTACT_DEFAULT_COUNTRY_CODE 사용
+    - name + company: 공백/대소문자/법인 표기((주), 주식회사, Inc., Ltd. 등) 정규화
+
+처리 결과는 RESPONSE_DIR/contact_index.jsonl에 추가 기록되고(워커 간 공유), 메모리 인덱스는 새 줄만 읽어 갱신합니다.
+인덱스 파일이 없으면 처음 사용할 때 기존 응답 파일(response_*.json)로 한 번 채웁니다.
+테넌트별로 분리되어 다른 테넌트의 연락처는 조회되지 않습니다.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from loguru import logger
+from config import get_config
+from serialization import get_serializer
+
+MAX_REQUEST_IDS = 20  # 연락처별로 보관하는 최근 요청 ID 수
+BACKFILL_STALE_SECONDS = 600  # 이보다 오래된 backfill 임시 파일은 중단된 작업으로 보고 제거
+
+_COMPANY_MARKERS = re.compile(
+    r"\(주\)|㈜|주식회사|유한회사|\b(inc|corp|corporation|co|ltd|llc|limited|gmbh|plc)\b\.?",
+    re.IGNORECASE
+)
+_PHONE_SPLIT = re.compile(r"[,/;]|\s{2,}")
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    if not email:
+        return None
+    email = email.strip().lower().replace(" ", "")
+    return email if "@" in email else None
+
+def normalize_phone(phone: Optional[str], country_code: str) -> Optional[str]:
+    """전화번호를 E.164 형식으로 변환 (변환할 수 없으면 None)"""
+    if not phone:
+        return None
+    phone = phone.strip().replace("(0)", "")
+    digits = re.sub(r"\D", "", phone)
+    if phone.startswith("+"):
+        e164 = digits
+    elif digits.startswith("00"):
+        e164 = digits[2:]
+    elif digits.startswith("0"):
+        e164 = country_code + digits[1:]  # 국내 번호 (010-..., 02-...)
+    else:
+        e164 = country_code + digits
+    # E.164는 국가 번호 포함 최대 15자리
+    return f"+{e164}" if 8 <= len(e164) <= 15 else None
+
+def normalize_name(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    value = re.sub(r"\s+", "", value).casefold()
+    return value or None
+
+def normalize_company(company: Optional[str]) -> Optional[str]:
+    if not company:
+        return None
+    return normalize_name(_COMPANY_MARKERS.sub(" ", company).strip(" .,"))
+
+def contact_keys(data: dict, country_code: str) -> List[str]:
+    """추출 결과의 정규화 키 목록"""
+    keys = []
+    email = normalize_email(data.get("email"))
+    if email:
+        keys.append(f"email:{email}")
+    for part in _PHONE_SPLIT.split(data.get("phone") or ""):
+        phone = normalize_phone(part, country_code)
+        if phone:
+            keys.append(f"phone:{phone}")
+    name, company = normalize_name(data.get("name")), normalize_company(data.get("company"))
+    if name and company:
+        keys.append(f"name:{name}|{company}")
+    return keys
+
+def should_index(response_data: dict) -> bool:
+    """
+    응답 기록을 연락처 인덱스에 넣을지 (처리 시 record_success와 backfill이 같은 기준 사용)
+
+    single-flight로 합류한 요청(coalesced_with)은 선행 요청과 같은 결과이므로 한 번만 셉니다.
+    """
+    return not response_data.get("coalesced_with")
+
+class ContactIndex:
+    """테넌트별 연락처 엔티티 인덱스 (JSONL 파일에 추가 기록, 워커 간 공유)"""
+
+    def __init__(self):
+        self.config = get_config()
+        self.serializer = get_serializer()
+        self.path = self.config.RESPONSE_DIR / "contact_index.jsonl"
+        self.contacts: Dict[str, dict] = {}  # contact_id -> 연락처
+        self.keys: Dict[str, str] = {}  # "tenant/key" -> contact_id
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def _apply(self, entry: dict):
+        """기록 하나를 인덱스에 반영 (키가 겹치는 연락처는 하나로 병합)"""
+        tenant = entry.get("tenant", "default")
+        data = entry["extracted_data"]
+        keys = [f"{tenant}/{key}" for key in contact_keys(data, self.config.CONTACT_DEFAULT_COUNTRY_CODE)]
+        if not keys:
+            return
+
+        matched = []
+        for key in keys:
+            contact_id = self.keys.get(key)
+            if contact_id is not None and contact_id not in matched:
+                matched.append(contact_id)
+
+        if matched:
+            contact = self.contacts[matched[0]]
+            for other_id in matched[1:]:
+                self._merge(contact, self.contacts.pop(other_id))
+        else:
+            contact = {
+                "contact_id": entry["request_id"],
+                "tenant": tenant,
+                "fields": {},
+                "keys": [],
+                "request_ids": [],
+                "count": 0,
+                "first_seen": entry["timestamp"],
+            }
+            self.contacts[contact["contact_id"]] = contact
+
+        # 최근 결과의 필드가 우선 (비어 있는 필드는 유지)
+        contact["fields"].update({field: value for field, value in data.items() if value})
+        contact["request_ids"] = (contact["request_ids"] + [entry["request_id"]])[-MAX_REQUEST_IDS:]
+        contact["count"] += 1
+        contact["last_seen"] = entry["timestamp"]
+        for key in keys:
+            if key not in contact["keys"]:
+                contact["keys"].append(key)
+            self.keys[key] = contact["contact_id"]
+
+    def _merge(self, contact: dict, other: dict):
+        """새 결과로 연결된 두 연락처 병합"""
+        for field, value in other["fields"].items():
+            contact["fields"].setdefault(field, value)
+        contact["request_ids"] = (other["request_ids"] + contact["request_ids"])[-MAX_REQUEST_IDS:]
+        contact["count"] += other["count"]
+        contact["first_seen"] = min(contact["first_seen"], other["first_seen"])
+        for key in other["keys"]:
+            if key not in contact["keys"]:
+                contact["keys"].append(key)
+            self.keys[key] = contact["contact_id"]
+
+    def _sync(self):
+        """파일에 새로 추가된 기록(다른 워커 포함)을 인덱스에 반영 (lock 안에서 호출)"""
+        if not self.path.exists():
+            self._backfill()
+            if not self.path.exists():
+                return  # 다른 워커가 생성 중 (다음 조회 때 다시 읽음)
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            while True:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # 기록 중인 마지막 줄은 다음에 읽음
+                self._offset = f.tell()
+                try:
+                    self._apply(self.serializer.loads(line))
+                except (ValueError, KeyError):
+                    continue
+
+    def prepare(self):
+        """인덱스 파일이 없으면 응답 파일로 생성 후 메모리 인덱스 로드 (시작 시 호출)"""
+        with self._lock:
+            self._sync()
+
+    def _backfill(self):
+        """
+        인덱스 파일이 없으면 보관 중인 응답 파일로 생성
+
+        여러 워커가 동시에 시작해도 O_EXCL로 임시 파일을 만든 워커 하나만 생성하고,
+        완성된 파일을 link로 배치합니다 (기존 파일을 덮어쓰지 않음).
+        """
+        self.config.ensure_directories()
+        tmp_path = self.path.with_name(self.path.name + ".backfill")
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            try:
+                if time.time() - tmp_path.stat().st_mtime > BACKFILL_STALE_SECONDS:
+                    tmp_path.unlink()  # 중단된 생성 작업, 다음 조회 때 다시 시도
+            except OSError:
+                pass
+            return
+
+        entries = []
+        try:
+            for response_file in sorted(self.config.RESPONSE_DIR.glob("*/response_*.json")):
+                try:
+                    with open(response_file, "rb") as f:
+                        data = self.serializer.loads(f.read())
+                    if not should_index(data):
+                        continue
+                    entries.append((data["request_id"], self._entry_line(
+                        data.get("tenant", "default"), data["request_id"], data["extracted_data"],
+                        data.get("timestamp", response_file.stat().st_mtime)
+                    )))
+                except (OSError, ValueError, KeyError):
+                    continue
+            os.write(fd, b"".join(line for _, line in entries))
+            os.close(fd)
+            fd = None
+            try:
+                os.link(tmp_path, self.path)
+            except FileExistsError:
+                # 생성하는 동안 add()가 파일을 먼저 만들었으면 이미 기록된 요청을 빼고 이어서 추가
+                recorded = self._recorded_request_ids()
+                self._append(b"".join(line for request_id, line in entries if request_id not in recorded))
+        finally:
+            if fd is not None:
+                os.close(fd)
+            tmp_path.unlink(missing_ok=True)
+        logger.info(f"Contact index backfilled from {len(entries)} response files")
+
+    def _recorded_request_ids(self) -> set:
+        request_ids = set()
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    request_ids.add(self.serializer.loads(line)["request_id"])
+                except (ValueError, KeyError):
+                    continue
+        return request_ids
+
+    def _entry_line(self, tenant: str, request_id: str, extracted_data: dict, timestamp: float) -> bytes:
+        entry = {"tenant": tenant, "request_id": request_id, "extracted_data": extracted_data, "timestamp": timestamp}
+        return self.serializer.dumps_bytes(entry) + b"\n"
+
+    def _append(self, data: bytes):
+        # O_APPEND 단일 write로 워커 간 줄 단위 추가가 섞이지 않도록 함
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def add(self, tenant: str, request_id: str, extracted_data: dict):
+        """처리 결과 추가 (인덱스 갱신은 다음 조회 시 파일에서 읽어 반영)"""
+        self.config.ensure_directories()
+        self._append(self._entry_line(tenant, request_id, extracted_data, time.time()))
+
+    def lookup(self, tenant: str, email: Optional[str] = None, phone: Optional[str] = None,
+               name: Optional[str] = None, company: Optional[str] = None) -> dict:
+        """정규화 키로 알려진 연락처 조회"""
+        query = {"email": email, "phone": phone, "name": name, "company": company}
+        keys = contact_keys(query, self.config.CONTACT_DEFAULT_COUNTRY_CODE)
+        with self._lock:
+            self._sync()
+            # 같은 종류의 키가 여러 개일 수 있음 (전화번호 여러 개)
+            matches = [(key.split(":", 1)[0], self.keys.get(f"{tenant}/{key}")) for key in keys]
+            contact_id = next((cid for _, cid in matches if cid is not None), None)
+            contact = None
+            if contact_id is not None:
+                stored = self.contacts[contact_id]
+                contact = {
+                    "contact_id": stored["contact_id"],
+                    "fields": dict(stored["fields"]),
+                    "request_ids": list(stored["request_ids"]),
+                    "count": stored["count"],
+                    "first_seen": stored["first_seen"],
+                    "last_seen": stored["last_seen"],
+                }
+
+        return {
+            "known": contact is not None,
+            "matched_on": list(dict.fromkeys(kind for kind, cid in matches if cid is not None and cid == contact_id)),
+            "normalized_keys": keys,
+            "contact": contact,
+        }
+
+# Singleton pattern for contact index
+_contact_index = None
+
+def get_contact_index() -> ContactIndex:
+    global _contact_index
+    if _contact_index is None:
+        _contact_index = ContactIndex()
+    return _contact_index
@@ -0,0 +1,156 @@
+"""
+명함 정보 추출 공용 구성 요소
+
+FastAPI 앱/Mistral 클라이언트 없이 임포트할 수 있도록 모델, 인코딩, 프롬프트 생성만 포함합니다.
+"""
+
+import base64
+import re
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class BusinessCardInfo(BaseModel):
+    company: Optional[str] = Field(None, description="Company or organization name")
+    position: Optional[str] = Field(None, description="Job title or position")
+    name: Optional[str] = Field(None, description="Person's full name")
+    phone: Optional[str] = Field(None, description="Phone number")
+    email: Optional[str] = Field(None, description="Email address")
+
+FIELDS = list(BusinessCardInfo.model_fields)
+
+def normalize(field: str, value: Optional[str]) -> str:
+    """필드 비교용 정규화"""
+    if not value:
+        return ""
+    if field == "phone":
+        return re.sub(r"\D", "", value)
+    return re.sub(r"\s+", " ", value).strip().lower()
+
+def encode_image(image_bytes: bytes) -> str:
+    """Encode image bytes to base64."""
+    return base64.b64encode(image_bytes).decode('utf-8')
+
+def build_extraction_prompt(ocr_text: str) -> str:
+    """Create prompt for structured extraction."""
+    return f"""Extract business card information from the following text.
+Return a JSON object with these fields:
+- company: Company or organization name
+- position: Job title or position
+- name: Person's full name
+- phone: Phone number
+- email: Email address
+
+If any field is not found, use null.
+
+Text from business card:
+{ocr_text}
+
+Return only valid JSON, no additional text."""
+
+def build_vision_extraction_messages(image_url: str) -> list:
+    """Create vision chat messages that extract structured fields directly from the image."""
+    return [
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": """Extract business card information from this image.
+Return a JSON object with these fields:
+- company: Company or organization name
+- position: Job title or position
+- name: Person's full name
+- phone: Phone number
+- email: Email address
+
+If any field is not found, use null. Return only valid JSON, no additional text."""
+                },
+                {
+                    "type": "image_url",
+                    "image_url": image_url
+                }
+            ]
+        }
+    ]
+
+def extract_info_from_text(text: str) -> BusinessCardInfo:
+    """Extract business card information from text using regex patterns."""
+    info = BusinessCardInfo()
+    
+    # Convert text to lines for easier processing
+    lines = text.split('\n')
+    
+    # Email pattern
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    
+    # Phone patterns (Korean and international formats)
+    phone_patterns = [
+        r'(?:010|011|016|017|018|019)[-.\s]?\d{3,4}[-.\s]?\d{4}',  # Korean mobile
+        r'0\d{1,2}[-.\s]?\d{3,4}[-.\s]?\d{4}',  # Korean landline
+        r'\+82[-.\s]?\d{1,2}[-.\s]?\d{3,4}[-.\s]?\d{4}',  # International Korean
+        r'\d{3}[-.\s]?\d{3,4}[-.\s]?\d{4}',  # General format
+        r'\(\d{2,3}\)[-.\s]?\d{3,4}[-.\s]?\d{4}',  # With area code
+        r'\+1[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'  # US format
+    ]
+    
+    # Common position keywords
+    position_keywords = [
+        '대표', '이사', '부장', '차장', '과장', '대리', '사원', '주임',
+        'CEO', 'CTO', 'CFO', 'COO', 'CMO', 'Director', 'Manager',
+        'Engineer', 'Developer', 'Designer', 'Consultant', 'Representative',
+        '팀장', '실장', '본부장', '센터장', '소장', '원장', '회장', '사장',
+        'Senior', 'Junior', 'Lead', 'Principal', 'Staff', 'Head'
+    ]
+    
+    # Company keywords (often followed by company name)
+    company_indicators = ['(주)', '주식회사', '㈜', 'Inc.', 'Corp.', 'Co.', 'Ltd.', 'LLC', 'Company']
+    
+    # Extract email
+    for line in lines:
+        email_match = re.search(email_pattern, line)
+        if email_match:
+            info.email = email_match.group()
+            break
+    
+    # Extract phone
+    for line in lines:
+        for pattern in phone_patterns:
+            phone_match = re.search(pattern, line)
+            if phone_match:
+                info.phone = phone_match.group()
+                break
+        if info.phone:
+            break
+    
+    # Extract position
+    for line in lines:
+        for keyword in position_keywords:
+            if keyword.lower() in line.lower():
+                info.position = line.strip()
+                break
+        if info.position:
+            break
+    
+    # Extract company
+    for line in lines:
+        for indicator in company_indicators:
+            if indicator in line:
+                info.company = line.strip()
+                break
+        if info.company:
+            break
+    
+    # Extract name (heuristic: often the largest text or first non-company line)
+    # This is simplified - in production, you might use more sophisticated logic
+    for line in lines:
+        line = line.strip()
+        if line and not info.email and not info.phone:
+            # Skip if it's likely company or position
+            if not any(indicator in line for indicator in company_indicators):
+                if not any(keyword in line.lower() for keyword in position_keywords):
+                    if not re.search(email_pattern, line) and not any(re.search(p, line) for p in phone_patterns):
+                        if (2 <= len(line) <= 10) or (len(line.split()) >= 2 and len(line.split()) <= 4):
+                            info.name = line
+                            break
+    
+    return info
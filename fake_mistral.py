@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Mistral API 로컬 대역(stand-in) 서버 - 벤치마크/부하 테스트용
+
+실제 Mistral API 키 없이 OCR(/v1/ocr)과 Chat(/v1/chat/completions) 엔드포인트를 흉내냅니다.
+지연 시간 분포, 에러 비율, 429(rate limit) 동작을 설정할 수 있습니다.
+
+Usage:
+    python fake_mistral.py --port 9000
+    python fake_mistral.py --ocr-latency lognormal:800:0.4 --chat-latency normal:400:80 --error-rate 0.01 --rate-429 0.05
+
+서버를 이 대역으로 향하게 하려면:
+    MISTRAL_SERVER_URL=http://localhost:9000 MISTRAL_API_KEY=fake uvicorn main:app --port 8000
+
+Latency spec (단위: ms):
+    fixed:MS | uniform:MIN:MAX | normal:MEAN:STD | lognormal:MEDIAN:SIGMA
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# 합성 명함 데이터 (OCR 텍스트와 추출 결과 생성에 사용)
+SAMPLE_CARDS: List[Dict[str, str]] = [
+    {"company": "TechCorp Inc.", "position": "Senior Software Engineer", "name": "John Smith",
+     "phone": "+1 (555) 123-4567", "email": "john.smith@techcorp.com"},
+    {"company": "주식회사 코리아", "position": "대표이사", "name": "김철수",
+     "phone": "010-1234-5678", "email": "kim@korea.com"},
+    {"company": "(주)한빛소프트", "position": "개발팀 팀장", "name": "이영희",
+     "phone": "02-555-0123", "email": "yhlee@hanbit.co.kr"},
+    {"company": "Blue Ocean Ltd.", "position": "Marketing Manager", "name": "Emily Clark",
+     "phone": "+82 10-9876-5432", "email": "emily@blueocean.io"},
+]
+
+class LatencySpec:
+    """지연 시간 분포 정의 (ms 단위)"""
+
+    def __init__(self, spec: str):
+        parts = spec.split(":")
+        self.kind = parts[0]
+        self.params = [float(p) for p in parts[1:]]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> float:
+        """지연 시간 샘플링 (초 단위 반환)"""
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.params[0], self.params[1])
+        elif self.kind == "normal":
+            ms = rng.gauss(self.params[0], self.params[1])
+        else:  # lognormal: median, sigma
+            ms = rng.lognormvariate(math.log(self.params[0]), self.params[1])
+        return max(ms, 0.0) / 1000
+
+@dataclass
+class FakeSettings:
+    ocr_latency: LatencySpec = field(default_factory=lambda: LatencySpec("lognormal:800:0.3"))
+    chat_latency: LatencySpec = field(default_factory=lambda: LatencySpec("lognormal:500:0.3"))
+    error_rate: float = 0.0
+    rate_429: float = 0.0
+    max_inflight: Optional[int] = None
+    retry_after: int = 1
+    seed: int = 42
+
+def _card_text(card: Dict[str, str]) -> str:
+    """명함 데이터를 OCR 마크다운 텍스트로 변환"""
+    return "\n\n".join([f"# {card['company']}", card["name"], card["position"], card["email"], card["phone"]])
+
+def create_app(settings: FakeSettings) -> FastAPI:
+    app = FastAPI(title="Fake Mistral API")
+    rng = random.Random(settings.seed)
+    stats = {"ocr": 0, "chat": 0, "errors": 0, "throttled": 0, "inflight": 0, "max_inflight_seen": 0}
+
+    async def simulate(kind: str, latency: LatencySpec) -> Optional[JSONResponse]:
+        """지연/에러/429 시뮬레이션. 실패 응답을 반환하거나 None"""
+        stats[kind] += 1
+        if settings.max_inflight is not None and stats["inflight"] >= settings.max_inflight:
+            stats["throttled"] += 1
+            return JSONResponse(status_code=429, content={"message": "Requests rate limit exceeded"},
+                                headers={"Retry-After": str(settings.retry_after)})
+        if rng.random() < settings.rate_429:
+            stats["throttled"] += 1
+            return JSONResponse(status_code=429, content={"message": "Requests rate limit exceeded"},
+                                headers={"Retry-After": str(settings.retry_after)})
+
+        stats["inflight"] += 1
+        stats["max_inflight_seen"] = max(stats["max_inflight_seen"], stats["inflight"])
+        try:
+            await asyncio.sleep(latency.sample(rng))
+        finally:
+            stats["inflight"] -= 1
+
+        if rng.random() < settings.error_rate:
+            stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"message": "Internal server error"})
+        return None
+
+    @app.post("/v1/ocr")
+    async def ocr(request: Request):
+        body = await request.json()
+        failure = await simulate("ocr", settings.ocr_latency)
+        if failure is not None:
+            return failure
+
+        card = rng.choice(SAMPLE_CARDS)
+        document = body.get("document", {})
+        doc_size = len(document.get("image_url") or document.get("document_url") or "")
+        return {
+            "pages": [{
+                "index": 0,
+                "markdown": _card_text(card),
+                "images": [],
+                "dimensions": {"dpi": 200, "height": 350, "width": 600},
+            }],
+            "model": body.get("model", "mistral-ocr-latest"),
+            "usage_info": {"pages_processed": 1, "doc_size_bytes": doc_size},
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat(request: Request):
+        body = await request.json()
+        failure = await simulate("chat", settings.chat_latency)
+        if failure is not None:
+            return failure
+
+        card = rng.choice(SAMPLE_CARDS)
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") in ("json_object", "json_schema"):
+            content = json.dumps(card, ensure_ascii=False)
+        else:
+            content = _card_text(card)
+
+        prompt_chars = len(json.dumps(body.get("messages", []), ensure_ascii=False))
+        prompt_tokens = max(prompt_chars // 4, 1)
+        completion_tokens = max(len(content) // 4, 1)
+        return {
+            "id": uuid.uuid4().hex,
+            "object": "chat.completion",
+            "model": body.get("model", "mistral-large-latest"),
+            "created": int(time.time()),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.get("/__stats")
+    async def get_stats():
+        return stats
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    return app
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Fake Mistral API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--ocr-latency", default="lognormal:800:0.3")
+    parser.add_argument("--chat-latency", default="lognormal:500:0.3")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 응답 비율 (0~1)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument("--max-inflight", type=int, default=None, help="동시 처리 한도 초과 시 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser
+
+def settings_from_args(args: argparse.Namespace) -> FakeSettings:
+    return FakeSettings(
+        ocr_latency=LatencySpec(args.ocr_latency),
+        chat_latency=LatencySpec(args.chat_latency),
+        error_rate=args.error_rate,
+        rate_429=args.rate_429,
+        max_inflight=args.max_inflight,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+
+if __name__ == "__main__":
+    import uvicorn
+    args = build_arg_parser().parse_args()
+    uvicorn.run(create_app(settings_from_args(args)), host=args.host, port=args.port, log_level="warning")
@@ -1,20 +1,44 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
 import zipfile
 import shutil
+import os
+import sys
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from config import get_config
+from typing import Dict, List, Tuple
+from config import ACTIVE_PERIOD_FILE, get_config, split_period_name
 from loguru import logger
 
+# 기간 디렉토리가 아닌 하위 디렉토리 (로테이션 대상 아님)
+NON_PERIOD_DIRS = {"archive", "idempotency"}
+# 마지막 수정 후 이 시간이 지난 파일/디렉토리만 크기를 캐시하고 앞당긴 아카이브 대상으로 삼음
+SETTLE_SECONDS = 300
+# 닫힌 기간/하위 구간 디렉토리를 용량 예산 때문에 앞당겨 아카이브하기 전 기다리는 시간
+# (워커의 로그 sink와 응답 저장이 1초마다 새 디렉토리를 확인하므로 진행 중인 기록이 끝날 여유)
+CLOSED_GRACE_SECONDS = 10
+# 계속 추가 기록되는 파일 (항상 다시 stat)
+APPEND_SUFFIXES = (".log", ".jsonl", ".lock")
+# 락을 잡지 못한 워커가 다시 시도하는 주기 (락을 가진 워커가 종료되면 다른 워커가 이어받음)
+LEADER_RETRY_SECONDS = 60
+
 class FileRotator:
     def __init__(self):
         self.config = get_config()
-        self.scheduler = BackgroundScheduler()
-        self._setup_rotation_schedule()
+        self.scheduler = None  # start() 시 생성 (apscheduler 지연 임포트)
+        self._lock_file = None
+        self._rotation_lock = threading.Lock()  # 정기 로테이션과 용량 확인 작업이 겹치지 않도록
+        self._sizes: Dict[str, int] = {}  # 더 이상 변하지 않는 파일/기간 디렉토리 크기 캐시 (경로 -> bytes)
+        self.usage: Dict[str, dict] = {}  # 마지막 용량 확인 결과
+        self.early_archived = 0  # 용량 예산 때문에 앞당겨 아카이브한 기간 디렉토리 수
+        self.archives_pruned = 0  # 용량 예산 때문에 삭제한 ZIP 수
+        self.periods_split = 0  # 용량 예산 때문에 현재 기간을 나눈 횟수
     
     def _setup_rotation_schedule(self):
-        """로테이션 스케줄 설정"""
+        """로테이션 스케줄 설정 (락을 잡은 프로세스에서만)"""
+        from apscheduler.triggers.cron import CronTrigger
+        from apscheduler.triggers.interval import IntervalTrigger
+        
         if self.config.rotation_period.value == "daily":
             trigger = CronTrigger(hour=0, minute=0)  # 매일 자정
         elif self.config.rotation_period.value == "weekly":
@@ -27,59 +51,297 @@ class FileRotator:
             trigger=trigger,
             id="file_rotation"
         )
+        
+        if self._budgets_enabled():
+            self.scheduler.add_job(
+                func=self.enforce_disk_budget,
+                trigger=IntervalTrigger(seconds=self.config.DISK_CHECK_INTERVAL_SECONDS),
+                id="disk_budget",
+                max_instances=1,
+                coalesce=True
+            )
     
     def start(self):
-        """스케줄러 시작"""
+        """스케줄러 시작 (로테이션 작업은 여러 워커 프로세스 중 락을 잡은 하나의 프로세스에서만 실행)"""
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from apscheduler.triggers.interval import IntervalTrigger
+        
+        self.config.ensure_directories()
+        self.scheduler = BackgroundScheduler()
+        if self._acquire_leader_lock():
+            self._setup_rotation_schedule()
+            logger.info(f"File rotation scheduler started with {self.config.rotation_period.value} rotation (pid {os.getpid()})")
+        else:
+            # 락을 가진 워커가 죽거나 재시작되면 이어받도록 주기적으로 다시 시도
+            self.scheduler.add_job(
+                func=self._retry_leader_lock,
+                trigger=IntervalTrigger(seconds=LEADER_RETRY_SECONDS),
+                id="leader_lock",
+                max_instances=1,
+                coalesce=True
+            )
+            logger.info(f"File rotation scheduler already running in another process, retrying every "
+                        f"{LEADER_RETRY_SECONDS}s (pid {os.getpid()})")
         self.scheduler.start()
-        logger.info(f"File rotation scheduler started with {self.config.rotation_period.value} rotation")
+    
+    def _retry_leader_lock(self):
+        """스케줄러 작업: 락을 잡으면 로테이션 작업 등록"""
+        if not self._acquire_leader_lock():
+            return
+        self.scheduler.remove_job("leader_lock")
+        self._setup_rotation_schedule()
+        logger.info(f"File rotation scheduler took over with {self.config.rotation_period.value} rotation (pid {os.getpid()})")
     
     def stop(self):
         """스케줄러 종료"""
+        if self.scheduler is None or not self.scheduler.running:
+            return
         self.scheduler.shutdown()
+        self._release_leader_lock()
         logger.info("File rotation scheduler stopped")
     
+    def _acquire_leader_lock(self) -> bool:
+        """로그 디렉토리의 락 파일로 스케줄러 실행 프로세스를 하나로 제한"""
+        lock_path = self.config.LOG_DIR / ".file_rotator.lock"
+        lock_file = open(lock_path, "a+")
+        lock_file.seek(0)
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._lock_file = lock_file
+        return True
+    
+    def _release_leader_lock(self):
+        """락 해제 (프로세스 종료 시에는 OS가 자동으로 해제)"""
+        if self._lock_file is None:
+            return
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                self._lock_file.seek(0)
+                msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._lock_file.close()
+            self._lock_file = None
+    
     def rotate_all(self):
         """모든 파일 로테이션 실행"""
         logger.info("Starting file rotation...")
-        self._rotate_directory(self.config.LOG_DIR, self.config.KEEP_LOG_DAYS)
-        self._rotate_directory(self.config.RESPONSE_DIR, self.config.KEEP_RESPONSE_DAYS)
+        self.config.ensure_directories()
+        with self._rotation_lock:
+            self._rotate_directory(self.config.LOG_DIR, self.config.KEEP_LOG_DAYS)
+            self._rotate_directory(self.config.RESPONSE_DIR, self.config.KEEP_RESPONSE_DAYS)
+            if self._budgets_enabled():
+                self._enforce_budgets()
         logger.info("File rotation completed")
     
+    def enforce_disk_budget(self):
+        """용량 예산 확인 (주기 작업, 예산을 넘으면 앞당긴 아카이브/오래된 ZIP 삭제)"""
+        self.config.ensure_directories()
+        with self._rotation_lock:
+            self._enforce_budgets()
+    
+    def _budgets_enabled(self) -> bool:
+        return any((
+            self.config.LOG_DIR_MAX_BYTES, self.config.RESPONSE_DIR_MAX_BYTES,
+            self.config.LOG_ARCHIVE_MAX_BYTES, self.config.RESPONSE_ARCHIVE_MAX_BYTES,
+        ))
+    
+    def _enforce_budgets(self):
+        seen: Dict[str, int] = {}
+        self.usage = {
+            "logs": self._enforce_budget(
+                self.config.LOG_DIR, self.config.LOG_DIR_MAX_BYTES, self.config.LOG_ARCHIVE_MAX_BYTES, seen
+            ),
+            "responses": self._enforce_budget(
+                self.config.RESPONSE_DIR, self.config.RESPONSE_DIR_MAX_BYTES, self.config.RESPONSE_ARCHIVE_MAX_BYTES, seen
+            ),
+        }
+        self._sizes = seen  # 삭제/아카이브된 경로는 캐시에서 제거
+    
+    def _enforce_budget(self, base_dir: Path, live_budget: int, archive_budget: int, seen: Dict[str, int]) -> dict:
+        """
+        기간 디렉토리 합계가 예산을 넘으면 오래된 기간부터 아카이브, archive/가 예산을 넘으면 오래된 ZIP부터 삭제
+        
+        닫힌 기간을 모두 아카이브해도 넘고 초과분이 기록 중인 디렉토리에 있으면 (트래픽 급증),
+        현재 기간을 새 하위 구간(기간.N)으로 나눠 기록을 옮기고 다음 확인 때 닫힌 부분을 아카이브합니다.
+        """
+        now = time.time()
+        live_bytes, periods = self._measure_live(base_dir, now, seen)
+        archives = self._measure_archives(base_dir / "archive")
+        archive_bytes = sum(size for _, size, _ in archives)
+        
+        if live_budget and live_bytes > live_budget:
+            for directory, size, archivable in sorted(periods, key=lambda p: self._period_sort_key(p[0])):
+                if live_bytes <= live_budget:
+                    break
+                if not archivable:
+                    continue  # 기록 중인 디렉토리 또는 방금 닫힌 디렉토리
+                logger.warning(f"{base_dir.name} uses {live_bytes} bytes (budget {live_budget}), archiving {directory.name} early")
+                zip_path = self._archive_directory(directory, base_dir / "archive")
+                seen.pop(str(directory), None)
+                zip_size = zip_path.stat().st_size
+                archives.append((zip_path, zip_size, zip_path.stat().st_mtime))
+                live_bytes -= size
+                archive_bytes += zip_size
+                self.early_archived += 1
+            if live_bytes > live_budget:
+                active = self.config.active_period_name(base_dir)
+                active_bytes = next((size for directory, size, _ in periods if directory.name == active), 0)
+                if active_bytes and active_bytes >= live_bytes - live_budget:
+                    self._roll_period(base_dir, active, active_bytes, live_bytes, live_budget)
+                else:
+                    logger.warning(f"{base_dir.name} still uses {live_bytes} bytes (budget {live_budget}) after archiving all closed periods")
+        
+        if archive_budget and archive_bytes > archive_budget:
+            for zip_path, size, _ in sorted(archives, key=lambda a: a[2]):
+                if archive_bytes <= archive_budget:
+                    break
+                zip_path.unlink(missing_ok=True)
+                archive_bytes -= size
+                self.archives_pruned += 1
+                logger.warning(f"Pruned archive {zip_path} ({size} bytes) to keep {base_dir.name}/archive under {archive_budget} bytes")
+        
+        return {
+            "live_bytes": live_bytes,
+            "live_budget": live_budget,
+            "archive_bytes": archive_bytes,
+            "archive_budget": archive_budget,
+        }
+    
+    def _roll_period(self, base_dir: Path, active: str, active_bytes: int, live_bytes: int, live_budget: int):
+        """기록 중인 기간을 새 하위 구간으로 전환 (워커들은 ACTIVE_PERIOD_FILE을 보고 1초 안에 따라옴)"""
+        period, segment = split_period_name(active)
+        next_name = f"{period}.{segment + 1}"
+        (base_dir / next_name).mkdir(exist_ok=True)
+        marker = base_dir / ACTIVE_PERIOD_FILE
+        tmp_path = marker.with_name(f"{ACTIVE_PERIOD_FILE}.{os.getpid()}.tmp")
+        tmp_path.write_text(next_name, encoding="utf-8")
+        os.replace(tmp_path, marker)
+        self.periods_split += 1
+        logger.warning(f"{base_dir.name} uses {live_bytes} bytes (budget {live_budget}) and current period {active} "
+                       f"holds {active_bytes} bytes, switching to {next_name} (closed part is archived on the next check)")
+    
+    def _measure_live(self, base_dir: Path, now: float, seen: Dict[str, int]) -> Tuple[int, List[Tuple[Path, int, bool]]]:
+        """아카이브 외 사용량과 기간 디렉토리 목록 ((경로, 크기, 아카이브 가능 여부))"""
+        active = self.config.active_period_name(base_dir)
+        live_bytes, periods = 0, []
+        for entry in os.scandir(base_dir):
+            if entry.is_file(follow_symlinks=False):
+                live_bytes += entry.stat().st_size  # 인덱스(*.jsonl), 락 파일
+            elif entry.is_dir(follow_symlinks=False) and entry.name != "archive":
+                if entry.name == active or entry.name in NON_PERIOD_DIRS:
+                    size, archivable = self._scan_files(entry.path, now, seen), False
+                else:
+                    size, archivable = self._closed_directory_size(entry.path, now, seen)
+                live_bytes += size
+                if entry.name not in NON_PERIOD_DIRS and self._directory_date(Path(entry.path)) is not None:
+                    periods.append((Path(entry.path), size, archivable))
+        return live_bytes, periods
+    
+    def _scan_files(self, path: str, now: float, seen: Dict[str, int]) -> int:
+        """기록 중인 디렉토리 사용량 (수정이 끝난 파일은 캐시된 크기를 사용해 stat 생략)"""
+        total = 0
+        for entry in os.scandir(path):
+            if entry.is_dir(follow_symlinks=False):
+                total += self._scan_files(entry.path, now, seen)
+                continue
+            size = self._sizes.get(entry.path)
+            if size is None:
+                stat = entry.stat()
+                size = stat.st_size
+                if entry.name.endswith(APPEND_SUFFIXES) or now - stat.st_mtime < SETTLE_SECONDS:
+                    total += size
+                    continue
+            seen[entry.path] = size
+            total += size
+        return total
+    
+    def _closed_directory_size(self, path: str, now: float, seen: Dict[str, int]) -> Tuple[int, bool]:
+        """
+        닫힌 기간 디렉토리 크기 ((크기, 아카이브 가능 여부))
+        
+        CLOSED_GRACE_SECONDS 동안 수정이 없으면 아카이브할 수 있고, SETTLE_SECONDS 동안 없으면 크기를 캐시해 다시 계산하지 않습니다.
+        """
+        size = self._sizes.get(path)
+        if size is not None:
+            seen[path] = size
+            return size, True
+        size, newest = 0, 0.0
+        for root, _, files in os.walk(path):
+            for name in files:
+                stat = os.stat(os.path.join(root, name))
+                size += stat.st_size
+                newest = max(newest, stat.st_mtime)
+        if now - newest >= SETTLE_SECONDS:
+            seen[path] = size
+        return size, now - newest >= CLOSED_GRACE_SECONDS
+    
+    def _measure_archives(self, archive_dir: Path) -> List[Tuple[Path, int, float]]:
+        """archive/의 ZIP 목록 ((경로, 크기, 수정 시간))"""
+        archives = []
+        for entry in os.scandir(archive_dir):
+            if entry.is_file() and entry.name.endswith(".zip"):
+                stat = entry.stat()
+                archives.append((Path(entry.path), stat.st_size, stat.st_mtime))
+        return archives
+    
     def _rotate_directory(self, base_dir: Path, keep_days: int):
         """디렉토리 로테이션 처리"""
         cutoff_date = datetime.now() - timedelta(days=keep_days)
         archive_dir = base_dir / "archive"
         
         for item in base_dir.iterdir():
-            if item.is_dir() and item.name != "archive":
+            if item.is_dir() and item.name not in NON_PERIOD_DIRS:
                 # 디렉토리 생성 시간 확인
                 if self._is_directory_old(item, cutoff_date):
                     self._archive_directory(item, archive_dir)
     
     def _is_directory_old(self, directory: Path, cutoff_date: datetime) -> bool:
         """디렉토리가 보관 기한을 넘었는지 확인"""
-        # 디렉토리 이름에서 날짜 파싱
-        dir_name = directory.name
+        dir_date = self._directory_date(directory)
+        return dir_date is not None and dir_date < cutoff_date
+    
+    def _period_sort_key(self, directory: Path):
+        """오래된 순 정렬 키 (같은 기간은 하위 구간 번호 순)"""
+        return self._directory_date(directory), split_period_name(directory.name)[1]
+    
+    def _directory_date(self, directory: Path):
+        """기간 디렉토리 이름의 시작 날짜 (형식이 다르면 None, 날짜 파싱 실패 시 수정 시간)"""
+        # 디렉토리 이름에서 날짜 파싱 (하위 구간 번호는 제외)
+        dir_name = split_period_name(directory.name)[0]
         
         try:
             if "-W" in dir_name:  # Weekly format (YYYY-WXX)
                 year, week = dir_name.split("-W")
-                dir_date = datetime.strptime(f"{year}-W{week}-1", "%Y-W%U-%w")
+                return datetime.strptime(f"{year}-W{week}-1", "%Y-W%U-%w")
             elif len(dir_name.split("-")) == 3:  # Daily format (YYYY-MM-DD)
-                dir_date = datetime.strptime(dir_name, "%Y-%m-%d")
+                return datetime.strptime(dir_name, "%Y-%m-%d")
             elif len(dir_name.split("-")) == 2:  # Monthly format (YYYY-MM)
-                dir_date = datetime.strptime(dir_name, "%Y-%m")
+                return datetime.strptime(dir_name, "%Y-%m")
             else:
-                return False
-            
-            return dir_date < cutoff_date
+                return None
         except ValueError:
             # 날짜 파싱 실패 시 수정 시간으로 확인
             stat = directory.stat()
-            mtime = datetime.fromtimestamp(stat.st_mtime)
-            return mtime < cutoff_date
+            return datetime.fromtimestamp(stat.st_mtime)
     
-    def _archive_directory(self, source_dir: Path, archive_dir: Path):
+    def _archive_directory(self, source_dir: Path, archive_dir: Path) -> Path:
         """디렉토리를 ZIP으로 아카이브"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         zip_filename = f"{source_dir.name}_{timestamp}.zip"
@@ -96,6 +358,7 @@ class FileRotator:
         # 원본 디렉토리 삭제
         shutil.rmtree(source_dir)
         logger.info(f"Archived and removed {source_dir}")
+        return zip_path
     
     def manual_cleanup(self, force: bool = False):
         """수동으로 정리 실행"""
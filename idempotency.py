@@ -0,0 +1,186 @@
+"""
+Idempotency-Key 응답 저장소
+
+같은 Idempotency-Key로 재시도한 요청에는 저장된 응답을 그대로 반환하여 OCR/chat 호출과 응답 파일 생성을 반복하지 않습니다.
+키별 상태는 RESPONSE_DIR/idempotency/<해시>.json 파일 하나로 관리되어 워커 간에 공유됩니다.
+    - processing: 처리 중 (O_EXCL 생성으로 한 요청만 소유), 같은 키의 요청은 완료될 때까지 대기
+                  IDEMPOTENCY_LEASE_SECONDS가 지나도 남아 있으면 소유 워커가 죽은 것으로 보고 다른 요청이 넘겨받음
+    - completed: 저장된 응답 (IDEMPOTENCY_TTL_SECONDS 동안 재사용)
+처리가 실패하면 (자신이 소유한) 상태 파일을 지워 다음 재시도가 처음부터 처리하도록 합니다.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+from config import get_config
+from serialization import get_serializer
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+# begin() 결과
+NEW = "new"  # 이 요청이 처리를 맡음
+COMPLETED = "completed"  # 저장된 응답 재사용
+PROCESSING = "processing"  # 다른 요청이 처리 중
+MISMATCH = "mismatch"  # 같은 키가 다른 요청 본문에 사용됨
+
+class IdempotencyStore:
+    """TTL이 있는 파일 기반 Idempotency-Key 저장소"""
+
+    def __init__(self):
+        self.config = get_config()
+        self.serializer = get_serializer()
+        self.directory = self.config.RESPONSE_DIR / "idempotency"
+        self._events: Dict[str, asyncio.Event] = {}  # 같은 워커 안의 대기 요청 깨우기
+        self._waiters: Counter = Counter()  # 키별 대기 요청 수 (0이 되면 이벤트 제거)
+        self._last_purge = 0.0
+
+    def _path(self, tenant: str, key: str):
+        digest = hashlib.sha256(f"{tenant}\0{key}".encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def _read(self, path) -> Optional[dict]:
+        try:
+            with open(path, "rb") as f:
+                return self.serializer.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            return None  # 쓰는 중인 processing 파일
+
+    def _is_expired(self, record: dict, now: float) -> bool:
+        if record.get("status") == COMPLETED:
+            return record["expires_at"] < now
+        # 처리 중 표시가 임대 시간을 넘겨 남아 있으면 소유 워커가 죽은 것으로 판단
+        lease_expires_at = record.get("lease_expires_at")
+        if lease_expires_at is None:
+            lease_expires_at = record.get("started_at", 0) + self.config.IDEMPOTENCY_LEASE_SECONDS
+        return lease_expires_at < now
+
+    def begin(self, tenant: str, key: str, fingerprint: str, request_id: str) -> Tuple[str, Optional[dict]]:
+        """키 상태 확인 후 없으면 processing으로 선점 ((NEW|COMPLETED|PROCESSING|MISMATCH, 기록))"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._maybe_purge()
+        path = self._path(tenant, key)
+        now = time.time()
+        marker = {"status": PROCESSING, "request_id": request_id, "fingerprint": fingerprint, "started_at": now,
+                  "lease_expires_at": now + self.config.IDEMPOTENCY_LEASE_SECONDS}
+
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                record = self._read(path)
+                if record is None:
+                    return PROCESSING, None
+                if self._is_expired(record, time.time()):
+                    self._unlink(path)
+                    continue
+                if record.get("fingerprint") != fingerprint:
+                    return MISMATCH, record
+                return record["status"], record
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.serializer.dumps_bytes(marker))
+            return NEW, None
+        return PROCESSING, None
+
+    async def complete(self, tenant: str, key: str, fingerprint: str, request_id: str, status_code: int, body: dict):
+        """응답 저장 (TTL 동안 재사용, 파일 쓰기는 스레드에서 하고 같은 워커의 대기 요청을 깨움)"""
+        path = self._path(tenant, key)
+        await asyncio.to_thread(self._write_completed, path, fingerprint, request_id, status_code, body)
+        self._notify(path)
+
+    def _write_completed(self, path, fingerprint: str, request_id: str, status_code: int, body: dict):
+        now = time.time()
+        record = {
+            "status": COMPLETED,
+            "request_id": request_id,
+            "fingerprint": fingerprint,
+            "status_code": status_code,
+            "body": body,
+            "created_at": now,
+            "expires_at": now + self.config.IDEMPOTENCY_TTL_SECONDS,
+        }
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(self.serializer.dumps_bytes(record))
+        os.replace(tmp_path, path)
+
+    async def abandon(self, tenant: str, key: str, request_id: str):
+        """처리 실패 시 선점 해제 (다음 재시도가 처음부터 처리)"""
+        path = self._path(tenant, key)
+        await asyncio.to_thread(self._release, path, request_id)
+        self._notify(path)
+
+    def _release(self, path, request_id: str):
+        """이 요청이 소유한 processing 표시만 삭제 (임대 만료 후 넘겨받은 다른 요청의 표시나 완료 기록은 유지)"""
+        record = self._read(path)
+        if record is not None and record.get("status") == PROCESSING and record.get("request_id") == request_id:
+            self._unlink(path)
+
+    async def wait(self, tenant: str, key: str, poll_interval: float = 0.2) -> Optional[dict]:
+        """처리 중인 키가 완료될 때까지 대기 (완료 기록, 원래 요청이 실패했으면 None)"""
+        path = self._path(tenant, key)
+        event_key = str(path)
+        deadline = time.monotonic() + self.config.IDEMPOTENCY_WAIT_TIMEOUT
+        self._waiters[event_key] += 1
+        try:
+            while time.monotonic() < deadline:
+                event = self._events.setdefault(event_key, asyncio.Event())
+                record = await asyncio.to_thread(self._read, path)
+                if not path.exists():
+                    return None
+                if record is not None and record.get("status") == COMPLETED:
+                    return record
+                # 같은 워커의 완료는 즉시, 다른 워커의 완료는 주기적으로 확인
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            raise TimeoutError(f"Timed out waiting for in-progress request with {IDEMPOTENCY_HEADER}")
+        finally:
+            # 다른 워커가 완료한 키는 _notify가 호출되지 않으므로 마지막 대기 요청이 이벤트를 정리
+            self._waiters[event_key] -= 1
+            if self._waiters[event_key] <= 0:
+                del self._waiters[event_key]
+                self._events.pop(event_key, None)
+
+    def _notify(self, path):
+        event = self._events.pop(str(path), None)
+        if event is not None:
+            event.set()
+
+    def _unlink(self, path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def _maybe_purge(self):
+        """만료된 기록 정리 (10분에 한 번)"""
+        now = time.time()
+        if now - self._last_purge < 600:
+            return
+        self._last_purge = now
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            record = self._read(path)
+            if record is not None and self._is_expired(record, now):
+                self._unlink(path)
+                removed += 1
+        if removed:
+            logger.info(f"Purged {removed} expired idempotency records")
+
+# Singleton pattern for idempotency store
+_idempotency_store = None
+
+def get_idempotency_store() -> IdempotencyStore:
+    global _idempotency_store
+    if _idempotency_store is None:
+        _idempotency_store = IdempotencyStore()
+    return _idempotency_store
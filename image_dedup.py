@@ -0,0 +1,297 @@
+"""
+지각 해시(perceptual hash) 기반 근접 중복 이미지 인덱스
+
+같은 명함을 다시 촬영하거나 다른 스캐너로 저장하면 바이트는 달라지지만 지각 해시는 거의 같습니다.
+처리한 이미지의 dHash(기본 16x16 = 256비트)를 BK-tree에 넣어 해밍 거리로 빠르게 조회하고,
+후보는 pHash(32x32 DCT의 저주파 8x8 = 64비트) 거리로 한 번 더 확인합니다.
+
+인덱스는 RESPONSE_DIR/image_index.jsonl에 추가 기록되며, 워커끼리는 파일의 새 줄을 읽어 동기화합니다.
+테넌트별로 분리되어 다른 테넌트가 처리한 결과는 중복으로 판정되지 않습니다.
+보관 기간(KEEP_RESPONSE_DAYS)이 지난 항목은 로드할 때 제외하고, 파일은 주기적으로 압축합니다.
+"""
+
+import io
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from config import get_config
+from serialization import get_serializer
+
+# pHash용 DCT 코사인 테이블 (32점, 저주파 8개)
+_DCT_SIZE = 32
+_DCT_LOW = 8
+_COS = [[math.cos((2 * x + 1) * u * math.pi / (2 * _DCT_SIZE)) for x in range(_DCT_SIZE)] for u in range(_DCT_LOW)]
+
+COMPACT_INTERVAL_SECONDS = 3600  # 만료 항목이 있을 때 인덱스 파일 압축 주기
+COMPACT_STALE_SECONDS = 600  # 이보다 오래된 압축 임시 파일은 중단된 작업으로 보고 제거
+
+class ImageFingerprint:
+    """이미지의 dHash/pHash 쌍"""
+
+    __slots__ = ("dhash", "phash")
+
+    def __init__(self, dhash: int, phash: int):
+        self.dhash = dhash
+        self.phash = phash
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+def _bits_to_int(bits) -> int:
+    value = 0
+    for bit in bits:
+        value = (value << 1) | bool(bit)
+    return value
+
+def dhash(image, hash_size: int) -> int:
+    """가로 방향 밝기 차이 해시 (hash_size x hash_size 비트)"""
+    from PIL import Image
+    pixels = list(image.resize((hash_size + 1, hash_size), Image.BILINEAR).getdata())
+    width = hash_size + 1
+    return _bits_to_int(
+        pixels[row * width + col] > pixels[row * width + col + 1]
+        for row in range(hash_size)
+        for col in range(hash_size)
+    )
+
+def phash(image) -> int:
+    """32x32 DCT의 저주파 8x8 계수를 중앙값과 비교한 해시 (64비트)"""
+    from PIL import Image
+    pixels = list(image.resize((_DCT_SIZE, _DCT_SIZE), Image.BILINEAR).getdata())
+    rows = [pixels[y * _DCT_SIZE:(y + 1) * _DCT_SIZE] for y in range(_DCT_SIZE)]
+    # 분리 가능한 2D DCT: 행 방향 -> 열 방향 (저주파만 계산)
+    row_coeffs = [[sum(c * p for c, p in zip(_COS[u], row)) for u in range(_DCT_LOW)] for row in rows]
+    coeffs = [
+        sum(_COS[v][y] * row_coeffs[y][u] for y in range(_DCT_SIZE))
+        for v in range(_DCT_LOW)
+        for u in range(_DCT_LOW)
+    ]
+    ac = sorted(coeffs[1:])  # DC 성분 제외
+    median = ac[len(ac) // 2]
+    return _bits_to_int(c > median for c in coeffs)
+
+def compute_fingerprint(content: bytes, hash_size: int) -> Optional[ImageFingerprint]:
+    """이미지 bytes의 지각 해시 계산 (디코딩할 수 없는 이미지면 None)"""
+    from PIL import Image, ImageOps
+    try:
+        image = Image.open(io.BytesIO(content))
+        image.draft("L", (_DCT_SIZE * 4, _DCT_SIZE * 4))  # JPEG는 축소 디코딩
+        image = ImageOps.exif_transpose(image).convert("L")
+    except Exception as e:
+        logger.debug(f"Could not fingerprint image: {str(e)}")
+        return None
+    return ImageFingerprint(dhash(image, hash_size), phash(image))
+
+class BKTree:
+    """해밍 거리 BK-tree (임계 거리 이내 항목 조회)"""
+
+    def __init__(self):
+        self.root = None  # [hash, items, {distance: child}]
+
+    def add(self, key: int, item):
+        if self.root is None:
+            self.root = [key, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(key, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, [item], {}]
+                return
+            node = child
+
+    def search(self, key: int, max_distance: int) -> List[Tuple[int, object]]:
+        """(거리, 항목) 목록"""
+        results = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(key, node[0])
+            if distance <= max_distance:
+                results.extend((distance, item) for item in node[1])
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for d, child in node[2].items() if low <= d <= high)
+        return results
+
+class DuplicateMatch:
+    """근접 중복으로 판정된 기존 결과"""
+
+    def __init__(self, entry: dict, dhash_distance: int, phash_distance: int):
+        self.request_id = entry["request_id"]
+        self.extracted_data = entry["extracted_data"]
+        self.dhash_distance = dhash_distance
+        self.phash_distance = phash_distance
+
+class DuplicateIndex:
+    """처리한 이미지의 지각 해시 인덱스 (JSONL 파일에 추가 기록, 워커 간 공유)"""
+
+    def __init__(self):
+        self.config = get_config()
+        self.serializer = get_serializer()
+        self.path = self.config.RESPONSE_DIR / "image_index.jsonl"
+        self.trees: Dict[str, BKTree] = {}  # 테넌트별 트리
+        self.size = 0
+        self._offset = 0  # 파일에서 읽은 위치
+        self._inode = None  # 압축으로 파일이 교체되면 처음부터 다시 읽음
+        self._oldest = None  # 트리에 있는 가장 오래된 항목 시각
+        self._expired = 0  # 읽으면서 건너뛴 만료 항목 수
+        self._next_compact = 0.0
+        self._lock = threading.Lock()
+
+    def _reset(self):
+        self.trees = {}
+        self.size = 0
+        self._offset = 0
+        self._oldest = None
+        self._expired = 0
+
+    def _cutoff(self) -> float:
+        return time.time() - self.config.KEEP_RESPONSE_DAYS * 86400
+
+    def _sync(self):
+        """파일에 새로 추가된 항목(다른 워커 포함)을 트리에 반영 (lock 안에서 호출)"""
+        if not self.path.exists():
+            return
+        cutoff = self._cutoff()
+        with open(self.path, "rb") as f:
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._inode:
+                self._reset()
+                self._inode = inode
+            f.seek(self._offset)
+            while True:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # 기록 중인 마지막 줄은 다음에 읽음
+                self._offset = f.tell()
+                try:
+                    entry = self.serializer.loads(line)
+                except ValueError:
+                    continue
+                timestamp = entry.get("timestamp", 0)
+                if timestamp < cutoff or "tenant" not in entry:
+                    self._expired += 1
+                    continue  # 보관 기간이 지난 결과, 테넌트를 알 수 없는 이전 형식 항목은 재사용하지 않음
+                self.trees.setdefault(entry["tenant"], BKTree()).add(int(entry["dhash"], 16), entry)
+                self.size += 1
+                self._oldest = timestamp if self._oldest is None else min(self._oldest, timestamp)
+
+        now = time.time()
+        if now >= self._next_compact and (self._expired or (self._oldest is not None and self._oldest < cutoff)):
+            self._next_compact = now + COMPACT_INTERVAL_SECONDS
+            self._compact(cutoff)
+
+    def _compact(self, cutoff: float):
+        """
+        만료 항목을 뺀 인덱스 파일로 교체 (O_EXCL 임시 파일을 만든 워커 하나만 실행)
+
+        다른 워커는 파일이 바뀐 것(inode)을 보고 처음부터 다시 읽습니다.
+        교체 직전 몇 마이크로초 사이에 추가된 줄은 빠질 수 있지만, 중복 판정 캐시이므로 허용합니다.
+        """
+        tmp_path = self.path.with_name(self.path.name + ".compact")
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            try:
+                if time.time() - tmp_path.stat().st_mtime > COMPACT_STALE_SECONDS:
+                    tmp_path.unlink()
+            except OSError:
+                pass
+            return
+
+        kept = dropped = position = 0
+        try:
+            lines = []
+            with open(self.path, "rb") as f:
+                while True:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        break
+                    position = f.tell()
+                    try:
+                        entry = self.serializer.loads(line)
+                        if entry.get("timestamp", 0) < cutoff or "tenant" not in entry:
+                            dropped += 1
+                            continue
+                    except ValueError:
+                        dropped += 1
+                        continue
+                    lines.append(line)
+                # 읽는 동안 다른 워커가 추가한 완성된 줄까지 포함
+                f.seek(position)
+                tail = f.read()
+                lines.append(tail[:tail.rfind(b"\n") + 1])
+            kept = len(lines) - 1
+            os.write(fd, b"".join(lines))
+            os.close(fd)
+            fd = None
+            os.replace(tmp_path, self.path)
+            logger.info(f"Image index compacted: {kept} entries kept, {dropped} expired entries removed")
+        except OSError as e:
+            logger.warning(f"Image index compaction failed: {str(e)}")
+        finally:
+            if fd is not None:
+                os.close(fd)
+            tmp_path.unlink(missing_ok=True)
+
+    def lookup(self, tenant: str, fingerprint: ImageFingerprint) -> Optional[DuplicateMatch]:
+        """같은 테넌트의 임계 거리 이내 가장 가까운 기존 결과"""
+        with self._lock:
+            self._sync()
+            tree = self.trees.get(tenant)
+            candidates = tree.search(fingerprint.dhash, self.config.DEDUP_MAX_DISTANCE) if tree else []
+        cutoff = self._cutoff()
+
+        best = None
+        for dhash_distance, entry in candidates:
+            if entry.get("timestamp", 0) < cutoff:
+                continue  # 로드 후 보관 기간이 지난 항목 (다음 압축 때 제거)
+            phash_distance = hamming(fingerprint.phash, int(entry["phash"], 16))
+            if phash_distance > self.config.DEDUP_MAX_PHASH_DISTANCE:
+                continue
+            if best is None or (dhash_distance, phash_distance) < (best.dhash_distance, best.phash_distance):
+                best = DuplicateMatch(entry, dhash_distance, phash_distance)
+        return best
+
+    def check(self, tenant: str, content: bytes) -> Tuple[Optional[ImageFingerprint], Optional[DuplicateMatch]]:
+        """이미지 지각 해시 계산 후 근접 중복 조회 (CPU 작업이므로 스레드에서 호출)"""
+        fingerprint = compute_fingerprint(content, self.config.DEDUP_HASH_SIZE)
+        if fingerprint is None:
+            return None, None
+        return fingerprint, self.lookup(tenant, fingerprint)
+
+    def add(self, tenant: str, fingerprint: ImageFingerprint, request_id: str, extracted_data: dict):
+        """처리 결과를 인덱스 파일에 추가 (트리에는 다음 동기화 시 반영)"""
+        entry = {
+            "tenant": tenant,
+            "dhash": format(fingerprint.dhash, "x"),
+            "phash": format(fingerprint.phash, "x"),
+            "request_id": request_id,
+            "extracted_data": extracted_data,
+            "timestamp": time.time(),
+        }
+        line = self.serializer.dumps_bytes(entry) + b"\n"
+        self.config.ensure_directories()
+        # O_APPEND 단일 write로 워커 간 줄 단위 추가가 섞이지 않도록 함
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+# Singleton pattern for duplicate index
+_duplicate_index = None
+
+def get_duplicate_index() -> DuplicateIndex:
+    global _duplicate_index
+    if _duplicate_index is None:
+        _duplicate_index = DuplicateIndex()
+    return _duplicate_index
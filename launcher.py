@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+운영용 멀티 워커 실행기
+
+설정은 명령행 인자를 환경 변수(ENVIRONMENT, ROTATION_PERIOD)로 변환하여 각 워커 프로세스에 전달합니다.
+파일 로테이션 스케줄러는 락 파일을 잡은 하나의 워커에서만 실행되고, 나머지 워커는 주기적으로 락을 다시 시도합니다.
+종료 시(SIGTERM/SIGINT)에는 새 연결을 받지 않고 처리 중인 요청이 끝날 때까지 기다립니다.
+
+Usage:
+    python launcher.py --env production --workers 4
+    python launcher.py --env dev --rotation monthly --port 8080 --graceful-timeout 60
+
+uvicorn을 직접 실행해도 동일하게 동작합니다:
+    ENVIRONMENT=production uvicorn main:app --workers 4 --timeout-graceful-shutdown 30
+"""
+
+import argparse
+import os
+from typing import List, Optional
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Business Card OCR API launcher")
+    parser.add_argument("--env", choices=["dev", "production"], default=os.getenv("ENVIRONMENT", "dev"))
+    parser.add_argument("--rotation", choices=["daily", "weekly", "monthly"], default=os.getenv("ROTATION_PERIOD"))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: 운영 CPU 수, 개발 1)")
+    parser.add_argument("--graceful-timeout", type=int, default=30, help="종료 시 처리 중 요청 대기 시간 (초)")
+    return parser
+
+def apply_env(args: argparse.Namespace):
+    """설정을 환경 변수로 전달 (워커 프로세스가 상속)"""
+    os.environ["ENVIRONMENT"] = args.env
+    if args.rotation:
+        os.environ["ROTATION_PERIOD"] = args.rotation
+
+def parse_cli_to_env(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    args = build_arg_parser().parse_args(argv)
+    apply_env(args)
+    return args
+
+def main():
+    import uvicorn
+    
+    args = parse_cli_to_env()
+    workers = args.workers or ((os.cpu_count() or 1) if args.env == "production" else 1)
+    print(f"🚀 Starting {workers} worker(s) with {args.env} environment on {args.host}:{args.port}")
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        timeout_graceful_shutdown=args.graceful_timeout
+    )
+
+if __name__ == "__main__":
+    main()
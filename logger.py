@@ -1,37 +1,107 @@
-import json
 import uuid
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 from loguru import logger
 from config import get_config
+from serialization import get_serializer
+
+# 샘플링 대상 응답 상태 (그 외 상태와 에러는 항상 기록)
+SAMPLED_STATUSES = {"success", "replayed"}
+RESPONSE_STORES = ("full", "hash", "ref")
+PENDING_MAX = 1024  # 결과를 기다리는 샘플링 제외 요청 로그 최대 보관 수
 
 class ApplicationLogger:
     def __init__(self):
         self.config = get_config()
-        self._setup_loggers()
+        self.serializer = get_serializer()
+        self._ready = False
+        self._setup_lock = threading.Lock()
+        self._file_sink_ids = []
+        self._period_dir = None  # 파일 sink가 기록 중인 기간 디렉토리
+        self._next_period_check = 0.0
+        self._response_dir = None  # 응답 파일을 저장할 기간 디렉토리 (1초마다 다시 확인)
+        self._next_response_check = 0.0
+        if self.config.RESPONSE_STORE not in RESPONSE_STORES:
+            raise ValueError(f"RESPONSE_STORE must be one of: {', '.join(RESPONSE_STORES)}")
+        # 샘플링에서 제외된 요청의 api_request 로그는 결과(에러/느린 요청)를 알 때까지 보관
+        self._pending: "OrderedDict[str, str]" = OrderedDict()
+        self._pending_lock = threading.Lock()
+        self.sampling_counts = {
+            "api_request_dropped": 0,
+            "app_response_dropped": 0,
+            "kept_slow": 0,
+            "kept_failure": 0,
+            "responses_hashed": 0,
+            "responses_referenced": 0,
+        }
+    
+    def setup(self):
+        """로그 sink 설정 (첫 로깅 시 자동 호출, lifespan에서 미리 호출 가능)"""
+        if self._ready:
+            self._follow_period()
+            return
+        with self._setup_lock:
+            if self._ready:
+                return
+            self.config.ensure_directories()
+            self._setup_loggers()
+            self._ready = True
     
     def _setup_loggers(self):
         """로그 타입별 파일 분리"""
         logger.remove()  # 기본 로거 제거
         
-        # 콘솔 로거
+        # 콘솔 로거 (운영 환경은 경고 이상만)
         logger.add(
             sink=lambda msg: print(msg),
             format=self.config.LOG_FORMAT,
-            level=self.config.LOG_LEVEL
+            level=self.config.LOG_CONSOLE_LEVEL
         )
         
         # 파일별 로거 설정
-        self._add_file_logger("api_requests.log", "api_request")
-        self._add_file_logger("app_responses.log", "app_response")
-        self._add_file_logger("errors.log", "error")
+        self._add_file_loggers()
+    
+    def _add_file_loggers(self):
+        """현재 기간 디렉토리에 로그 타입별 파일 sink 추가 (이전 기간의 sink는 새 sink 추가 후 제거)"""
+        previous_ids = self._file_sink_ids
+        self._period_dir = self._get_period_directory()
+        self._file_sink_ids = [
+            self._add_file_logger("api_requests.log", "api_request"),
+            self._add_file_logger("app_responses.log", "app_response"),
+            self._add_file_logger("errors.log", "error"),
+        ]
+        for sink_id in previous_ids:
+            try:
+                logger.remove(sink_id)
+            except ValueError:
+                pass  # 이미 제거된 sink (logger.remove() 전체 호출 후)
+    
+    def _follow_period(self):
+        """
+        로테이션 주기가 바뀌거나 용량 예산 때문에 현재 기간이 나뉘면 파일 sink를 새 디렉토리로 전환
+        (이전 디렉토리는 더 이상 기록되지 않아 아카이브 가능)
+        """
+        now = time.time()
+        if now < self._next_period_check:
+            return
+        self._next_period_check = now + 1.0
+        if self.config.LOG_DIR / self.config.active_period_name(self.config.LOG_DIR) == self._period_dir:
+            return
+        with self._setup_lock:
+            if self.config.LOG_DIR / self.config.active_period_name(self.config.LOG_DIR) != self._period_dir:
+                self._add_file_loggers()
     
-    def _add_file_logger(self, filename: str, log_type: str):
+    def _add_file_logger(self, filename: str, log_type: str) -> int:
         """특정 로그 타입을 위한 파일 로거 추가"""
         period_dir = self._get_period_directory()
         log_path = period_dir / filename
         
-        logger.add(
+        return logger.add(
             sink=log_path,
             format=self.config.LOG_FORMAT,
             level=self.config.LOG_LEVEL,
@@ -41,17 +111,8 @@ class ApplicationLogger:
         )
     
     def _get_period_directory(self) -> Path:
-        """현재 로테이션 주기에 맞는 디렉토리 반환"""
-        now = datetime.now()
-        
-        if self.config.rotation_period.value == "daily":
-            period_name = now.strftime("%Y-%m-%d")
-        elif self.config.rotation_period.value == "weekly":
-            period_name = now.strftime("%Y-W%U")
-        else:  # monthly
-            period_name = now.strftime("%Y-%m")
-        
-        period_dir = self.config.LOG_DIR / period_name
+        """현재 로테이션 주기(나뉜 경우 마지막 하위 구간)에 맞는 디렉토리 반환"""
+        period_dir = self.config.LOG_DIR / self.config.active_period_name(self.config.LOG_DIR)
         period_dir.mkdir(exist_ok=True)
         return period_dir
     
@@ -59,28 +120,73 @@ class ApplicationLogger:
         """고유한 요청 ID 생성"""
         return str(uuid.uuid4())
     
+    def is_sampled(self, request_id: str) -> bool:
+        """LOG_SAMPLE_RATE 비율로 성공 요청 로그를 남길지 (request_id 기준이라 워커 간에도 같은 결정)"""
+        rate = self.config.LOG_SAMPLE_RATE
+        if rate >= 1:
+            return True
+        return zlib.crc32(request_id.encode("utf-8")) / 0x100000000 < rate
+    
+    def is_slow(self, processing_time_ms) -> bool:
+        return processing_time_ms is not None and processing_time_ms >= self.config.LOG_SLOW_REQUEST_MS
+    
+    def keep_request(self, request_id: str):
+        """보류 중인 api_request 로그 기록 (실패한 요청은 샘플링과 관계없이 남김)"""
+        with self._pending_lock:
+            line = self._pending.pop(request_id, None)
+        if line is not None:
+            logger.bind(log_type="api_request").info(line)
+    
+    def sampling_stats(self) -> dict:
+        return {"sample_rate": self.config.LOG_SAMPLE_RATE, "response_store": self.config.RESPONSE_STORE,
+                "pending": len(self._pending), **self.sampling_counts}
+    
     def log_api_request(self, request_id: str, endpoint: str, **kwargs):
-        """API 요청 로깅"""
+        """API 요청 로깅 (샘플링에서 제외된 요청은 결과를 알 때까지 보류)"""
+        self.setup()
         log_data = {
             "timestamp": datetime.now().isoformat(),
             "request_id": request_id,
             "endpoint": endpoint,
             **kwargs
         }
-        logger.bind(log_type="api_request").info(json.dumps(log_data, ensure_ascii=False))
+        line = self.serializer.dumps(log_data)
+        if self.is_sampled(request_id):
+            logger.bind(log_type="api_request").info(line)
+            return
+        with self._pending_lock:
+            self._pending[request_id] = line
+            while len(self._pending) > PENDING_MAX:
+                # 결과 로깅 없이 끝난 요청 (클라이언트 연결 끊김 등)
+                self._pending.popitem(last=False)
+                self.sampling_counts["api_request_dropped"] += 1
     
     def log_app_response(self, request_id: str, response_status: str, **kwargs):
-        """애플리케이션 응답 로깅"""
+        """애플리케이션 응답 로깅 (실패와 느린 요청은 항상, 정상 성공은 LOG_SAMPLE_RATE 비율로)"""
+        self.setup()
+        if response_status not in SAMPLED_STATUSES:
+            self.sampling_counts["kept_failure"] += 1
+        elif self.is_slow(kwargs.get("processing_time_ms")):
+            self.sampling_counts["kept_slow"] += 1
+        elif not self.is_sampled(request_id):
+            with self._pending_lock:
+                if self._pending.pop(request_id, None) is not None:
+                    self.sampling_counts["api_request_dropped"] += 1
+            self.sampling_counts["app_response_dropped"] += 1
+            return
+        self.keep_request(request_id)
         log_data = {
             "timestamp": datetime.now().isoformat(),
             "request_id": request_id,
             "response_status": response_status,
             **kwargs
         }
-        logger.bind(log_type="app_response").info(json.dumps(log_data, ensure_ascii=False))
+        logger.bind(log_type="app_response").info(self.serializer.dumps(log_data))
     
     def log_error(self, request_id: str, error_type: str, error_message: str, **kwargs):
         """에러 로깅"""
+        self.setup()
+        self.keep_request(request_id)
         log_data = {
             "timestamp": datetime.now().isoformat(),
             "request_id": request_id,
@@ -88,33 +194,54 @@ class ApplicationLogger:
             "error_message": error_message,
             **kwargs
         }
-        logger.bind(log_type="error").error(json.dumps(log_data, ensure_ascii=False))
+        logger.bind(log_type="error").error(self.serializer.dumps(log_data))
     
     def save_response_file(self, request_id: str, content: dict) -> Path:
-        """응답 데이터를 파일로 저장"""
+        """응답 데이터를 파일로 저장 (RESPONSE_STORE=hash|ref면 느린 요청 외에는 ocr_text 해시/참조만 저장)"""
+        self.config.ensure_directories()
         period_dir = self._get_response_directory()
+        store = self.config.RESPONSE_STORE
+        if store != "full" and self.is_slow(content.get("processing_time_ms")):
+            store = "full"
+        
+        if store == "ref":
+            # 응답 파일 없이 기간 디렉토리의 response_refs.jsonl에 한 줄 (request_id + 전체 응답 해시)
+            reference = {
+                "request_id": request_id,
+                "timestamp": content.get("timestamp"),
+                "tenant": content.get("tenant"),
+                "response_sha256": hashlib.sha256(self.serializer.dumps_bytes(content)).hexdigest(),
+            }
+            filepath = period_dir / "response_refs.jsonl"
+            with open(filepath, 'ab') as f:
+                f.write(self.serializer.dumps_bytes(reference) + b"\n")
+            self.sampling_counts["responses_referenced"] += 1
+            return filepath
+        
+        if store == "hash" and content.get("ocr_text"):
+            ocr_text = content["ocr_text"]
+            content = {**content, "ocr_text": None,
+                       "ocr_text_sha256": hashlib.sha256(ocr_text.encode("utf-8")).hexdigest(),
+                       "ocr_text_chars": len(ocr_text)}
+            self.sampling_counts["responses_hashed"] += 1
+        
         filename = f"response_{request_id}.json"
         filepath = period_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(content, f, ensure_ascii=False, indent=2)
+        with open(filepath, 'wb') as f:
+            f.write(self.serializer.dump_file(content))
         
         return filepath
     
     def _get_response_directory(self) -> Path:
-        """현재 로테이션 주기에 맞는 응답 디렉토리 반환"""
-        now = datetime.now()
-        
-        if self.config.rotation_period.value == "daily":
-            period_name = now.strftime("%Y-%m-%d")
-        elif self.config.rotation_period.value == "weekly":
-            period_name = now.strftime("%Y-W%U")
-        else:  # monthly
-            period_name = now.strftime("%Y-%m")
-        
-        period_dir = self.config.RESPONSE_DIR / period_name
-        period_dir.mkdir(exist_ok=True)
-        return period_dir
+        """현재 로테이션 주기(나뉜 경우 마지막 하위 구간)에 맞는 응답 디렉토리 반환"""
+        now = time.time()
+        if self._response_dir is None or now >= self._next_response_check:
+            period_dir = self.config.RESPONSE_DIR / self.config.active_period_name(self.config.RESPONSE_DIR)
+            period_dir.mkdir(exist_ok=True)
+            self._response_dir = period_dir
+            self._next_response_check = now + 1.0
+        return self._response_dir
 
 # Singleton pattern for logger
 _logger = None
@@ -0,0 +1,150 @@
+"""
+이벤트 루프 블로킹 감시
+
+    - heartbeat: 이벤트 루프에서 interval마다 깨어나는 작업. 예정보다 늦게 깨어난 만큼이 루프 지연(lag)
+    - monitor: 별도 스레드가 heartbeat가 threshold 이상 멈춘 것을 발견하면, 아직 블로킹 중인
+               이벤트 루프 스레드의 스택과 실행 중인 작업의 request_id를 캡처
+    - 루프가 다시 돌면 전체 블로킹 시간과 캡처한 스택을 errors.log에 EventLoopBlocked로 기록
+
+request_id는 핸들러에서 bind_request_id()로 contextvar에 설정하며, 그 요청에서 만든 하위 작업
+(asyncio.gather, create_task)에도 전달됩니다.
+"""
+
+import asyncio
+import contextvars
+import sys
+import threading
+import time
+import traceback
+import weakref
+from typing import Optional
+
+from loguru import logger
+from config import get_config
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+class LoopWatchdog:
+    """이벤트 루프 지연 측정과 블로킹 호출 스택 캡처"""
+
+    def __init__(self, threshold_ms: float):
+        self.threshold = threshold_ms / 1000
+        self.interval = max(0.005, self.threshold / 4)
+        self.blocked_count = 0
+        self.max_lag_ms = 0.0
+        self.last_lag_ms = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task_requests: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+        self._inner_factory = None
+        self._expected = 0.0  # 다음 heartbeat 예정 시각 (monotonic)
+        self._beat = 0  # heartbeat 순번 (같은 블로킹을 한 번만 캡처)
+        self._captured = None  # (beat, request_id, stack)
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        if self._monitor is not None:
+            return
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        # 하위 작업에도 request_id가 전달되도록 작업 생성 시 부모 context의 값을 기록
+        self._inner_factory = loop.get_task_factory()
+        loop.set_task_factory(self._task_factory)
+        self._expected = time.monotonic() + self.interval
+        self._heartbeat_task = loop.create_task(self._heartbeat())
+        self._stop.clear()
+        self._monitor = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._monitor.start()
+        logger.info(f"Event loop watchdog started (threshold {self.threshold * 1000:.0f}ms)")
+
+    def stop(self):
+        if self._monitor is None:
+            return
+        self._stop.set()
+        self._monitor.join(timeout=1)
+        self._monitor = None
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        self._loop.set_task_factory(self._inner_factory)
+
+    def bind_request_id(self, request_id: str):
+        """현재 요청 작업(과 이후 만드는 하위 작업)에 request_id 연결"""
+        request_id_var.set(request_id)
+        task = asyncio.current_task()
+        if task is not None:
+            self._task_requests[task] = request_id
+
+    def stats(self) -> dict:
+        return {
+            "blocked_count": self.blocked_count,
+            "last_lag_ms": round(self.last_lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "threshold_ms": round(self.threshold * 1000, 1),
+        }
+
+    def _task_factory(self, loop, coro, **kwargs):
+        if self._inner_factory is not None:
+            task = self._inner_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        request_id = request_id_var.get()
+        if request_id is not None:
+            self._task_requests[task] = request_id
+        return task
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - self._expected)
+            self._expected = now + self.interval
+            self._beat += 1
+            self.last_lag_ms = lag * 1000
+            self.max_lag_ms = max(self.max_lag_ms, self.last_lag_ms)
+            if lag >= self.threshold:
+                self._report(lag)
+
+    def _report(self, lag: float):
+        """루프가 다시 돌기 시작한 뒤 블로킹 기록 (monitor가 캡처한 스택 포함)"""
+        from logger import get_logger
+        self.blocked_count += 1
+        captured, self._captured = self._captured, None
+        request_id, stack = None, None
+        if captured is not None and captured[0] == self._beat - 1:
+            _, request_id, stack = captured
+        get_logger().log_error(
+            request_id=request_id or "-",
+            error_type="EventLoopBlocked",
+            error_message=f"Event loop blocked for {lag * 1000:.0f}ms",
+            blocked_ms=round(lag * 1000, 1),
+            stack=stack,
+        )
+
+    def _watch(self):
+        """monitor 스레드: 블로킹 중인 루프 스레드의 스택 캡처"""
+        while not self._stop.wait(self.interval):
+            beat = self._beat
+            if time.monotonic() - self._expected < self.threshold:
+                continue
+            if self._captured is not None and self._captured[0] == beat:
+                continue  # 이번 블로킹은 이미 캡처함
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            task = asyncio.current_task(self._loop)
+            request_id = self._task_requests.get(task) if task is not None else None
+            if self._beat == beat:  # 캡처하는 사이 루프가 재개되지 않았을 때만 유효
+                self._captured = (beat, request_id, stack)
+
+# Singleton pattern for loop watchdog
+_loop_watchdog = None
+
+def get_loop_watchdog() -> LoopWatchdog:
+    global _loop_watchdog
+    if _loop_watchdog is None:
+        _loop_watchdog = LoopWatchdog(get_config().LOOP_BLOCK_THRESHOLD_MS)
+    return _loop_watchdog
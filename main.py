@@ -1,74 +1,412 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Response
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
-from mistralai import Mistral
-import base64
+from loguru import logger
 import os
 import json
+import asyncio
+import hashlib
+import hmac
 import time
 import traceback
-import argparse
-from typing import Optional
+from typing import List, Optional
 from dotenv import load_dotenv
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
 
 # 로깅 시스템 임포트
-from config import set_config, get_config
+from config import get_config
+from serialization import get_serializer
 from logger import get_logger
 from file_rotator import get_file_rotator
+from timing import StageTimer
+from mistral_client import get_mistral_client
+from extraction import BusinessCardInfo, encode_image, build_extraction_prompt, build_vision_extraction_messages, extract_info_from_text
+from structured_output import StructuredOutputError, parse_business_card, response_format
+from speculative import race_extractions
+from prompt_compaction import compact_ocr_text, estimate_tokens
+from tenants import API_KEY_HEADER, QuotaExceededError, Tenant, get_tenant_registry
+from scheduler import LANES, PRIORITY_HEADER, get_scheduler
+from contact_index import get_contact_index, should_index
+from singleflight import get_single_flight
+from idempotency import IDEMPOTENCY_HEADER, MAX_KEY_LENGTH, NEW, COMPLETED, MISMATCH, get_idempotency_store
+from image_dedup import DuplicateMatch, get_duplicate_index
+from card_crop import CropResult, crop_card
+from ocr_backends import AUTO, LOCAL, MISTRAL, OCRResult, get_ocr_router, image_stats
+from loop_watchdog import get_loop_watchdog
+from profiler import FORMATS as PROFILE_FORMATS, ProfilerBusyError, get_profiler
+from url_fetcher import URLFetchError, get_url_fetcher, resolve_download_url, is_google_drive_url, filename_from_url
 
 load_dotenv()
 
-# 커맨드라인 인자 파싱
-parser = argparse.ArgumentParser()
-parser.add_argument("--env", choices=["dev", "production"], default="dev")
-parser.add_argument("--rotation", choices=["daily", "weekly", "monthly"])
-parser.add_argument("--port", type=int, default=8000)
-
-# FastAPI 실행 시 uvicorn이 인자를 추가로 전달할 수 있으므로 처리
-args, unknown = parser.parse_known_args()
+# 설정은 환경 변수(ENVIRONMENT, ROTATION_PERIOD)로 전달 (uvicorn main:app --workers N 지원)
+# python main.py --env ... 로 직접 실행한 경우에만 커맨드라인 인자를 환경 변수로 반영
+if __name__ == "__main__":
+    from launcher import parse_cli_to_env
+    args = parse_cli_to_env()
 
 # 설정 초기화
-config = set_config(env=args.env, rotation=args.rotation)
+config = get_config()
 app_logger = get_logger()
 file_rotator = get_file_rotator()
+url_fetcher = get_url_fetcher()
+tenant_registry = get_tenant_registry()
+scheduler = get_scheduler()
+duplicate_index = get_duplicate_index()
+contact_index = get_contact_index()
+single_flight = get_single_flight()
+idempotency_store = get_idempotency_store()
+ocr_router = get_ocr_router()
+profiler = get_profiler()
+loop_watchdog = get_loop_watchdog()
+
+def warm_up():
+    """무거운 구성 요소 초기화 (로그 sink, Mistral 클라이언트, 로테이션 스케줄러, 연락처 인덱스, 로컬 OCR 엔진 확인)"""
+    app_logger.setup()
+    get_mistral_client()
+    file_rotator.start()
+    contact_index.prepare()
+    if ocr_router.uses_local:
+        ocr_router.local.available  # tesseract 실행 파일/언어 팩 확인 (요청 처리 중 블로킹 방지)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 시작 시
-    file_rotator.start()
-    print(f"Started with {config.env.value} environment, {config.rotation_period.value} rotation")
+    if config.LAZY_INIT:
+        # /health를 바로 제공하고 초기화는 백그라운드에서 진행 (미완료 구성 요소는 첫 사용 시 생성)
+        asyncio.get_running_loop().run_in_executor(None, warm_up)
+    else:
+        warm_up()
+        await url_fetcher.start()
+    if config.LOOP_WATCHDOG:
+        loop_watchdog.start(asyncio.get_running_loop())
+    print(f"Started with {config.env.value} environment, {config.rotation_period.value} rotation (pid {os.getpid()})")
     yield
     # 종료 시
+    loop_watchdog.stop()
+    await url_fetcher.close()
     file_rotator.stop()
+    ocr_router.close()
+
+class FastJSONResponse(JSONResponse):
+    """설정된 직렬화기(orjson 등)로 본문을 만드는 JSON 응답"""
+
+    def render(self, content) -> bytes:
+        return get_serializer().dumps_bytes(content)
+
+app = FastAPI(title="Business Card OCR API", lifespan=lifespan, default_response_class=FastJSONResponse)
+
+class BusinessCardURLRequest(BaseModel):
+    url: str = Field(..., description="Image URL (Google Drive links supported)")
+    passthrough: Optional[bool] = Field(None, description="Pass the URL straight to Mistral OCR (default: server config)")
+
+def image_document(content: bytes, content_type: str) -> dict:
+    """이미지 bytes를 Mistral OCR document(data URL)로 변환"""
+    # Determine image type from content_type
+    image_type = content_type.split('/')[-1]  # e.g., 'jpeg', 'png'
+    return {
+        "type": "image_url",
+        "image_url": f"data:image/{image_type};base64,{encode_image(content)}"
+    }
+
+async def crop_for_ocr(timer: StageTimer, content: bytes, content_type: str) -> CropResult:
+    """명함 영역만 잘라 기울기를 보정한 OCR 입력 (CARD_CROP, 검출 신뢰도가 낮으면 원본 그대로)"""
+    if not config.CARD_CROP:
+        return CropResult(content, content_type, False)
+    with timer.stage("crop"):
+        return await asyncio.to_thread(crop_card, content, content_type, config.CARD_CROP_MIN_CONFIDENCE)
+
+def crop_log_fields(crop: CropResult, original_bytes: int) -> dict:
+    """응답 로그/파일에 기록할 명함 영역 검출 결과"""
+    return {"card_crop": crop.log_fields(original_bytes)} if config.CARD_CROP else {}
+
+def authenticate_tenant(request: Request) -> Tenant:
+    """X-API-Key 헤더로 테넌트 식별 후 요청 쿼터 검사"""
+    tenant = tenant_registry.authenticate(request.headers.get(API_KEY_HEADER))
+    if tenant is None:
+        raise HTTPException(status_code=401, detail="Invalid or missing API key",
+                            headers={"WWW-Authenticate": API_KEY_HEADER})
+    tenant_registry.admit(tenant)
+    return tenant
+
+ADMIN_KEY_HEADER = "X-Admin-Key"
+
+def authenticate_admin(request: Request):
+    """X-Admin-Key 헤더를 ADMIN_API_KEY와 비교 (미설정 시 관리자 엔드포인트는 404)"""
+    if not config.ADMIN_API_KEY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    key = request.headers.get(ADMIN_KEY_HEADER, "")
+    if not hmac.compare_digest(key.encode("utf-8"), config.ADMIN_API_KEY.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid or missing admin key",
+                            headers={"WWW-Authenticate": ADMIN_KEY_HEADER})
+
+def request_lane(request: Request, tenant: Tenant) -> str:
+    """X-Priority 헤더(없으면 테넌트 기본값)로 스케줄링 레인 결정"""
+    lane = request.headers.get(PRIORITY_HEADER, tenant.default_lane).strip().lower()
+    if lane not in LANES:
+        raise HTTPException(status_code=400, detail=f"{PRIORITY_HEADER} must be one of: {', '.join(LANES)}")
+    return lane
 
-app = FastAPI(title="Business Card OCR API", lifespan=lifespan)
+def tenant_log_fields(tenant: Tenant, lane: str) -> dict:
+    """api_requests.log에 기록할 테넌트 사용량"""
+    return {"tenant": tenant.name, "lane": lane, "tenant_usage": tenant_registry.usage(tenant, scheduler)}
 
-mistral_client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
+@asynccontextmanager
+async def upstream_slot(timer: StageTimer, tenant: Tenant, lane: str):
+    """공정 큐 스케줄러에서 업스트림 호출 슬롯 확보 (대기 시간은 queue 단계로 기록)"""
+    with timer.stage("queue"):
+        await scheduler.acquire(tenant, lane)
+    try:
+        yield
+    finally:
+        scheduler.release(tenant, lane)
+
+async def run_ocr(timer: StageTimer, tenant: Tenant, lane: str, document: dict) -> str:
+    """Mistral OCR 호출 후 텍스트 반환"""
+    async with upstream_slot(timer, tenant, lane):
+        with timer.stage("ocr"):
+            result = await ocr_router.mistral.recognize(document)
+    ocr_router.counts[MISTRAL] += 1
+    return result.text
+
+async def run_local_ocr(timer: StageTimer, content: bytes) -> OCRResult:
+    """로컬 OCR 엔진(프로세스 풀) 실행"""
+    with timer.stage("ocr_local"):
+        result = await ocr_router.local.recognize(content)
+    ocr_router.counts[LOCAL] += 1
+    return result
+
+async def run_image_ocr(request_id: str, timer: StageTimer, tenant: Tenant, lane: str,
+                        content: bytes, document: dict) -> OCRResult:
+    """이미지 OCR (OCR_BACKEND에 따라 로컬 엔진 우선 사용, Mistral 제한/장애 시 로컬 대체)"""
+    if ocr_router.mode != MISTRAL:
+        stats = None
+        if ocr_router.mode == AUTO and ocr_router.local.available:
+            with timer.stage("route"):
+                stats = await asyncio.to_thread(image_stats, content)
+        if ocr_router.route(stats, scheduler.queued) == LOCAL:
+            result = await run_local_ocr(timer, content)
+            if ocr_router.accept(result):
+                return result
+            logger.info(f"[{request_id}] Low-confidence local OCR ({result.confidence}), retrying with Mistral")
+    
+    try:
+        return OCRResult(await run_ocr(timer, tenant, lane, document), MISTRAL)
+    except Exception as e:
+        if not ocr_router.can_fallback(e):
+            raise
+        logger.warning(f"[{request_id}] Mistral OCR unavailable ({type(e).__name__}: {str(e)}), falling back to local OCR")
+        ocr_router.counts["fallback"] += 1
+        return await run_local_ocr(timer, content)
 
-class BusinessCardInfo(BaseModel):
-    company: Optional[str] = Field(None, description="Company or organization name")
-    position: Optional[str] = Field(None, description="Job title or position")
-    name: Optional[str] = Field(None, description="Person's full name")
-    phone: Optional[str] = Field(None, description="Phone number")
-    email: Optional[str] = Field(None, description="Email address")
+def ocr_log_fields(result: OCRResult) -> dict:
+    """응답 로그/파일에 기록할 OCR 백엔드 정보"""
+    fields = {"ocr_backend": result.backend}
+    if result.confidence is not None:
+        fields["ocr_confidence"] = result.confidence
+    return fields
 
-def encode_image(image_bytes: bytes) -> str:
-    """Encode image bytes to base64."""
-    return base64.b64encode(image_bytes).decode('utf-8')
+async def run_chat(timer: StageTimer, tenant: Tenant, lane: str, model: str, messages: List[dict],
+                   stage: str = "chat") -> str:
+    """구조화 출력 chat 호출 후 응답 본문 반환"""
+    async with upstream_slot(timer, tenant, lane):
+        with timer.stage(stage):
+            chat_response = await get_mistral_client().chat.complete_async(
+                model=model,
+                messages=messages,
+                response_format=response_format(config.STRUCTURED_OUTPUT)
+            )
+    return chat_response.choices[0].message.content
+
+def build_chat_prompt(timer: StageTimer, ocr_text: str) -> tuple:
+    """Create prompt for structured extraction (텍스트가 아닌 요소 제거 + 토큰 예산 적용)"""
+    with timer.stage("prompt"):
+        prompt_text, prompt_stats = compact_ocr_text(ocr_text, config.PROMPT_MAX_TOKENS)
+        prompt = build_extraction_prompt(prompt_text)
+        prompt_stats["prompt_tokens_est"] = estimate_tokens(prompt)
+    return prompt, prompt_stats
+
+def parse_extraction(timer: StageTimer, content: str, stage: str = "parse") -> BusinessCardInfo:
+    """chat 응답(JSON)을 BusinessCardInfo로 변환 (스키마를 벗어난 출력은 로컬에서 복구)"""
+    with timer.stage(stage):
+        return parse_business_card(content)
+
+async def complete_extraction(request_id: str, timer: StageTimer, tenant: Tenant, lane: str, ocr_text: str,
+                              file_name: str, **log_fields) -> BusinessCardInfo:
+    """OCR 텍스트에서 구조화된 정보 추출, 응답 파일 저장 및 응답 로깅"""
+    prompt, prompt_stats = build_chat_prompt(timer, ocr_text)
+    
+    # Use chat API to extract structured information
+    content = await run_chat(timer, tenant, lane, "mistral-large-latest", [{"role": "user", "content": prompt}])
+    
+    try:
+        business_card_info = parse_extraction(timer, content)
+    except StructuredOutputError as e:
+        # 복구 불가능한 출력이면 재요청 대신 OCR 텍스트에서 정규식으로 추출
+        logger.warning(f"[{request_id}] Unparseable chat output, falling back to regex extraction: {str(e)}")
+        with timer.stage("parse_fallback"):
+            business_card_info = extract_info_from_text(ocr_text)
+        log_fields["parse_fallback"] = "regex"
+    record_success(request_id, timer, business_card_info, file_name, ocr_text,
+                   tenant=tenant.name, lane=lane, **prompt_stats, **log_fields)
+    return business_card_info
+
+def record_success(request_id: str, timer: StageTimer, business_card_info: BusinessCardInfo,
+                   file_name: str, ocr_text: Optional[str], **log_fields):
+    """응답 파일 저장 및 응답 로깅"""
+    # 처리 시간 계산
+    processing_time = timer.total_ms()
+    
+    # 응답 데이터 저장
+    with timer.stage("save"):
+        response_data = {
+            "request_id": request_id,
+            "timestamp": time.time(),
+            "file_name": file_name,
+            "ocr_text": ocr_text,
+            "extracted_data": business_card_info.dict(),
+            "processing_time_ms": round(processing_time, 2),
+            "stage_timings_ms": timer.as_dict(),
+            **log_fields
+        }
+        response_file_path = app_logger.save_response_file(request_id, response_data)
+        if should_index(response_data):  # 합류한 요청은 선행 요청이 이미 색인함
+            contact_index.add(log_fields.get("tenant", "default"), request_id, business_card_info.dict())
+    
+    # 응답 로깅 (저장 단계까지 포함한 단계별 시간)
+    app_logger.log_app_response(
+        request_id=request_id,
+        response_status="success",
+        response_file=str(response_file_path.name),
+        processing_time_ms=round(processing_time, 2),
+        stage_timings_ms=timer.as_dict(),
+        extracted_fields=len([v for v in business_card_info.dict().values() if v]),
+        **log_fields
+    )
+
+async def check_duplicate(timer: StageTimer, tenant: Tenant, content: bytes) -> tuple:
+    """같은 테넌트가 처리한 근접 중복 이미지 조회 (DEDUP_MODE=off면 건너뜀), (fingerprint, match) 반환"""
+    if config.DEDUP_MODE == "off":
+        return None, None
+    with timer.stage("dedup"):
+        return await asyncio.to_thread(duplicate_index.check, tenant.name, content)
+
+def duplicate_log_fields(duplicate: Optional[DuplicateMatch], served: bool) -> dict:
+    """응답 로그/파일에 기록할 근접 중복 정보"""
+    if duplicate is None:
+        return {}
+    return {
+        "duplicate_of": duplicate.request_id,
+        "duplicate_distance": {"dhash": duplicate.dhash_distance, "phash": duplicate.phash_distance},
+        "duplicate_served": served,
+    }
+
+def serve_duplicate(request_id: str, timer: StageTimer, response: Response, duplicate: DuplicateMatch,
+                    file_name: str, **log_fields) -> BusinessCardInfo:
+    """근접 중복 이미지에 저장된 결과 반환 (Mistral 호출 없음)"""
+    business_card_info = BusinessCardInfo(**duplicate.extracted_data)
+    record_success(request_id, timer, business_card_info, file_name, None,
+                   **duplicate_log_fields(duplicate, served=True), **log_fields)
+    response.headers["X-Duplicate-Of"] = duplicate.request_id
+    response.headers["Server-Timing"] = timer.server_timing_header()
+    return business_card_info
+
+async def claim_idempotency_key(request_id: str, timer: StageTimer, tenant: Tenant, key: str,
+                                fingerprint: str) -> Optional[dict]:
+    """
+    Idempotency-Key 선점 (이 요청이 처리하면 None, 저장된 응답이 있으면 그 기록 반환)
+    
+    같은 키가 처리 중이면 완료될 때까지 기다리고, 원래 요청이 실패했으면 다시 선점을 시도합니다.
+    """
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters")
+    with timer.stage("idempotency"):
+        while True:
+            state, record = await asyncio.to_thread(idempotency_store.begin, tenant.name, key, fingerprint, request_id)
+            if state == NEW:
+                return None
+            if state == COMPLETED:
+                return record
+            if state == MISMATCH:
+                raise HTTPException(status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used with a different request")
+            try:
+                record = await idempotency_store.wait(tenant.name, key)
+            except TimeoutError as e:
+                raise HTTPException(status_code=409, detail=str(e))
+            if record is not None:
+                return record
+
+def replay_response(request_id: str, timer: StageTimer, record: dict) -> FastJSONResponse:
+    """저장된 Idempotency-Key 응답 반환 (응답 파일은 새로 만들지 않음)"""
+    app_logger.log_app_response(
+        request_id=request_id,
+        response_status="replayed",
+        replayed_from=record["request_id"],
+        processing_time_ms=round(timer.total_ms(), 2),
+        stage_timings_ms=timer.as_dict()
+    )
+    return FastJSONResponse(
+        content=record["body"],
+        status_code=record["status_code"],
+        headers={
+            "Idempotent-Replayed": "true",
+            "X-Original-Request-Id": record["request_id"],
+            "Server-Timing": timer.server_timing_header(),
+        }
+    )
+
+def is_rejection(e: Exception) -> bool:
+    """서버 오류가 아닌 요청 거절 (트레이스백 없이 응답 로그에만 기록)"""
+    if isinstance(e, URLFetchError):
+        return e.status_code < 500
+    return isinstance(e, QuotaExceededError)
+
+def processing_error(request_id: str, timer: StageTimer, e: Exception) -> HTTPException:
+    """처리 중 예외를 로깅하고 클라이언트에 반환할 HTTPException 생성"""
+    headers = {"Server-Timing": timer.server_timing_header()}
+    if is_rejection(e):
+        # 부하 시 쿼터 초과가 몰려도 errors.log에 스택 트레이스가 쌓이지 않도록 응답 로그 한 줄만 남김
+        app_logger.log_app_response(
+            request_id=request_id,
+            response_status="rejected",
+            error_type=type(e).__name__,
+            error_message=str(e),
+            processing_time_ms=round(timer.total_ms(), 2),
+            stage_timings_ms=timer.as_dict()
+        )
+    else:
+        app_logger.log_error(
+            request_id=request_id,
+            error_type=type(e).__name__,
+            error_message=str(e),
+            stage_timings_ms=timer.as_dict(),
+            traceback=traceback.format_exc()
+        )
+    if isinstance(e, QuotaExceededError):
+        headers["Retry-After"] = str(max(1, round(e.retry_after)))
+        return HTTPException(status_code=429, detail=str(e), headers=headers)
+    if isinstance(e, URLFetchError):
+        return HTTPException(status_code=e.status_code, detail=str(e), headers=headers)
+    if isinstance(e, (json.JSONDecodeError, StructuredOutputError)):
+        return HTTPException(status_code=500, detail=f"Failed to parse AI response: {str(e)}", headers=headers)
+    return HTTPException(status_code=500, detail=f"Error processing image: {str(e)}", headers=headers)
 
 @app.post("/ocr/business-card", response_model=BusinessCardInfo)
-async def extract_business_card(request: Request, file: UploadFile = File(...)):
+async def extract_business_card(request: Request, response: Response, file: UploadFile = File(...)):
     # 요청 ID 생성
     request_id = app_logger.generate_request_id()
-    start_time = time.time()
+    loop_watchdog.bind_request_id(request_id)
+    timer = StageTimer()
     
     try:
         if not file.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="Only image files are supported")
         
+        tenant = authenticate_tenant(request)
+        lane = request_lane(request, tenant)
+        
         # Read file content
-        content = await file.read()
+        with timer.stage("read"):
+            content = await file.read()
         file_size_mb = len(content) / (1024 * 1024)
         
         # 요청 로깅
@@ -79,107 +417,289 @@ async def extract_business_card(request: Request, file: UploadFile = File(...)):
             client_ip=request.client.host if request.client else "unknown",
             file_name=file.filename,
             file_size_mb=round(file_size_mb, 2),
-            content_type=file.content_type
+            content_type=file.content_type,
+            idempotency_key=request.headers.get(IDEMPOTENCY_HEADER),
+            **tenant_log_fields(tenant, lane)
         )
         
-        # Encode image to base64
-        base64_image = encode_image(content)
+        content_hash = hashlib.sha256(content).hexdigest()
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if idempotency_key:
+            record = await claim_idempotency_key(request_id, timer, tenant, idempotency_key, content_hash)
+            if record is not None:
+                return replay_response(request_id, timer, record)
         
-        # Determine image type from content_type
-        image_type = file.content_type.split('/')[-1]  # e.g., 'jpeg', 'png'
+        async def extract() -> BusinessCardInfo:
+            fingerprint, duplicate = await check_duplicate(timer, tenant, content)
+            if duplicate is not None and config.DEDUP_MODE == "serve":
+                return serve_duplicate(request_id, timer, response, duplicate, file.filename,
+                                       tenant=tenant.name, lane=lane)
+            
+            # 명함 영역만 잘라 OCR 입력 크기를 줄임 (중복/멱등성 판단은 원본 기준)
+            crop = await crop_for_ocr(timer, content, file.content_type)
+            
+            # Encode image to base64
+            with timer.stage("encode"):
+                document = image_document(crop.content, crop.content_type)
+            
+            # OCR (Mistral 또는 로컬 엔진)
+            ocr = await run_image_ocr(request_id, timer, tenant, lane, crop.content, document)
+            business_card_info = await complete_extraction(
+                request_id, timer, tenant, lane, ocr.text, file.filename,
+                **ocr_log_fields(ocr), **crop_log_fields(crop, len(content)),
+                **duplicate_log_fields(duplicate, served=False)
+            )
+            if fingerprint is not None:
+                duplicate_index.add(tenant.name, fingerprint, request_id, business_card_info.dict())
+            
+            if duplicate is not None:
+                response.headers["X-Duplicate-Of"] = duplicate.request_id
+            return business_card_info
         
-        # Use OCR API with base64 encoded image
-        ocr_response = mistral_client.ocr.process(
-            model="mistral-ocr-latest",
-            document={
-                "type": "image_url",
-                "image_url": f"data:image/{image_type};base64,{base64_image}"
-            },
-            include_image_base64=True
-        )
+        try:
+            if not config.COALESCE_INFLIGHT:
+                business_card_info = await extract()
+            else:
+                # 같은 이미지가 처리 중이면 (클라이언트 재전송) 진행 중인 결과를 공유
+                content_key = f"{tenant.name}:{content_hash}"
+                waiting = timer.stage("coalesce") if single_flight.is_running(content_key) else nullcontext()
+                with waiting:
+                    business_card_info, leader_id = await single_flight.run(content_key, request_id, extract)
+                if leader_id != request_id:
+                    record_success(request_id, timer, business_card_info, file.filename, None,
+                                   tenant=tenant.name, lane=lane, coalesced_with=leader_id)
+                    response.headers["X-Coalesced-With"] = leader_id
+            if idempotency_key:
+                await idempotency_store.complete(tenant.name, idempotency_key, content_hash, request_id,
+                                                 200, business_card_info.dict())
+        except BaseException:
+            if idempotency_key:
+                await asyncio.shield(idempotency_store.abandon(tenant.name, idempotency_key, request_id))
+            raise
         
-        # Extract text from response
-        ocr_text = ocr_response.content if hasattr(ocr_response, 'content') else str(ocr_response)
+        response.headers["Server-Timing"] = timer.server_timing_header()
+        return business_card_info
         
-        # Create prompt for structured extraction
-        prompt = f"""Extract business card information from the following text.
-Return a JSON object with these fields:
-- company: Company or organization name
-- position: Job title or position
-- name: Person's full name
-- phone: Phone number
-- email: Email address
-
-If any field is not found, use null.
-
-Text from business card:
-{ocr_text}
+    except HTTPException as e:
+        app_logger.keep_request(request_id)
+        e.headers = {**(e.headers or {}), "Server-Timing": timer.server_timing_header()}
+        raise
+    except Exception as e:
+        raise processing_error(request_id, timer, e)
 
-Return only valid JSON, no additional text."""
+@app.post("/ocr/business-card/url", response_model=BusinessCardInfo)
+async def extract_business_card_from_url(request: Request, response: Response, body: BusinessCardURLRequest):
+    """이미지 URL로 명함 정보 추출 (클라이언트 다운로드/재업로드 불필요)"""
+    request_id = app_logger.generate_request_id()
+    loop_watchdog.bind_request_id(request_id)
+    timer = StageTimer()
+    passthrough = config.URL_PASSTHROUGH if body.passthrough is None else body.passthrough
+    
+    try:
+        tenant = authenticate_tenant(request)
+        lane = request_lane(request, tenant)
         
-        # Use chat API to extract structured information
-        chat_response = mistral_client.chat.complete(
-            model="mistral-large-latest",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
+        app_logger.log_api_request(
+            request_id=request_id,
+            endpoint="/ocr/business-card/url",
+            method="POST",
+            client_ip=request.client.host if request.client else "unknown",
+            source_url=body.url,
+            passthrough=passthrough,
+            **tenant_log_fields(tenant, lane)
         )
         
-        # Parse the JSON response
-        extracted_data = json.loads(chat_response.choices[0].message.content)
+        download_url = resolve_download_url(body.url)
         
-        # Create and return BusinessCardInfo
-        business_card_info = BusinessCardInfo(**extracted_data)
+        ocr_text = None
+        fetch_mode = "server_fetch"
+        ocr_fields = {"ocr_backend": MISTRAL}
         
-        # 처리 시간 계산
-        processing_time = (time.time() - start_time) * 1000  # ms
+        # Google Drive는 확인 페이지/리다이렉트가 있어 항상 서버에서 가져옴
+        if passthrough and not is_google_drive_url(body.url):
+            try:
+                ocr_text = await run_ocr(timer, tenant, lane, {"type": "image_url", "image_url": download_url})
+                fetch_mode = "passthrough"
+            except QuotaExceededError:
+                raise
+            except Exception as e:
+                logger.warning(f"[{request_id}] OCR URL passthrough failed, fetching server-side: {str(e)}")
         
-        # 응답 데이터 저장
-        response_data = {
-            "request_id": request_id,
-            "timestamp": time.time(),
-            "file_name": file.filename,
-            "ocr_text": ocr_text,
-            "extracted_data": business_card_info.dict(),
-            "processing_time_ms": round(processing_time, 2)
-        }
-        response_file_path = app_logger.save_response_file(request_id, response_data)
+        if ocr_text is None:
+            with timer.stage("fetch"):
+                content, content_type = await url_fetcher.fetch(body.url)
+            crop = await crop_for_ocr(timer, content, content_type)
+            with timer.stage("encode"):
+                document = image_document(crop.content, crop.content_type)
+            ocr = await run_image_ocr(request_id, timer, tenant, lane, crop.content, document)
+            ocr_text, ocr_fields = ocr.text, {**ocr_log_fields(ocr), **crop_log_fields(crop, len(content))}
         
-        # 응답 로깅
-        app_logger.log_app_response(
-            request_id=request_id,
-            response_status="success",
-            response_file=str(response_file_path.name),
-            processing_time_ms=round(processing_time, 2),
-            extracted_fields=len([v for v in business_card_info.dict().values() if v])
+        business_card_info = await complete_extraction(
+            request_id, timer, tenant, lane, ocr_text, filename_from_url(body.url),
+            source_url=body.url, fetch_mode=fetch_mode, **ocr_fields
         )
         
+        response.headers["Server-Timing"] = timer.server_timing_header()
         return business_card_info
         
-    except json.JSONDecodeError as e:
-        app_logger.log_error(
-            request_id=request_id,
-            error_type="JSONDecodeError",
-            error_message=str(e),
-            traceback=traceback.format_exc()
-        )
-        raise HTTPException(status_code=500, detail=f"Failed to parse AI response: {str(e)}")
+    except HTTPException as e:
+        app_logger.keep_request(request_id)
+        e.headers = {**(e.headers or {}), "Server-Timing": timer.server_timing_header()}
+        raise
     except Exception as e:
-        app_logger.log_error(
+        raise processing_error(request_id, timer, e)
+
+@app.post("/ocr/business-card/speculative", response_model=BusinessCardInfo)
+async def extract_business_card_speculative(request: Request, response: Response, file: UploadFile = File(...)):
+    """
+    지연 시간 우선 모드: OCR→chat 경로와 vision 직접 추출 경로를 동시에 실행
+    
+    한 경로가 모든 필드를 채우면 즉시 반환하고, 아니면 병합 대기 시간 내에 끝난 결과를 필드 단위로 병합합니다.
+    """
+    request_id = app_logger.generate_request_id()
+    loop_watchdog.bind_request_id(request_id)
+    timer = StageTimer()
+    
+    try:
+        if not file.content_type.startswith("image/"):
+            raise HTTPException(status_code=400, detail="Only image files are supported")
+        
+        tenant = authenticate_tenant(request)
+        lane = request_lane(request, tenant)
+        
+        with timer.stage("read"):
+            content = await file.read()
+        
+        app_logger.log_api_request(
             request_id=request_id,
-            error_type=type(e).__name__,
-            error_message=str(e),
-            traceback=traceback.format_exc()
+            endpoint="/ocr/business-card/speculative",
+            method="POST",
+            client_ip=request.client.host if request.client else "unknown",
+            file_name=file.filename,
+            file_size_mb=round(len(content) / (1024 * 1024), 2),
+            content_type=file.content_type,
+            **tenant_log_fields(tenant, lane)
         )
-        raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
+        
+        fingerprint, duplicate = await check_duplicate(timer, tenant, content)
+        if duplicate is not None and config.DEDUP_MODE == "serve":
+            return serve_duplicate(request_id, timer, response, duplicate, file.filename,
+                                   tenant=tenant.name, lane=lane, strategy="speculative")
+        
+        crop = await crop_for_ocr(timer, content, file.content_type)
+        with timer.stage("encode"):
+            document = image_document(crop.content, crop.content_type)
+        
+        path_state = {}
+        
+        async def ocr_chat_path() -> BusinessCardInfo:
+            ocr = await run_image_ocr(request_id, timer, tenant, lane, crop.content, document)
+            path_state["ocr_text"], path_state["ocr_fields"] = ocr.text, ocr_log_fields(ocr)
+            prompt, path_state["prompt_stats"] = build_chat_prompt(timer, path_state["ocr_text"])
+            chat_content = await run_chat(timer, tenant, lane, "mistral-large-latest",
+                                          [{"role": "user", "content": prompt}])
+            return parse_extraction(timer, chat_content)
+        
+        async def vision_path() -> BusinessCardInfo:
+            content = await run_chat(timer, tenant, lane, "pixtral-large-latest",
+                                     build_vision_extraction_messages(document["image_url"]), stage="vision")
+            return parse_extraction(timer, content, stage="vision_parse")
+        
+        outcome = await race_extractions(
+            {"ocr_chat": ocr_chat_path, "vision": vision_path},
+            merge_window=config.SPECULATIVE_MERGE_WINDOW_MS / 1000,
+            priority=["ocr_chat", "vision"]
+        )
+        business_card_info = outcome["result"]
+        
+        record_success(
+            request_id, timer, business_card_info, file.filename, path_state.get("ocr_text"),
+            tenant=tenant.name,
+            lane=lane,
+            strategy="speculative",
+            winner=outcome["winner"],
+            merged_fields=outcome["merged_fields"],
+            path_status=outcome["path_status"],
+            path_latency_ms=outcome["path_latency_ms"],
+            **path_state.get("prompt_stats", {}),
+            **path_state.get("ocr_fields", {}),
+            **crop_log_fields(crop, len(content)),
+            **duplicate_log_fields(duplicate, served=False)
+        )
+        if fingerprint is not None:
+            duplicate_index.add(tenant.name, fingerprint, request_id, business_card_info.dict())
+        
+        if duplicate is not None:
+            response.headers["X-Duplicate-Of"] = duplicate.request_id
+        response.headers["Server-Timing"] = timer.server_timing_header()
+        return business_card_info
+        
+    except HTTPException as e:
+        app_logger.keep_request(request_id)
+        e.headers = {**(e.headers or {}), "Server-Timing": timer.server_timing_header()}
+        raise
+    except Exception as e:
+        raise processing_error(request_id, timer, e)
+
+@app.get("/contacts/lookup")
+async def lookup_contact(request: Request, email: Optional[str] = None, phone: Optional[str] = None,
+                         name: Optional[str] = None, company: Optional[str] = None):
+    """이미 처리된 연락처인지 조회 (정규화된 email, E.164 전화번호, 이름+회사 기준)"""
+    try:
+        tenant = authenticate_tenant(request)
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=429, detail=str(e),
+                            headers={"Retry-After": str(max(1, round(e.retry_after)))})
+    
+    if not (email or phone or (name and company)):
+        raise HTTPException(status_code=400, detail="Provide email, phone, or name and company")
+    
+    return await asyncio.to_thread(contact_index.lookup, tenant.name, email, phone, name, company)
+
+@app.get("/admin/profile")
+async def profile_process(request: Request, seconds: float = 10.0, format: str = "collapsed",
+                          interval_ms: float = 10.0, include_idle: bool = False):
+    """N초 동안 이 워커 프로세스를 프로파일링 (collapsed: 전체 스레드 샘플링, pstats: 이벤트 루프 cProfile 덤프)"""
+    authenticate_admin(request)
+    if not 0 < seconds <= config.PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {config.PROFILE_MAX_SECONDS}")
+    if format not in PROFILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(PROFILE_FORMATS)}")
+    if not 1 <= interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="interval_ms must be between 1 and 1000")
+    
+    logger.info(f"Profiling pid {os.getpid()} for {seconds}s ({format})")
+    try:
+        result = await profiler.profile(seconds, format, interval_ms / 1000, include_idle)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    headers = {"X-Profile-Pid": str(os.getpid()), "X-Profile-Seconds": str(result.seconds)}
+    if result.format == "pstats":
+        headers["Content-Disposition"] = f'attachment; filename="profile-{os.getpid()}-{int(time.time())}.prof"'
+        return Response(content=result.body, media_type="application/octet-stream", headers=headers)
+    headers["X-Profile-Samples"] = str(result.samples)
+    return Response(content=result.body, media_type="text/plain; charset=utf-8", headers=headers)
 
 @app.get("/")
 async def root():
-    return {"message": "Business Card OCR API", "endpoint": "/ocr/business-card"}
+    return {
+        "message": "Business Card OCR API",
+        "endpoint": "/ocr/business-card",
+        "url_endpoint": "/ocr/business-card/url",
+        "speculative_endpoint": "/ocr/business-card/speculative",
+        "contact_lookup_endpoint": "/contacts/lookup"
+    }
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "event_loop": loop_watchdog.stats(), "logging": app_logger.sampling_stats()}
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=args.port)
\ No newline at end of file
+    if args.workers and args.workers > 1:
+        # 멀티 워커는 각 워커 프로세스가 main:app을 임포트해야 하므로 앱 객체 대신 경로 전달
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers,
+                    timeout_graceful_shutdown=args.graceful_timeout)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port, timeout_graceful_shutdown=args.graceful_timeout)
\ No newline at end of file
@@ -1,17 +1,18 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
-from mistralai import Mistral
 import base64
-import os
 from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from ocr_backends import get_ocr_router
+
 app = FastAPI(title="Business Card OCR API - OCR Only")
 
-mistral_client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
+# OCR_BACKEND=local이면 로컬 Tesseract 엔진만 사용 (네트워크 없는 테스트/벤치마크 경로), auto면 이미지별 라우팅
+ocr_router = get_ocr_router()
 
 class OCRResponse(BaseModel):
     text: str = Field(..., description="Extracted text from OCR")
@@ -37,31 +38,20 @@ async def extract_text_only(file: UploadFile = File(...)):
         # Determine image type from content_type
         image_type = file.content_type.split('/')[-1]  # e.g., 'jpeg', 'png'
         
-        # Use OCR API to extract text
-        print(f"🔍 Processing image with OCR API...")
-        ocr_response = mistral_client.ocr.process(
-            model="mistral-ocr-latest",
-            document={
-                "type": "image_url",
-                "image_url": f"data:image/{image_type};base64,{base64_image}"
-            },
-            include_image_base64=True
-        )
-        
-        # Extract text from response
-        ocr_text = ocr_response.content if hasattr(ocr_response, 'content') else str(ocr_response)
-        
-        # Get confidence if available
-        confidence = None
-        if hasattr(ocr_response, 'confidence'):
-            confidence = ocr_response.confidence
+        # Use OCR backend to extract text
+        print(f"🔍 Processing image with {ocr_router.mode} OCR backend...")
+        document = {
+            "type": "image_url",
+            "image_url": f"data:image/{image_type};base64,{base64_image}"
+        }
+        result = await ocr_router.recognize(content, document)
         
-        print(f"✅ OCR extraction complete")
-        print(f"📝 Extracted text length: {len(ocr_text)} characters")
+        print(f"✅ OCR extraction complete ({result.backend})")
+        print(f"📝 Extracted text length: {len(result.text)} characters")
         
         return OCRResponse(
-            text=ocr_text,
-            confidence=confidence
+            text=result.text,
+            confidence=result.confidence
         )
         
     except Exception as e:
@@ -11,7 +11,7 @@ load_dotenv()
 
 app = FastAPI(title="Business Card OCR API - Vision Model Only")
 
-mistral_client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
+mistral_client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"), server_url=os.getenv("MISTRAL_SERVER_URL"))
 
 class VisionResponse(BaseModel):
     text: str = Field(..., description="Extracted text from Vision model")
@@ -0,0 +1,18 @@
+import os
+import threading
+
+# Singleton pattern for Mistral client (mistralai는 임포트 비용이 커서 첫 사용 시 로드)
+_mistral_client = None
+_lock = threading.Lock()
+
+def get_mistral_client():
+    global _mistral_client
+    if _mistral_client is None:
+        with _lock:
+            if _mistral_client is None:
+                from mistralai import Mistral
+                _mistral_client = Mistral(
+                    api_key=os.getenv("MISTRAL_API_KEY"),
+                    server_url=os.getenv("MISTRAL_SERVER_URL")
+                )
+    return _mistral_client
@@ -0,0 +1,268 @@
+"""
+OCR 백엔드와 요청별 라우팅
+
+    - mistral: Mistral OCR API (mistral-ocr-latest)
+    - local: Tesseract (pytesseract, 기본 kor+eng 언어 팩), 워커 프로세스마다 프로세스 풀에서 실행, 네트워크 호출 없음
+
+OCR_BACKEND 설정:
+    - mistral (기본값): 모든 요청을 Mistral로 처리
+    - local: 모든 이미지를 로컬 엔진으로 처리 (테스트/벤치마크용 네트워크 없는 경로)
+    - auto: 대비가 높고 크지 않은 이미지와 Mistral 대기열이 길 때는 로컬 엔진을 먼저 사용하고,
+            로컬 결과의 신뢰도가 낮으면 Mistral로 다시 처리
+OCR_FALLBACK_LOCAL이 켜져 있으면 Mistral이 제한(429, 대기열 초과)되거나 응답하지 못할 때(5xx, 타임아웃) 로컬 엔진으로 대체합니다.
+
+로컬 엔진은 선택 의존성입니다: pip install pytesseract, apt install tesseract-ocr tesseract-ocr-kor
+"""
+
+import asyncio
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+from config import get_config
+
+MISTRAL = "mistral"
+LOCAL = "local"
+AUTO = "auto"
+OCR_MODES = (MISTRAL, LOCAL, AUTO)
+
+# 업스트림이 일시적으로 처리할 수 없는 상태로 보는 HTTP 상태 코드
+UNAVAILABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+class OCRBackendError(Exception):
+    """OCR 백엔드를 사용할 수 없음 (로컬 엔진 미설치 등)"""
+
+class OCRResult:
+    """OCR 결과 (confidence: 0~1, 백엔드가 제공하지 않으면 None)"""
+
+    __slots__ = ("text", "backend", "confidence")
+
+    def __init__(self, text: str, backend: str, confidence: Optional[float] = None):
+        self.text = text
+        self.backend = backend
+        self.confidence = confidence
+
+class ImageStats:
+    """라우팅에 사용하는 이미지 특성"""
+
+    __slots__ = ("pixels", "contrast")
+
+    def __init__(self, pixels: int, contrast: float):
+        self.pixels = pixels
+        self.contrast = contrast  # 그레이스케일 표준편차 (0~127)
+
+def image_stats(content: bytes) -> Optional[ImageStats]:
+    """이미지 크기와 대비 (축소 디코딩, 디코딩할 수 없으면 None)"""
+    from PIL import Image, ImageStat
+    try:
+        image = Image.open(io.BytesIO(content))
+        pixels = image.width * image.height
+        image.draft("L", (256, 256))
+        image = image.convert("L")
+        image.thumbnail((256, 256))
+    except Exception:
+        return None
+    return ImageStats(pixels, ImageStat.Stat(image).stddev[0])
+
+class MistralOCRBackend:
+    """Mistral OCR API (동시 호출 제한은 호출하는 쪽의 스케줄러가 담당)"""
+
+    name = MISTRAL
+
+    async def recognize(self, document: dict) -> OCRResult:
+        from mistral_client import get_mistral_client
+        from prompt_compaction import ocr_response_text
+        ocr_response = await get_mistral_client().ocr.process_async(
+            model="mistral-ocr-latest",
+            document=document,
+            include_image_base64=False  # 이미지 데이터는 사용하지 않으므로 응답 크기를 줄임
+        )
+        return OCRResult(ocr_response_text(ocr_response), self.name)
+
+def _tesseract_recognize(content: bytes, languages: str, max_side: int) -> Tuple[str, Optional[float]]:
+    """프로세스 풀 작업: 이미지 bytes -> (줄 단위 텍스트, 평균 단어 신뢰도 0~1)"""
+    import pytesseract
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(content))).convert("L")
+    # Tesseract는 글자 높이 20~30px에서 가장 정확: 작은 명함 이미지는 확대, 큰 사진은 축소
+    longest = max(image.size)
+    if longest < 1200:
+        scale = 1200 / longest
+        image = image.resize((round(image.width * scale), round(image.height * scale)), Image.LANCZOS)
+    elif longest > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    data = pytesseract.image_to_data(image, lang=languages, output_type=pytesseract.Output.DICT)
+    lines: Dict[tuple, list] = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        word = word.strip()
+        confidence = float(data["conf"][i])
+        if not word or confidence < 0:
+            continue
+        lines.setdefault((data["block_num"][i], data["par_num"][i], data["line_num"][i]), []).append(word)
+        confidences.append(confidence)
+    text = "\n".join(" ".join(words) for words in lines.values())
+    return text, (round(sum(confidences) / len(confidences) / 100, 3) if confidences else None)
+
+class TesseractOCRBackend:
+    """로컬 Tesseract 엔진 (CPU 작업이므로 프로세스 풀에서 실행, 풀은 첫 사용 시 생성)"""
+
+    name = LOCAL
+
+    def __init__(self, workers: int, languages: str, max_side: int = 2400):
+        self.workers = max(1, workers)
+        self.languages = languages
+        self.max_side = max_side
+        self.in_flight = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._available: Optional[bool] = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """pytesseract와 tesseract 실행 파일이 설치되어 있는지 (처음 한 번만 확인)"""
+        if self._available is None:
+            try:
+                import pytesseract
+                version = pytesseract.get_tesseract_version()
+                missing = set(self.languages.split("+")) - set(pytesseract.get_languages(config=""))
+                if missing:
+                    raise OCRBackendError(f"missing Tesseract language packs: {', '.join(sorted(missing))}")
+                logger.info(f"Local OCR engine: Tesseract {version} ({self.languages}, {self.workers} processes)")
+                self._available = True
+            except Exception as e:
+                logger.warning(f"Local OCR engine unavailable: {str(e)}")
+                self._available = False
+        return self._available
+
+    @property
+    def saturated(self) -> bool:
+        """대기 작업이 쌓여 있는지 (워커 수의 2배 이상 처리 중)"""
+        return self.in_flight >= self.workers * 2
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    # fork는 서버의 리슨 소켓/이벤트 루프 상태까지 복제하므로 spawn으로 깨끗한 프로세스 생성
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def recognize(self, content: bytes) -> OCRResult:
+        if not self.available:
+            raise OCRBackendError("Local OCR engine (Tesseract) is not installed")
+        self.in_flight += 1
+        try:
+            text, confidence = await asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), _tesseract_recognize, content, self.languages, self.max_side
+            )
+        finally:
+            self.in_flight -= 1
+        return OCRResult(text, self.name, confidence)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+def is_upstream_unavailable(error: Exception) -> bool:
+    """업스트림 제한/장애로 로컬 엔진 대체가 의미 있는 예외인지"""
+    from tenants import QuotaExceededError
+    if isinstance(error, (QuotaExceededError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if getattr(error, "status_code", None) in UNAVAILABLE_STATUS:
+        return True
+    try:
+        import httpx
+        return isinstance(error, httpx.TransportError)
+    except ImportError:
+        return False
+
+class OCRRouter:
+    """요청별 OCR 백엔드 선택 (OCR_BACKEND, 이미지 특성, 업스트림 대기열 기준)"""
+
+    def __init__(self):
+        self.config = get_config()
+        if self.config.OCR_BACKEND not in OCR_MODES:
+            raise ValueError(f"OCR_BACKEND must be one of: {', '.join(OCR_MODES)}")
+        self.mode = self.config.OCR_BACKEND
+        self.mistral = MistralOCRBackend()
+        self.local = TesseractOCRBackend(self.config.OCR_LOCAL_WORKERS, self.config.OCR_LOCAL_LANGUAGES)
+        self.counts = {"mistral": 0, "local": 0, "local_rejected": 0, "fallback": 0}
+
+    @property
+    def uses_local(self) -> bool:
+        """요청 처리 중 로컬 엔진을 사용할 수 있는 설정인지 (이미지 특성 계산 여부 결정)"""
+        return self.mode != MISTRAL or self.config.OCR_FALLBACK_LOCAL
+
+    def route(self, stats: Optional[ImageStats], upstream_queued: int) -> str:
+        """먼저 시도할 백엔드"""
+        if self.mode == LOCAL:
+            return LOCAL
+        if self.mode == MISTRAL or not self.local.available or self.local.saturated:
+            return MISTRAL
+        threshold = self.config.OCR_LOCAL_QUEUE_THRESHOLD
+        if threshold and upstream_queued >= threshold:
+            return LOCAL  # 업스트림 대기열이 길면 로컬로 분산
+        if (stats is not None and stats.pixels <= self.config.OCR_LOCAL_MAX_PIXELS
+                and stats.contrast >= self.config.OCR_LOCAL_MIN_CONTRAST):
+            return LOCAL  # 대비가 높은 스캔/명함 이미지
+        return MISTRAL
+
+    def accept(self, result: OCRResult) -> bool:
+        """auto 모드에서 로컬 결과를 그대로 사용할지 (신뢰도가 낮으면 Mistral로 다시 처리)"""
+        if self.mode == LOCAL:
+            return True
+        confidence = result.confidence or 0.0
+        accepted = bool(result.text.strip()) and confidence >= self.config.OCR_LOCAL_MIN_CONFIDENCE
+        if not accepted:
+            self.counts["local_rejected"] += 1
+        return accepted
+
+    def can_fallback(self, error: Exception) -> bool:
+        """Mistral 호출 실패 시 로컬 엔진으로 대체할지"""
+        return self.config.OCR_FALLBACK_LOCAL and is_upstream_unavailable(error) and self.local.available
+
+    async def recognize(self, content: bytes, document: dict, upstream_queued: int = 0) -> OCRResult:
+        """라우팅, 저신뢰도 재처리, 장애 대체를 한 번에 수행 (단독 서버용, main.py는 단계별 타이밍/스케줄러와 함께 직접 호출)"""
+        if self.mode != MISTRAL:
+            stats = None
+            if self.mode == AUTO and self.local.available:
+                stats = await asyncio.to_thread(image_stats, content)
+            if self.route(stats, upstream_queued) == LOCAL:
+                result = await self.local.recognize(content)
+                self.counts[LOCAL] += 1
+                if self.accept(result):
+                    return result
+                logger.info(f"Low-confidence local OCR ({result.confidence}), retrying with Mistral")
+        
+        try:
+            result = await self.mistral.recognize(document)
+        except Exception as e:
+            if not self.can_fallback(e):
+                raise
+            logger.warning(f"Mistral OCR unavailable ({type(e).__name__}: {str(e)}), falling back to local OCR")
+            self.counts["fallback"] += 1
+            result = await self.local.recognize(content)
+            self.counts[LOCAL] += 1
+            return result
+        self.counts[MISTRAL] += 1
+        return result
+
+    def close(self):
+        self.local.close()
+
+# Singleton pattern for OCR router
+_ocr_router = None
+
+def get_ocr_router() -> OCRRouter:
+    global _ocr_router
+    if _ocr_router is None:
+        _ocr_router = OCRRouter()
+    return _ocr_router
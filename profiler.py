@@ -0,0 +1,148 @@
+"""
+운영 중 온디맨드 프로파일링 (/admin/profile)
+
+    - collapsed: 샘플링 프로파일러. 별도 스레드가 interval마다 sys._current_frames()로 모든 스레드
+                 (이벤트 루프, asyncio.to_thread 워커, FileRotator/APScheduler 작업 스레드)의 스택을 읽어
+                 "스레드;바깥 프레임;...;안쪽 프레임 샘플수" 형식으로 집계 (flamegraph.pl, speedscope, inferno 호환)
+    - pstats: 이벤트 루프 스레드에서 cProfile을 N초 동안 켜고 pstats 덤프(.prof) 반환
+              (snakeviz, python -m pstats로 열람, 다른 스레드는 포함되지 않음)
+
+프로파일링 중이 아닐 때는 스레드나 훅이 없어 오버헤드가 없습니다.
+uvicorn --workers N으로 실행하면 요청을 받은 워커 프로세스 하나만 측정합니다 (X-Profile-Pid 헤더).
+"""
+
+import asyncio
+import cProfile
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+FORMATS = ("collapsed", "pstats")
+
+# 스레드 풀 번호를 제거해 같은 풀의 스레드를 하나로 집계 (asyncio_3 -> asyncio, ThreadPoolExecutor-0_1 -> ThreadPoolExecutor)
+_THREAD_SUFFIX = re.compile(r"[-_]\d+(_\d+)?$")
+
+# 대기 중인 스레드의 가장 안쪽 프레임 (include_idle=False이면 제외)
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),  # concurrent.futures 워커가 SimpleQueue.get(C 함수)에서 대기
+}
+
+class ProfilerBusyError(Exception):
+    """이미 프로파일링이 진행 중"""
+
+class ProfileResult:
+    """프로파일 결과 (body: collapsed 텍스트 또는 pstats 덤프)"""
+
+    __slots__ = ("body", "format", "seconds", "samples")
+
+    def __init__(self, body: bytes, format: str, seconds: float, samples: int = 0):
+        self.body = body
+        self.format = format
+        self.seconds = seconds
+        self.samples = samples
+
+def _frame_label(code, cache: Dict[object, str]) -> str:
+    label = cache.get(code)
+    if label is None:
+        name = getattr(code, "co_qualname", code.co_name)
+        label = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+        cache[code] = label
+    return label
+
+def _is_idle(code) -> bool:
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+class SamplingProfiler:
+    """프로세스 전체 스레드 샘플링 (한 번에 하나의 프로파일만 실행)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    async def profile(self, seconds: float, format: str = "collapsed", interval: float = 0.01,
+                      include_idle: bool = False) -> ProfileResult:
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            self.runs += 1
+            if format == "pstats":
+                return await self._profile_loop(seconds)
+            samples, stacks = await asyncio.to_thread(self._sample, seconds, interval, include_idle)
+            return ProfileResult(self._collapse(stacks), format, seconds, samples)
+        finally:
+            self._lock.release()
+
+    async def _profile_loop(self, seconds: float) -> ProfileResult:
+        """이벤트 루프 스레드의 cProfile (대기하는 동안 다른 요청 처리가 모두 기록됨)"""
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profile.disable()
+        profile.create_stats()
+        return ProfileResult(marshal.dumps(profile.stats), "pstats", seconds)
+
+    def _sample(self, seconds: float, interval: float, include_idle: bool) -> Tuple[int, Counter]:
+        """샘플링 스레드: 스택은 code 객체 튜플로 모으고 문자열 변환은 마지막에 한 번만"""
+        own = threading.get_ident()
+        stacks: Counter = Counter()
+        names: Dict[int, str] = {}
+        samples = 0
+        deadline = time.perf_counter() + seconds
+        next_names = 0.0
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            frames = sys._current_frames()
+            if now >= next_names or not names.keys() >= frames.keys():
+                # 스레드 이름은 새 스레드가 보이거나 1초가 지나면 갱신
+                names = {t.ident: _THREAD_SUFFIX.sub("", t.name) for t in threading.enumerate()}
+                next_names = now + 1.0
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                if not include_idle and _is_idle(frame.f_code):
+                    continue
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                stacks[(names.get(ident, f"thread-{ident}"), tuple(codes))] += 1
+            samples += 1
+            time.sleep(max(0.0, interval - (time.perf_counter() - now)))
+        return samples, stacks
+
+    @staticmethod
+    def _collapse(stacks: Counter) -> bytes:
+        cache: Dict[object, str] = {}
+        lines = []
+        for (thread, codes), count in stacks.most_common():
+            frames = ";".join(_frame_label(code, cache) for code in reversed(codes))
+            lines.append(f"{thread};{frames} {count}")
+        return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+# Singleton pattern for profiler
+_profiler: Optional[SamplingProfiler] = None
+
+def get_profiler() -> SamplingProfiler:
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler()
+    return _profiler
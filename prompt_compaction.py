@@ -0,0 +1,120 @@
+"""
+Chat 추출 단계의 프롬프트 압축
+
+OCR 결과에서 이미지 참조/데이터 URL/base64 덩어리 등 텍스트가 아닌 부분을 제거하고,
+공백 정규화와 중복 줄 제거 후 토큰 예산에 맞게 잘라냅니다.
+토큰 수는 호출 전에 로컬에서 추정합니다 (토크나이저 없이 보수적인 근사).
+"""
+
+import re
+from typing import Tuple
+
+# ![alt](url) 형태의 마크다운 이미지 참조
+_MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+# data: URL (인라인 이미지)
+_DATA_URL = re.compile(r"data:[\w/+.-]+;base64,[A-Za-z0-9+/=]+")
+# 긴 base64/바이너리 덩어리
+_BASE64_RUN = re.compile(r"[A-Za-z0-9+/=]{120,}")
+# HTML 태그 (실제 태그 이름만: <john@acme.com>, <https://...> 같은 자동 링크와 "3 < 5" 비교식은 유지)
+_HTML_TAG = re.compile(r"</?[A-Za-z][\w:-]*(\s[^<>@]*)?/?>")
+# 마크다운 표 구분선 (|---|---|)
+_TABLE_RULE = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$")
+_WHITESPACE = re.compile(r"[ \t\u00a0\u3000]+")
+
+def ocr_response_text(ocr_response) -> str:
+    """OCR 응답에서 텍스트만 추출 (페이지 마크다운 우선, 메타데이터 repr은 최후 수단)"""
+    pages = getattr(ocr_response, "pages", None)
+    if pages:
+        return "\n\n".join(getattr(page, "markdown", "") or "" for page in pages)
+    if hasattr(ocr_response, "content"):
+        return ocr_response.content
+    return str(ocr_response)
+
+def estimate_tokens(text: str) -> int:
+    """
+    토큰 수 근사치
+
+    ASCII는 약 4자당 1토큰, 한글 등 비 ASCII 문자는 1자당 1토큰으로 보수적으로 계산합니다.
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return (ascii_chars + 3) // 4 + non_ascii
+
+def normalize_ocr_text(text: str) -> str:
+    """
+    텍스트가 아닌 요소 제거, 공백 정규화, 중복 줄 제거
+
+    >>> normalize_ocr_text("John Smith <john@acme.com>")
+    'John Smith <john@acme.com>'
+    >>> normalize_ocr_text("<p>Acme<br/>Corp</p> <https://acme.com>")
+    'Acme Corp <https://acme.com>'
+    >>> normalize_ocr_text("3 < 5 and 7 > 2")
+    '3 < 5 and 7 > 2'
+    """
+    text = _MARKDOWN_IMAGE.sub(" ", text)
+    text = _DATA_URL.sub(" ", text)
+    text = _BASE64_RUN.sub(" ", text)
+    text = _HTML_TAG.sub(" ", text)
+
+    lines = []
+    seen = set()
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line or _TABLE_RULE.match(line):
+            continue
+        # 표 셀 구분자와 마크다운 제목/강조 기호 정리
+        line = line.strip("|").replace("|", " ")
+        line = line.lstrip("#").replace("**", "").replace("__", "")
+        line = _WHITESPACE.sub(" ", line).strip()
+        if not line:
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return "\n".join(lines)
+
+def _prefix_within(line: str, max_tokens: int) -> str:
+    """estimate_tokens가 max_tokens 이하인 가장 긴 앞부분 (추정치는 길이에 대해 단조 증가하므로 이분 탐색)"""
+    low, high = 0, len(line)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(line[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return line[:low]
+
+def truncate_to_budget(text: str, max_tokens: int) -> Tuple[str, bool]:
+    """
+    줄 단위로 토큰 예산까지 유지 (잘렸는지 여부 함께 반환)
+
+    >>> text, truncated = truncate_to_budget("가" * 100, 20)
+    >>> len(text), estimate_tokens(text), truncated
+    (20, 20, True)
+    """
+    kept = []
+    used = 0
+    for line in text.split("\n"):
+        cost = estimate_tokens(line) + 1  # 줄바꿈 포함
+        if used + cost > max_tokens:
+            remaining = max_tokens - used
+            if remaining > 8 and not kept:
+                # 첫 줄 자체가 예산을 넘으면 문자 단위로 자름 (한글은 1자 1토큰, ASCII는 4자 1토큰)
+                kept.append(_prefix_within(line, remaining))
+            return "\n".join(kept), True
+        kept.append(line)
+        used += cost
+    return "\n".join(kept), False
+
+def compact_ocr_text(text: str, max_tokens: int) -> Tuple[str, dict]:
+    """OCR 텍스트를 압축하고 통계(원본/압축 토큰 추정치, 잘림 여부) 반환"""
+    normalized = normalize_ocr_text(text)
+    compacted, truncated = truncate_to_budget(normalized, max_tokens)
+    stats = {
+        "ocr_tokens_est": estimate_tokens(text),
+        "prompt_text_tokens_est": estimate_tokens(compacted),
+        "prompt_truncated": truncated,
+    }
+    return compacted, stats
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+저장된 OCR 텍스트로 추출 로직 재실행 (오프라인 재추출 + 변경 리포트)
+
+응답 파일(response_<id>.json)에 저장된 ocr_text에 추출기를 다시 실행하고, 저장된 extracted_data와
+필드별로 비교합니다. 기간 디렉토리와 FileRotator가 만든 archive/*.zip을 디스크에 풀지 않고 바로 읽습니다.
+OCR 호출은 하지 않습니다.
+
+추출기:
+    regex               extract_info_from_text 규칙 (main_regex.py와 같음), 프로세스 풀에서 실행
+    chat                main.py와 같은 프롬프트 압축 + 구조화 출력 chat 호출, 동시 호출 수를 제한한 비동기 풀
+    module:function     ocr_text -> dict | BusinessCardInfo 함수 (예: my_rules:extract), 프로세스 풀에서 실행
+
+Usage:
+    python replay_extraction.py                                   # ./responses 전체 (archive 포함), regex
+    python replay_extraction.py responses/2025-06-05 responses/archive/2025-W22_20250609_000000.zip
+    python replay_extraction.py --extractor my_rules:extract --workers 8 --since 2025-05-01
+    python replay_extraction.py --extractor chat --concurrency 16 --limit 1000
+
+출력:
+    --diff-output (JSONL)   변경된 레코드: {"request_id", "source", "changes": {field: {"old", "new"}}}
+    --output (JSON)         요약: 처리/변경/오류 수, 필드별 변경(changed)/채워짐(filled)/비워짐(cleared) 수, 처리 속도
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from bench_common import run_metadata, save_results
+from extraction import FIELDS, normalize
+from serialization import get_serializer
+
+RESPONSE_FILE = re.compile(r"response_[^/\\]+\.json$")
+SKIP_DIRS = {"idempotency"}
+
+def _iter_zip(path: str) -> Iterator[Tuple[str, bytes]]:
+    """ZIP 안의 응답 파일을 압축 해제된 bytes로 하나씩 읽음"""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if RESPONSE_FILE.search(info.filename):
+                    yield f"{path}!{info.filename}", zf.read(info)
+    except zipfile.BadZipFile:
+        print(f"⚠️  Not a valid zip archive, skipping: {path}")
+
+def iter_records(sources: List[str]) -> Iterator[Tuple[str, bytes]]:
+    """(위치, 응답 파일 bytes)를 지연 생성 (디렉토리는 하위의 응답 파일과 ZIP 모두 포함)"""
+    for source in sources:
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    if name.endswith(".zip"):
+                        yield from _iter_zip(path)
+                    elif RESPONSE_FILE.search(name):
+                        with open(path, "rb") as f:
+                            yield path, f.read()
+        elif source.endswith(".zip"):
+            yield from _iter_zip(source)
+        elif os.path.isfile(source):
+            with open(source, "rb") as f:
+                yield source, f.read()
+        else:
+            print(f"⚠️  Source not found: {source}")
+
+def chunked(iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _regex_extract(ocr_text: str) -> dict:
+    from extraction import extract_info_from_text
+    return extract_info_from_text(ocr_text).dict()
+
+@lru_cache(maxsize=None)
+def load_extractor(spec: str) -> Callable[[str], dict]:
+    """추출기 이름 -> ocr_text를 받아 필드 dict를 반환하는 함수 (프로세스마다 한 번 로드)"""
+    if spec == "regex":
+        return _regex_extract
+    module_name, _, func_name = spec.partition(":")
+    if not func_name:
+        raise ValueError(f"Unknown extractor '{spec}' (expected regex, chat or module:function)")
+    func = getattr(importlib.import_module(module_name), func_name)
+
+    def extract(ocr_text: str) -> dict:
+        result = func(ocr_text)
+        return result.dict() if hasattr(result, "dict") else dict(result)
+    return extract
+
+def diff_fields(old: dict, new: dict) -> Dict[str, dict]:
+    """정규화 후 값이 다른 필드 ({field: {"old", "new"}})"""
+    changes = {}
+    for field in FIELDS:
+        if normalize(field, old.get(field)) != normalize(field, new.get(field)):
+            changes[field] = {"old": old.get(field), "new": new.get(field)}
+    return changes
+
+def parse_record(source: str, raw: bytes, filters: dict) -> Tuple[Optional[dict], Optional[dict]]:
+    """(레코드, 건너뛴 경우의 결과) - 파싱 실패/필터 미일치/ocr_text 없음은 결과만 반환"""
+    try:
+        record = get_serializer().loads(raw)
+    except ValueError as e:
+        return None, {"status": "error", "source": source, "error": f"Invalid JSON: {str(e)}"}
+    timestamp = record.get("timestamp", 0)
+    if (filters.get("since") and timestamp < filters["since"]) or (filters.get("until") and timestamp >= filters["until"]):
+        return None, {"status": "filtered"}
+    if filters.get("tenant") and record.get("tenant", "default") != filters["tenant"]:
+        return None, {"status": "filtered"}
+    if not record.get("ocr_text") or not isinstance(record.get("extracted_data"), dict):
+        return None, {"status": "skipped"}
+    return record, None
+
+def compare_result(source: str, record: dict, new: dict) -> dict:
+    changes = diff_fields(record["extracted_data"], new)
+    if not changes:
+        return {"status": "unchanged"}
+    return {"status": "changed", "source": source, "request_id": record.get("request_id"), "changes": changes}
+
+def replay_chunk(spec: str, items: List[Tuple[str, bytes]], filters: dict) -> List[dict]:
+    """응답 파일 묶음 재추출 (프로세스 풀 작업, 파싱/추출/비교 모두 워커에서 실행)"""
+    extractor = load_extractor(spec)
+    results = []
+    for source, raw in items:
+        record, skipped = parse_record(source, raw, filters)
+        if skipped is not None:
+            results.append(skipped)
+            continue
+        try:
+            results.append(compare_result(source, record, extractor(record["ocr_text"])))
+        except Exception as e:
+            results.append({"status": "error", "source": source, "request_id": record.get("request_id"),
+                            "error": f"{type(e).__name__}: {str(e)}"})
+    return results
+
+class ReplayReport:
+    """결과 집계 + 변경 레코드 JSONL 기록"""
+
+    def __init__(self, diff_path: Optional[str], progress_every: int):
+        self.counts = {"records": 0, "unchanged": 0, "changed": 0, "skipped": 0, "filtered": 0, "errors": 0}
+        self.fields = {field: {"changed": 0, "filled": 0, "cleared": 0} for field in FIELDS}
+        self.error_samples: List[dict] = []
+        self.started = time.perf_counter()
+        self.progress_every = progress_every
+        self._diff_file = open(diff_path, "wb") if diff_path else None
+        self._serializer = get_serializer()
+
+    def add(self, result: dict):
+        status = result["status"]
+        self.counts["records"] += 1
+        self.counts["errors" if status == "error" else status] += 1
+        if status == "error" and len(self.error_samples) < 20:
+            self.error_samples.append(result)
+        elif status == "changed":
+            for field, change in result["changes"].items():
+                if not change["old"]:
+                    self.fields[field]["filled"] += 1
+                elif not change["new"]:
+                    self.fields[field]["cleared"] += 1
+                else:
+                    self.fields[field]["changed"] += 1
+            if self._diff_file is not None:
+                self._diff_file.write(self._serializer.dumps_bytes(result) + b"\n")
+        if self.progress_every and self.counts["records"] % self.progress_every == 0:
+            self.print_progress()
+
+    def print_progress(self):
+        elapsed = time.perf_counter() - self.started
+        print(f"   {self.counts['records']:,} records, {self.counts['changed']:,} changed, "
+              f"{self.counts['errors']:,} errors ({self.counts['records'] / elapsed:,.0f} rec/s)")
+
+    def close(self) -> dict:
+        if self._diff_file is not None:
+            self._diff_file.close()
+        elapsed = time.perf_counter() - self.started
+        compared = self.counts["unchanged"] + self.counts["changed"]
+        return {
+            "counts": self.counts,
+            "change_rate": round(self.counts["changed"] / compared, 4) if compared else None,
+            "fields": self.fields,
+            "elapsed_s": round(elapsed, 2),
+            "records_per_sec": round(self.counts["records"] / elapsed, 1) if elapsed else None,
+            "error_samples": self.error_samples,
+        }
+
+def run_process_pool(spec: str, records: Iterator[Tuple[str, bytes]], filters: dict, report: ReplayReport,
+                     workers: int, chunk_size: int):
+    """CPU 추출기를 프로세스 풀에서 실행 (제출 대기 묶음 수를 제한해 메모리 사용량 유지)"""
+    if workers <= 1:
+        for chunk in chunked(records, chunk_size):
+            for result in replay_chunk(spec, chunk, filters):
+                report.add(result)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in chunked(records, chunk_size):
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for result in future.result():
+                        report.add(result)
+            pending.add(pool.submit(replay_chunk, spec, chunk, filters))
+        for future in pending:
+            for result in future.result():
+                report.add(result)
+
+async def run_chat_pool(records: Iterator[Tuple[str, bytes]], filters: dict, report: ReplayReport,
+                        concurrency: int, model: str):
+    """main.py와 같은 chat 추출을 동시 호출 수를 제한해 실행"""
+    from config import get_config
+    from extraction import build_extraction_prompt, extract_info_from_text
+    from mistral_client import get_mistral_client
+    from prompt_compaction import compact_ocr_text
+    from structured_output import StructuredOutputError, parse_business_card, response_format
+
+    config = get_config()
+    client = get_mistral_client()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def extract(source: str, record: dict):
+        try:
+            prompt_text, _ = compact_ocr_text(record["ocr_text"], config.PROMPT_MAX_TOKENS)
+            response = await client.chat.complete_async(
+                model=model,
+                messages=[{"role": "user", "content": build_extraction_prompt(prompt_text)}],
+                response_format=response_format(config.STRUCTURED_OUTPUT)
+            )
+            try:
+                new = parse_business_card(response.choices[0].message.content).dict()
+            except StructuredOutputError:
+                new = extract_info_from_text(record["ocr_text"]).dict()  # main.py와 같은 대체 경로
+            report.add(compare_result(source, record, new))
+        except Exception as e:
+            report.add({"status": "error", "source": source, "request_id": record.get("request_id"),
+                        "error": f"{type(e).__name__}: {str(e)}"})
+        finally:
+            semaphore.release()
+
+    tasks = set()
+    for source, raw in records:
+        record, skipped = parse_record(source, raw, filters)
+        if skipped is not None:
+            report.add(skipped)
+            continue
+        await semaphore.acquire()  # 진행 중인 호출 수만큼만 레코드를 메모리에 유지
+        task = asyncio.create_task(extract(source, record))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+def parse_date(value: Optional[str]) -> Optional[float]:
+    return datetime.strptime(value, "%Y-%m-%d").timestamp() if value else None
+
+def print_summary(summary: dict):
+    counts = summary["counts"]
+    print("\n" + "=" * 60)
+    print(f"Records: {counts['records']:,}  unchanged: {counts['unchanged']:,}  changed: {counts['changed']:,}  "
+          f"skipped: {counts['skipped']:,}  filtered: {counts['filtered']:,}  errors: {counts['errors']:,}")
+    if summary["change_rate"] is not None:
+        print(f"Change rate: {summary['change_rate']:.2%}  ({summary['records_per_sec']:,} rec/s, {summary['elapsed_s']}s)")
+    print("-" * 60)
+    print(f"{'field':<12}{'changed':>12}{'filled':>12}{'cleared':>12}")
+    for field, stats in summary["fields"].items():
+        print(f"{field:<12}{stats['changed']:>12,}{stats['filled']:>12,}{stats['cleared']:>12,}")
+    print("=" * 60)
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run extraction over stored OCR text and report differences")
+    parser.add_argument("sources", nargs="*", help="응답 디렉토리, 기간 디렉토리, ZIP 또는 응답 파일 (기본: RESPONSE_DIR)")
+    parser.add_argument("--extractor", default="regex", help="regex | chat | module:function")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="프로세스 풀 크기 (regex/module:function)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="워커에 한 번에 보내는 레코드 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 chat 호출 수 (chat)")
+    parser.add_argument("--model", default="mistral-large-latest", help="chat 모델 (chat)")
+    parser.add_argument("--since", help="이 날짜 이후 레코드만 (YYYY-MM-DD)")
+    parser.add_argument("--until", help="이 날짜 이전 레코드만 (YYYY-MM-DD)")
+    parser.add_argument("--tenant", help="이 테넌트의 레코드만")
+    parser.add_argument("--limit", type=int, help="처리할 최대 응답 파일 수")
+    parser.add_argument("--diff-output", default="replay_diff.jsonl")
+    parser.add_argument("--output", default="replay_report.json")
+    parser.add_argument("--progress-every", type=int, default=10000)
+    args = parser.parse_args()
+
+    sources = args.sources
+    if not sources:
+        from config import get_config
+        sources = [str(get_config().RESPONSE_DIR)]
+    if args.extractor != "chat":
+        try:
+            load_extractor(args.extractor)  # 워커 시작 전에 잘못된 이름 확인
+        except (ValueError, ImportError, AttributeError) as e:
+            print(f"❌ {str(e)}")
+            sys.exit(1)
+
+    filters = {"since": parse_date(args.since), "until": parse_date(args.until), "tenant": args.tenant}
+    records = islice(iter_records(sources), args.limit) if args.limit else iter_records(sources)
+    report = ReplayReport(args.diff_output, args.progress_every)
+    print(f"🔁 Replaying {args.extractor} extraction over {', '.join(sources)}")
+
+    if args.extractor == "chat":
+        asyncio.run(run_chat_pool(records, filters, report, args.concurrency, args.model))
+    else:
+        run_process_pool(args.extractor, records, filters, report, args.workers, args.chunk_size)
+
+    summary = report.close()
+    print_summary(summary)
+    print(f"📝 Changed records written to: {args.diff_output}")
+    save_results(args.output, {
+        "meta": run_metadata(sources=sources, extractor=args.extractor, workers=args.workers,
+                             concurrency=args.concurrency, since=args.since, until=args.until,
+                             tenant=args.tenant, limit=args.limit),
+        "summary": summary,
+    })
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+업스트림(Mistral) 호출 앞단의 가중치 공정 큐 스케줄러
+
+전체 동시 호출 수(UPSTREAM_CONCURRENCY)를 슬롯으로 나누고, 대기 중인 호출은
+테넌트별 가중치에 따른 가상 시간 태그(start-time fair queueing) 순서로 슬롯을 받습니다.
+한 테넌트가 대량 요청을 쌓아도 다른 테넌트의 호출은 자기 가중치 몫만큼 앞으로 끼어들 수 있어
+대화형 사용자의 지연 시간이 대량 작업에 밀리지 않습니다.
+테넌트별 동시 호출 한도(max_concurrency)와 대기열 한도(TENANT_MAX_QUEUED)도 여기서 적용합니다.
+
+우선순위 레인:
+    - interactive: 대기 중인 호출이 있으면 항상 bulk보다 먼저 슬롯을 받음
+    - bulk: INTERACTIVE_RESERVED_SLOTS만큼을 제외한 슬롯까지만 사용 (남는 업스트림 용량만 흡수)
+레인 안에서는 테넌트 가중치 공정 큐 순서를 따릅니다.
+"""
+
+import asyncio
+import heapq
+import itertools
+from typing import Dict, List
+
+from config import get_config
+from tenants import QuotaExceededError, Tenant
+
+PRIORITY_HEADER = "X-Priority"
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)  # 우선순위 순서
+
+class _Waiter:
+    __slots__ = ("start_tag", "finish_tag", "seq", "tenant", "lane", "future")
+
+    def __init__(self, start_tag: float, finish_tag: float, seq: int, tenant: Tenant, lane: str,
+                 future: asyncio.Future):
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.seq = seq
+        self.tenant = tenant
+        self.lane = lane
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.finish_tag, self.seq) < (other.finish_tag, other.seq)
+
+class FairScheduler:
+    """우선순위 레인별 가중치 공정 큐 + 테넌트별 동시 호출 한도 (단일 이벤트 루프에서 사용)"""
+
+    def __init__(self, capacity: int, max_queued_per_tenant: int, interactive_reserved: int = 0):
+        self.capacity = max(1, capacity)
+        self.max_queued_per_tenant = max_queued_per_tenant
+        self.in_flight = 0
+        # 레인별 최대 동시 호출 수 (bulk는 예약분을 제외, 최소 1)
+        self.lane_limits = {
+            INTERACTIVE: self.capacity,
+            BULK: max(1, self.capacity - interactive_reserved),
+        }
+        self._queues: Dict[str, List[_Waiter]] = {lane: [] for lane in LANES}
+        self._virtual_time: Dict[str, float] = {lane: 0.0 for lane in LANES}
+        self._lane_in_flight: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._seq = itertools.count()
+        self._last_finish: Dict[tuple, float] = {}
+        self._tenant_in_flight: Dict[str, int] = {}
+        self._tenant_queued: Dict[str, int] = {}
+
+    async def acquire(self, tenant: Tenant, lane: str = INTERACTIVE, cost: float = 1.0):
+        """슬롯을 받을 때까지 대기 (테넌트 대기열이 가득 차면 QuotaExceededError)"""
+        queued = self._tenant_queued.get(tenant.name, 0)
+        if queued >= self.max_queued_per_tenant:
+            tenant.rejected += 1
+            raise QuotaExceededError(f"Too many queued upstream calls for tenant {tenant.name}")
+
+        # 가상 시간 태그: 레인 안에서 테넌트의 직전 태그 이후, 가중치가 클수록 간격이 짧음
+        start_tag = max(self._virtual_time[lane], self._last_finish.get((lane, tenant.name), 0.0))
+        finish_tag = start_tag + cost / tenant.weight
+        self._last_finish[(lane, tenant.name)] = finish_tag
+
+        waiter = _Waiter(start_tag, finish_tag, next(self._seq), tenant, lane,
+                         asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queues[lane], waiter)
+        self._tenant_queued[tenant.name] = queued + 1
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 슬롯을 받은 직후 취소됨
+                self.release(tenant, lane)
+            else:
+                # 대기열에서 제거 (힙에서는 dispatch 시 건너뜀)
+                self._tenant_queued[tenant.name] -= 1
+            raise
+        tenant.upstream_calls += 1
+
+    def release(self, tenant: Tenant, lane: str = INTERACTIVE):
+        """acquire()로 받은 슬롯 반환"""
+        self.in_flight -= 1
+        self._lane_in_flight[lane] -= 1
+        self._tenant_in_flight[tenant.name] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """빈 슬롯을 우선순위 레인 순서로, 레인 안에서는 가장 작은 태그의 대기 호출에 할당"""
+        for lane in LANES:
+            queue = self._queues[lane]
+            skipped = []
+            while (queue and self.in_flight < self.capacity
+                   and self._lane_in_flight[lane] < self.lane_limits[lane]):
+                waiter = heapq.heappop(queue)
+                if waiter.future.done():
+                    continue  # 취소된 대기
+                name = waiter.tenant.name
+                if self._tenant_in_flight.get(name, 0) >= waiter.tenant.max_concurrency:
+                    skipped.append(waiter)  # 동시 호출 한도에 걸린 테넌트는 건너뜀
+                    continue
+                self._virtual_time[lane] = max(self._virtual_time[lane], waiter.start_tag)
+                self.in_flight += 1
+                self._lane_in_flight[lane] += 1
+                self._tenant_in_flight[name] = self._tenant_in_flight.get(name, 0) + 1
+                self._tenant_queued[name] -= 1
+                waiter.future.set_result(None)
+            for waiter in skipped:
+                heapq.heappush(queue, waiter)
+
+    def tenant_state(self, tenant: Tenant) -> dict:
+        """테넌트의 현재 업스트림 호출/대기 수"""
+        return {
+            "upstream_in_flight": self._tenant_in_flight.get(tenant.name, 0),
+            "upstream_queued": self._tenant_queued.get(tenant.name, 0),
+        }
+
+    @property
+    def queued(self) -> int:
+        """슬롯을 기다리는 전체 호출 수"""
+        return sum(self._tenant_queued.values())
+
+    def lane_state(self) -> dict:
+        """레인별 현재 업스트림 호출/대기 수"""
+        return {
+            lane: {
+                "in_flight": self._lane_in_flight[lane],
+                "queued": sum(1 for waiter in self._queues[lane] if not waiter.future.done()),
+            }
+            for lane in LANES
+        }
+
+# Singleton pattern for scheduler
+_scheduler = None
+
+def get_scheduler() -> FairScheduler:
+    global _scheduler
+    if _scheduler is None:
+        config = get_config()
+        _scheduler = FairScheduler(config.UPSTREAM_CONCURRENCY, config.TENANT_MAX_QUEUED,
+                                   config.INTERACTIVE_RESERVED_SLOTS)
+    return _scheduler
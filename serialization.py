@@ -0,0 +1,119 @@
+"""
+JSON 직렬화 계층
+
+로그 줄, 응답 파일, 공유 인덱스(JSONL), API 응답 본문을 같은 직렬화기로 만듭니다.
+    - orjson (설치되어 있으면 우선 사용, 가장 빠름)
+    - msgspec
+    - json (표준 라이브러리, 추가 패키지가 없을 때)
+SERIALIZER 환경 변수로 백엔드를 고정할 수 있고(auto | orjson | msgspec | json),
+COMPACT_JSON이 켜져 있으면(production 기본값) 응답 파일도 들여쓰기 없이 저장합니다.
+"""
+
+import json
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from config import get_config
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+def _default(obj: Any):
+    """백엔드가 직접 처리하지 못하는 타입 변환"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Path):
+        return str(obj)
+    if hasattr(obj, "model_dump"):  # pydantic 모델
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+class JsonSerializer:
+    """선택된 백엔드로 dumps/loads 제공 (출력은 항상 UTF-8, 비ASCII 문자는 이스케이프하지 않음)"""
+
+    def __init__(self, backend: str = "auto", compact: bool = True):
+        self.compact = compact
+        self.backend = self._select_backend(backend)
+
+        if self.backend == "orjson":
+            import orjson
+            self._orjson = orjson
+            self._encode = self._encode_orjson
+            self._loads = orjson.loads
+        elif self.backend == "msgspec":
+            import msgspec
+            self._msgspec = msgspec
+            self._encoder = msgspec.json.Encoder(enc_hook=_default)
+            self._decoder = msgspec.json.Decoder()
+            self._encode = self._encode_msgspec
+            self._loads = self._loads_msgspec
+        else:
+            self._encode = self._encode_stdlib
+            self._loads = json.loads
+
+    def _select_backend(self, backend: str) -> str:
+        if backend not in ("auto",) + BACKENDS:
+            raise ValueError(f"Unknown SERIALIZER '{backend}' (expected auto, {', '.join(BACKENDS)})")
+        candidates = BACKENDS if backend == "auto" else (backend,)
+        for name in candidates:
+            if name == "json":
+                return name
+            try:
+                __import__(name)
+                return name
+            except ImportError:
+                if backend != "auto":
+                    logger.warning(f"SERIALIZER={backend} is not installed, falling back to json")
+        return "json"
+
+    def _encode_orjson(self, obj: Any, pretty: bool) -> bytes:
+        option = self._orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= self._orjson.OPT_INDENT_2
+        return self._orjson.dumps(obj, default=_default, option=option)
+
+    def _encode_msgspec(self, obj: Any, pretty: bool) -> bytes:
+        data = self._encoder.encode(obj)
+        return self._msgspec.json.format(data, indent=2) if pretty else data
+
+    def _encode_stdlib(self, obj: Any, pretty: bool) -> bytes:
+        if pretty:
+            text = json.dumps(obj, ensure_ascii=False, indent=2, default=_default)
+        else:
+            text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default)
+        return text.encode("utf-8")
+
+    def _loads_msgspec(self, data):
+        try:
+            return self._decoder.decode(data)
+        except self._msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps_bytes(self, obj: Any, pretty: bool = False) -> bytes:
+        """한 줄(또는 pretty=True면 들여쓴) JSON bytes"""
+        return self._encode(obj, pretty)
+
+    def dumps(self, obj: Any) -> str:
+        """한 줄 JSON 문자열 (로그 메시지용)"""
+        return self._encode(obj, False).decode("utf-8")
+
+    def dump_file(self, obj: Any) -> bytes:
+        """파일 저장용 JSON bytes (compact 모드가 아니면 사람이 읽기 쉽게 들여쓰기)"""
+        return self._encode(obj, not self.compact)
+
+    def loads(self, data) -> Any:
+        """JSON 파싱 (str/bytes, 잘못된 입력은 ValueError)"""
+        return self._loads(data)
+
+# Singleton pattern for serializer
+_serializer = None
+
+def get_serializer() -> JsonSerializer:
+    global _serializer
+    if _serializer is None:
+        config = get_config()
+        _serializer = JsonSerializer(config.SERIALIZER, config.COMPACT_JSON)
+    return _serializer
@@ -0,0 +1,60 @@
+"""
+동일 요청 단일 실행(single-flight)
+
+같은 키(업로드 이미지의 내용 해시)로 이미 처리 중인 작업이 있으면 새 작업을 시작하지 않고
+진행 중인 작업의 결과를 함께 기다립니다. 모바일 클라이언트가 타임아웃으로 같은 이미지를 재전송해도
+OCR/chat 호출은 한 번만 실행됩니다.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+class SingleFlight:
+    """키별로 진행 중인 작업 하나를 공유 (단일 이벤트 루프에서 사용)"""
+
+    def __init__(self):
+        self._calls: Dict[str, Tuple[asyncio.Task, str]] = {}
+        self.coalesced = 0  # 공유된 결과를 받은 요청 수
+
+    async def run(self, key: str, request_id: str, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, str]:
+        """
+        진행 중인 작업이 없으면 factory()를 실행하고, 있으면 그 결과를 기다림
+
+        (결과, 실제로 작업을 실행한 요청 ID) 반환. 작업이 실패하면 기다리던 모든 요청에 같은 예외가 전달됩니다.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            task = asyncio.create_task(factory())
+            call = (task, request_id)
+            self._calls[key] = call
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced += 1
+
+        task, leader_id = call
+        # 먼저 온 요청이 취소되어도 공유 작업은 계속 실행
+        return await asyncio.shield(task), leader_id
+
+    def _forget(self, key: str, task: asyncio.Task):
+        call = self._calls.get(key)
+        if call is not None and call[0] is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # 기다리는 요청이 없어도 "exception was never retrieved" 경고를 남기지 않음
+
+    def is_running(self, key: str) -> bool:
+        """키에 해당하는 작업이 진행 중인지 (run() 호출 시 결과를 공유받게 되는지)"""
+        return key in self._calls
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+# Singleton pattern for single-flight group
+_single_flight = None
+
+def get_single_flight() -> SingleFlight:
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
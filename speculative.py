@@ -0,0 +1,110 @@
+"""
+추측(speculative) 병렬 추출
+
+여러 추출 경로(OCR→chat, vision 직접 추출)를 동시에 실행하고,
+한 경로가 모든 필드를 채운 결과를 내면 즉시 반환합니다.
+먼저 끝난 결과가 일부 필드만 채웠다면 병합 대기 시간(merge window) 동안 다른 경로를 기다려 필드 단위로 병합합니다.
+"""
+
+import asyncio
+import re
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from extraction import BusinessCardInfo
+
+FIELDS = list(BusinessCardInfo.model_fields)
+
+def is_complete(info: BusinessCardInfo) -> bool:
+    """모든 필드가 채워진 결과인지 확인"""
+    return all(getattr(info, field) for field in FIELDS)
+
+def _normalize(field: str, value: str) -> str:
+    if field == "phone":
+        return re.sub(r"\D", "", value)
+    return re.sub(r"\s+", " ", value).strip().lower()
+
+def merge_results(results: Dict[str, BusinessCardInfo], priority: List[str]) -> tuple:
+    """
+    필드 단위 병합
+
+    여러 경로가 같은 값(정규화 기준)을 냈으면 그 값을, 아니면 priority 순서로 처음 채워진 값을 사용합니다.
+    (병합 결과, 필드별 출처) 반환
+    """
+    merged = {}
+    sources = {}
+    ordered = [name for name in priority if name in results]
+    for field in FIELDS:
+        candidates = [(name, getattr(results[name], field)) for name in ordered if getattr(results[name], field)]
+        if not candidates:
+            merged[field] = None
+            continue
+        counts: Dict[str, int] = {}
+        for _, value in candidates:
+            key = _normalize(field, value)
+            counts[key] = counts.get(key, 0) + 1
+        # 동의한 경로가 가장 많은 값, 동률이면 우선순위가 높은 경로의 값
+        name, value = max(candidates, key=lambda item: counts[_normalize(field, item[1])])
+        merged[field] = value
+        sources[field] = name if counts[_normalize(field, value)] == 1 else "agreed"
+    return BusinessCardInfo(**merged), sources
+
+async def race_extractions(paths: Dict[str, Callable[[], Awaitable[BusinessCardInfo]]],
+                           merge_window: float, priority: List[str]) -> dict:
+    """
+    추출 경로를 동시에 실행하여 가장 빠른 완전한 결과 또는 병합 결과 반환
+
+    반환: {"result", "winner", "merged_fields", "path_status", "path_latency_ms"}
+    모든 경로가 실패하면 마지막 예외를 다시 발생시킵니다.
+    """
+    started = time.perf_counter()
+    tasks = {asyncio.create_task(factory()): name for name, factory in paths.items()}
+    results: Dict[str, BusinessCardInfo] = {}
+    status: Dict[str, str] = {name: "pending" for name in paths}
+    latency_ms: Dict[str, float] = {}
+    last_error: Optional[BaseException] = None
+    pending = set(tasks)
+    deadline = None  # 첫 (불완전한) 결과 이후 병합 대기 마감 시각
+
+    try:
+        while pending:
+            timeout = None if deadline is None else max(deadline - time.perf_counter(), 0)
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break  # 병합 대기 시간 초과
+
+            for task in done:
+                name = tasks[task]
+                latency_ms[name] = round((time.perf_counter() - started) * 1000, 2)
+                if task.exception() is not None:
+                    status[name] = f"error: {type(task.exception()).__name__}"
+                    last_error = task.exception()
+                    continue
+                status[name] = "ok"
+                results[name] = task.result()
+                if is_complete(results[name]):
+                    return {
+                        "result": results[name],
+                        "winner": name,
+                        "merged_fields": None,
+                        "path_status": status,
+                        "path_latency_ms": latency_ms,
+                    }
+                if deadline is None:
+                    deadline = time.perf_counter() + merge_window
+    finally:
+        for task in pending:
+            task.cancel()
+            status[tasks[task]] = "cancelled"
+
+    if not results:
+        raise last_error if last_error is not None else RuntimeError("No extraction path completed")
+
+    if len(results) == 1:
+        winner = next(iter(results))
+        return {"result": results[winner], "winner": winner, "merged_fields": None,
+                "path_status": status, "path_latency_ms": latency_ms}
+
+    merged, sources = merge_results(results, priority)
+    return {"result": merged, "winner": "merged", "merged_fields": sources,
+            "path_status": status, "path_latency_ms": latency_ms}
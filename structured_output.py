@@ -0,0 +1,207 @@
+"""
+스키마 제약 출력 + 관대한(tolerant) 파서
+
+- BusinessCardInfo 모델에서 JSON schema를 생성하여 chat 호출의 response_format으로 사용
+- 모델이 스키마를 벗어난 출력(코드 블록, 추가 키, 리스트, 잘못된 타입, 후행 쉼표 등)을 내도
+  로컬에서 복구하여 재요청(두 번째 왕복) 없이 처리
+"""
+
+import ast
+import json
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+from extraction import BusinessCardInfo
+
+# 모델이 자주 쓰는 키 이름 -> BusinessCardInfo 필드
+FIELD_ALIASES = {
+    "company": "company", "company_name": "company", "organization": "company",
+    "organisation": "company", "org": "company", "firm": "company", "회사": "company", "회사명": "company",
+    "position": "position", "title": "position", "job_title": "position", "role": "position",
+    "job": "position", "직책": "position", "직위": "position",
+    "name": "name", "full_name": "name", "person": "name", "person_name": "name", "이름": "name", "성명": "name",
+    "phone": "phone", "phone_number": "phone", "mobile": "phone", "mobile_phone": "phone", "tel": "phone",
+    "telephone": "phone", "cell": "phone", "전화": "phone", "전화번호": "phone", "휴대폰": "phone",
+    "email": "email", "e_mail": "email", "email_address": "email", "mail": "email", "이메일": "email",
+}
+NULL_STRINGS = {"", "null", "none", "n/a", "na", "unknown", "not found", "-"}
+# 결과를 한 단계 감싸는 흔한 키 ({"business_card": {...}})
+WRAPPER_KEYS = {"business_card", "businesscard", "card", "data", "result", "info", "business_card_info"}
+
+_CODE_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+_JSON_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+
+class StructuredOutputError(ValueError):
+    """chat 출력에서 BusinessCardInfo를 복구할 수 없음"""
+
+@lru_cache(maxsize=1)
+def business_card_json_schema() -> dict:
+    """BusinessCardInfo에서 strict JSON schema 생성 (모든 필드 required, 추가 키 금지)"""
+    schema = BusinessCardInfo.model_json_schema()
+    properties = {}
+    for field, spec in schema["properties"].items():
+        properties[field] = {
+            "type": ["string", "null"],
+            "description": spec.get("description", field),
+        }
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+def response_format(mode: str) -> dict:
+    """chat 호출용 response_format (mode: json_schema | json_object)"""
+    if mode == "json_schema":
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "business_card_info",
+                "schema": business_card_json_schema(),
+                "strict": True,
+            },
+        }
+    return {"type": "json_object"}
+
+def _normalize_key(key: str) -> str:
+    return re.sub(r"[\s\-]+", "_", key.strip().lower())
+
+def _coerce_value(value: Any) -> Optional[str]:
+    """필드 값을 문자열 또는 None으로 변환"""
+    if isinstance(value, str):
+        text = value.strip()
+        return None if text.lower() in NULL_STRINGS else text
+    if value is None or isinstance(value, (dict, bool)):
+        return None
+    if isinstance(value, list):
+        parts = [_coerce_value(item) for item in value]
+        parts = [part for part in parts if part]
+        return ", ".join(parts) if parts else None
+    text = str(value).strip()
+    return None if text.lower() in NULL_STRINGS else text
+
+def _extract_json_block(text: str) -> Optional[str]:
+    """텍스트에서 첫 번째 균형 잡힌 {...} 또는 [...] 블록 추출"""
+    start = None
+    for i, ch in enumerate(text):
+        if ch in "{[":
+            start = i
+            break
+    if start is None:
+        return None
+    opening = text[start]
+    closing = "}" if opening == "{" else "]"
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch == opening:
+            depth += 1
+        elif ch == closing:
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+def _repair_tokens(text: str) -> str:
+    text = re.sub(r",\s*([}\]])", r"\1", text)  # 후행 쉼표
+    text = re.sub(r"\bNone\b", "null", text)  # Python 리터럴
+    text = re.sub(r"\bTrue\b", "true", text)
+    return re.sub(r"\bFalse\b", "false", text)
+
+def _repair(text: str) -> str:
+    """
+    흔한 JSON 문법 오류 보정 (문자열 값 안의 내용은 바꾸지 않음)
+
+    >>> _repair('{"name": "True Value, }", "phone": None,}')
+    '{"name": "True Value, }", "phone": null}'
+    """
+    text = text.replace("“", '"').replace("”", '"')  # 스마트 따옴표
+    parts = []
+    position = 0
+    for match in _JSON_STRING.finditer(text):
+        parts.append(_repair_tokens(text[position:match.start()]))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(_repair_tokens(text[position:]))
+    return "".join(parts)
+
+def _loads_tolerant(content: str) -> Any:
+    try:
+        return _parse_candidates(content)
+    except (RecursionError, MemoryError):
+        # 깊게 중첩된 출력은 json/ast 파서의 스택과 메모리를 소진시킬 수 있음
+        raise StructuredOutputError("Model output is too deeply nested to parse")
+
+def _parse_candidates(content: str) -> Any:
+    # 빠른 경로: 스키마를 따른 정상 JSON
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+
+    text = content.strip()
+    # 코드 블록 제거 (```json ... ```)
+    fenced = _CODE_FENCE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+
+    block = _extract_json_block(text)
+    candidates = [block] if block else []
+    candidates.append(text)
+    for candidate in candidates:
+        try:
+            return json.loads(_repair(candidate))
+        except json.JSONDecodeError:
+            pass
+        try:
+            # 작은따옴표/None 등 Python 리터럴 형태의 출력
+            return ast.literal_eval(candidate)
+        except (ValueError, SyntaxError):
+            continue
+    raise StructuredOutputError("Could not find a JSON object in model output")
+
+def _select_object(data: Any) -> dict:
+    """리스트/래핑된 객체에서 명함 객체 선택"""
+    if isinstance(data, list):
+        objects = [item for item in data if isinstance(item, dict)]
+        if not objects:
+            raise StructuredOutputError("Model output list contains no objects")
+        data = objects[0]
+    if not isinstance(data, dict):
+        raise StructuredOutputError(f"Model output is {type(data).__name__}, not an object")
+    if len(data) == 1:
+        (key, value), = data.items()
+        if _normalize_key(key) in WRAPPER_KEYS and isinstance(value, (dict, list)):
+            return _select_object(value)
+    return data
+
+def parse_business_card(content: str) -> BusinessCardInfo:
+    """
+    chat 출력 -> BusinessCardInfo
+
+    정상 JSON은 빠른 경로로 처리하고, 스키마를 벗어난 출력은 로컬에서 복구합니다.
+    복구할 수 없으면 StructuredOutputError를 발생시킵니다.
+    """
+    data = _select_object(_loads_tolerant(content))
+
+    fields = {}
+    for key, value in data.items():
+        field = FIELD_ALIASES.get(key) or FIELD_ALIASES.get(_normalize_key(key))
+        if field is None or fields.get(field):
+            continue  # 알 수 없는 키 또는 이미 채워진 필드
+        fields[field] = _coerce_value(value)
+    return BusinessCardInfo(**fields)
@@ -0,0 +1,156 @@
+"""
+테넌트(API 키) 식별 및 테넌트별 쿼터
+
+TENANTS_FILE(JSON)이 설정되면 X-API-Key 헤더로 테넌트를 식별하고,
+설정되지 않으면 모든 요청을 기본 테넌트(default)로 처리합니다 (기존 동작과 동일).
+
+TENANTS_FILE 형식:
+    {"tenants": [
+        {"name": "web", "api_key": "...", "weight": 4, "max_concurrency": 8, "rate_per_minute": 120},
+        {"name": "importer", "api_key": "...", "weight": 1, "max_concurrency": 4, "rate_per_minute": 600,
+         "default_lane": "bulk"}
+    ]}
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from loguru import logger
+from config import get_config
+
+API_KEY_HEADER = "X-API-Key"
+
+class QuotaExceededError(Exception):
+    """테넌트 쿼터 초과 (retry_after: 재시도까지 권장 대기 시간, 초)"""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """분당 요청 수 제한 (토큰 버킷, 버스트 = 분당 한도)"""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self) -> float:
+        """토큰을 하나 사용하고 0을 반환, 부족하면 다음 토큰까지 대기 시간(초) 반환"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def remaining(self) -> int:
+        with self._lock:
+            self._refill(time.monotonic())
+            return int(self.tokens)
+
+class Tenant:
+    """테넌트 설정 및 사용량"""
+
+    def __init__(self, name: str, api_key: Optional[str] = None, weight: float = 1.0,
+                 max_concurrency: int = 4, rate_per_minute: Optional[float] = None,
+                 default_lane: str = "interactive"):
+        if weight <= 0:
+            raise ValueError(f"Tenant {name}: weight must be positive")
+        self.name = name
+        self.api_key = api_key
+        self.weight = float(weight)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.bucket = TokenBucket(rate_per_minute) if rate_per_minute else None
+        self.default_lane = default_lane  # X-Priority 헤더가 없을 때 사용할 스케줄링 레인
+
+        # 사용량 (api_requests.log에 기록)
+        self.requests = 0
+        self.rejected = 0
+        self.upstream_calls = 0
+
+class TenantRegistry:
+    """API 키 -> 테넌트 조회 및 요청 허용(쿼터) 검사"""
+
+    def __init__(self):
+        self.config = get_config()
+        self.tenants: Dict[str, Tenant] = {}
+        self._by_key: Dict[str, Tenant] = {}
+        self.default_tenant = Tenant(
+            "default",
+            weight=1.0,
+            max_concurrency=self.config.UPSTREAM_CONCURRENCY,
+        )
+        if self.config.TENANTS_FILE:
+            self.load(Path(self.config.TENANTS_FILE))
+
+    @property
+    def enabled(self) -> bool:
+        """테넌트 인증 사용 여부 (TENANTS_FILE 설정 시)"""
+        return bool(self._by_key)
+
+    def load(self, path: Path):
+        """TENANTS_FILE에서 테넌트 목록 로드"""
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f).get("tenants", [])
+
+        for entry in entries:
+            tenant = Tenant(
+                name=entry["name"],
+                api_key=entry["api_key"],
+                weight=entry.get("weight", 1.0),
+                max_concurrency=entry.get("max_concurrency", 4),
+                rate_per_minute=entry.get("rate_per_minute"),
+                default_lane=entry.get("default_lane", "interactive"),
+            )
+            self.tenants[tenant.name] = tenant
+            self._by_key[tenant.api_key] = tenant
+        logger.info(f"Loaded {len(self.tenants)} tenants from {path}")
+
+    def authenticate(self, api_key: Optional[str]) -> Optional[Tenant]:
+        """API 키로 테넌트 조회 (테넌트 미설정 시 기본 테넌트, 알 수 없는 키면 None)"""
+        if not self.enabled:
+            return self.default_tenant
+        if not api_key:
+            return None
+        return self._by_key.get(api_key)
+
+    def admit(self, tenant: Tenant):
+        """요청 허용 여부 검사 (분당 요청 수 초과 시 QuotaExceededError)"""
+        if tenant.bucket is not None:
+            wait = tenant.bucket.try_acquire()
+            if wait > 0:
+                tenant.rejected += 1
+                raise QuotaExceededError(f"Rate limit exceeded for tenant {tenant.name}", retry_after=wait)
+        tenant.requests += 1
+
+    def usage(self, tenant: Tenant, scheduler=None) -> dict:
+        """로그 기록용 테넌트 사용량 스냅샷"""
+        usage = {
+            "requests": tenant.requests,
+            "rejected": tenant.rejected,
+            "upstream_calls": tenant.upstream_calls,
+        }
+        if tenant.bucket is not None:
+            usage["rate_remaining"] = tenant.bucket.remaining()
+        if scheduler is not None:
+            usage.update(scheduler.tenant_state(tenant))
+        return usage
+
+# Singleton pattern for tenant registry
+_tenant_registry = None
+
+def get_tenant_registry() -> TenantRegistry:
+    global _tenant_registry
+    if _tenant_registry is None:
+        _tenant_registry = TenantRegistry()
+    return _tenant_registry
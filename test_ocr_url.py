@@ -23,27 +23,12 @@ from urllib.parse import urlparse, parse_qs
 import json
 from typing import Optional, Dict, Any
 
+from url_fetcher import extract_google_drive_id, get_google_drive_download_url
+
 # Configuration
 BASE_URL = "http://localhost:8000"  # Change to 8001 for regex version
 UPLOAD_ENDPOINT = f"{BASE_URL}/ocr/business-card"
-
-def extract_google_drive_id(url: str) -> Optional[str]:
-    """Extract file ID from Google Drive URL."""
-    patterns = [
-        r'/file/d/([a-zA-Z0-9-_]+)',
-        r'id=([a-zA-Z0-9-_]+)',
-        r'/open\?id=([a-zA-Z0-9-_]+)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
-
-def get_google_drive_download_url(file_id: str) -> str:
-    """Convert Google Drive file ID to direct download URL."""
-    return f"https://drive.google.com/uc?export=download&id={file_id}"
+URL_ENDPOINT = f"{BASE_URL}/ocr/business-card/url"  # 서버에서 직접 URL 이미지를 가져옴
 
 def download_file(url: str, timeout: int = 30) -> Optional[bytes]:
     """Download file from URL and return bytes."""
@@ -101,34 +86,7 @@ def test_ocr_api(image_data: bytes, filename: str = "image.jpg") -> Optional[Dic
         print(f"📎 File: {filename} ({content_type})")
         
         response = requests.post(UPLOAD_ENDPOINT, files=files)
-        
-        if response.status_code == 200:
-            print("\n✅ Success! Business card information extracted:")
-            print("-" * 50)
-            
-            data = response.json()
-            
-            # Pretty print the results
-            for field, value in data.items():
-                if value:
-                    print(f"📌 {field.capitalize()}: {value}")
-                else:
-                    print(f"❌ {field.capitalize()}: Not found")
-            
-            print("-" * 50)
-            
-            # Save results to file
-            output_file = f"ocr_result_{Path(filename).stem}.json"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            print(f"\n💾 Results saved to: {output_file}")
-            
-            return data
-            
-        else:
-            print(f"\n❌ Error: {response.status_code}")
-            print(f"Response: {response.text}")
-            return None
+        return handle_response(response, filename)
             
     except requests.exceptions.ConnectionError:
         print("\n❌ Connection Error: Make sure the server is running!")
@@ -138,6 +96,52 @@ def test_ocr_api(image_data: bytes, filename: str = "image.jpg") -> Optional[Dic
         print(f"\n❌ Unexpected error: {str(e)}")
         return None
 
+def handle_response(response: requests.Response, filename: str) -> Optional[Dict[str, Any]]:
+    """Print extracted fields and save them to a file."""
+    if response.status_code == 200:
+        print("\n✅ Success! Business card information extracted:")
+        print("-" * 50)
+        
+        data = response.json()
+        
+        # Pretty print the results
+        for field, value in data.items():
+            if value:
+                print(f"📌 {field.capitalize()}: {value}")
+            else:
+                print(f"❌ {field.capitalize()}: Not found")
+        
+        print("-" * 50)
+        
+        # Save results to file
+        output_file = f"ocr_result_{Path(filename).stem}.json"
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Results saved to: {output_file}")
+        
+        return data
+        
+    else:
+        print(f"\n❌ Error: {response.status_code}")
+        print(f"Response: {response.text}")
+        return None
+
+class URLEndpointUnavailable(Exception):
+    """Server has no URL endpoint (404/405), so the client has to download the image."""
+
+def test_ocr_url_endpoint(url: str) -> Optional[Dict[str, Any]]:
+    """Let the server fetch the image URL itself (no client download/re-upload).
+    
+    Raises URLEndpointUnavailable only if the server has no URL endpoint.
+    Other errors are reported and return None (retrying with an upload would repeat paid OCR calls).
+    """
+    print(f"\n🚀 Sending URL to {URL_ENDPOINT}...")
+    response = requests.post(URL_ENDPOINT, json={"url": url})
+    if response.status_code in (404, 405):
+        raise URLEndpointUnavailable()
+    filename = os.path.basename(urlparse(url).path) or "downloaded_image.jpg"
+    return handle_response(response, filename)
+
 def test_with_local_file(filepath: str) -> Optional[Dict[str, Any]]:
     """Test with a local file."""
     path = Path(filepath)
@@ -237,6 +241,16 @@ def main():
         
         # Check if it's a URL
         if input_source.startswith(('http://', 'https://')):
+            # Server-side fetch first (client download only if the server has no URL endpoint)
+            try:
+                test_ocr_url_endpoint(input_source)
+                return
+            except URLEndpointUnavailable:
+                print("⚠️  Server has no URL endpoint, falling back to client download")
+            except requests.exceptions.RequestException as e:
+                print(f"❌ URL endpoint failed: {str(e)}")
+                return
+            
             # Download from URL
             image_data = download_file(input_source)
             if image_data:
@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 저장소 루트의 모듈(main.py, config.py 등)을 그대로 임포트
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import Config
+
+@pytest.fixture
+def config(tmp_path) -> Config:
+    """tmp_path 아래 logs/, responses/를 쓰는 설정"""
+    config = Config()
+    config.LOG_DIR = tmp_path / "logs"
+    config.RESPONSE_DIR = tmp_path / "responses"
+    config.ensure_directories()
+    return config
@@ -0,0 +1,25 @@
+import pytest
+
+from config import parse_bytes, split_period_name
+
+@pytest.mark.parametrize("value, expected", [
+    ("0", 0),
+    ("", 0),
+    ("1048576", 1048576),
+    ("500MB", 500 * 1024 ** 2),
+    ("2GB", 2 * 1024 ** 3),
+    ("1.5G", int(1.5 * 1024 ** 3)),
+    ("64k", 64 * 1024),
+    (" 1TB ", 1024 ** 4),
+])
+def test_parse_bytes(value, expected):
+    assert parse_bytes(value) == expected
+
+@pytest.mark.parametrize("name, expected", [
+    ("2026-10-19", ("2026-10-19", 0)),
+    ("2026-10-19.2", ("2026-10-19", 2)),
+    ("2026-W42.1", ("2026-W42", 1)),
+    ("2026-10", ("2026-10", 0)),
+])
+def test_split_period_name(name, expected):
+    assert split_period_name(name) == expected
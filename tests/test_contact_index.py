@@ -0,0 +1,45 @@
+import time
+
+from contact_index import ContactIndex, should_index
+from logger import ApplicationLogger
+
+CARD = {"name": "홍길동", "company": "(주)에이크미", "position": "대표", "phone": "010-1234-5678",
+        "email": "gildong@acme.co.kr"}
+OTHER = {"name": "Jane Doe", "company": "Example Inc.", "position": None, "phone": "+1 555 123 4567",
+         "email": None}
+
+def make_index(config) -> ContactIndex:
+    index = ContactIndex()
+    index.config = config
+    index.path = config.RESPONSE_DIR / "contact_index.jsonl"
+    return index
+
+def record(app_logger, index, request_id, data, **log_fields):
+    """main.record_success와 같은 순서로 응답 파일 저장 후 색인"""
+    response_data = {"request_id": request_id, "timestamp": time.time(), "extracted_data": data,
+                     "tenant": "default", **log_fields}
+    app_logger.save_response_file(request_id, response_data)
+    if should_index(response_data):
+        index.add("default", request_id, data)
+
+def snapshot(index):
+    index.prepare()
+    return sorted((c["count"], sorted(c["request_ids"]), sorted(c["keys"])) for c in index.contacts.values())
+
+def test_backfill_matches_incremental_index(config):
+    app_logger = ApplicationLogger()
+    app_logger.config = config
+    live = make_index(config)
+    live.prepare()  # 빈 인덱스 파일 생성 후 처리 시 추가 기록
+
+    record(app_logger, live, "req-1", CARD)
+    record(app_logger, live, "req-2", CARD, coalesced_with="req-1")  # single-flight 합류
+    record(app_logger, live, "req-3", CARD)
+    record(app_logger, live, "req-4", OTHER)
+
+    incremental = snapshot(live)
+    assert [count for count, _, _ in incremental] == [1, 2]
+
+    # 인덱스 파일을 지우고 응답 파일로 다시 만들어도 같은 결과
+    live.path.unlink()
+    assert snapshot(make_index(config)) == incremental
@@ -0,0 +1,133 @@
+import os
+import time
+
+import file_rotator
+from config import ACTIVE_PERIOD_FILE
+from file_rotator import FileRotator
+from logger import ApplicationLogger
+
+def make_rotator(config) -> FileRotator:
+    rotator = FileRotator()
+    rotator.config = config
+    return rotator
+
+def write_files(directory, count: int, size: int, age: float = 0):
+    directory.mkdir(parents=True, exist_ok=True)
+    mtime = time.time() - age
+    for i in range(count):
+        path = directory / f"response_{i}.json"
+        path.write_bytes(b"x" * size)
+        os.utime(path, (mtime, mtime))
+
+def test_current_period_over_budget_is_split_and_archived(config, monkeypatch):
+    config.RESPONSE_DIR_MAX_BYTES = 10_000
+    rotator = make_rotator(config)
+    app_logger = ApplicationLogger()
+    app_logger.config = config
+    current = config.current_period_name()
+    write_files(config.RESPONSE_DIR / current, count=30, size=1000)
+
+    # 1차 확인: 닫힌 기간이 없으므로 현재 기간을 새 하위 구간으로 나눔
+    rotator.enforce_disk_budget()
+    assert rotator.periods_split == 1
+    assert (config.RESPONSE_DIR / ACTIVE_PERIOD_FILE).read_text() == f"{current}.1"
+    assert app_logger._get_response_directory() == config.RESPONSE_DIR / f"{current}.1"
+    assert rotator.usage["responses"]["live_bytes"] > 10_000
+
+    # 2차 확인: 닫힌 부분(유예 시간 경과)을 아카이브하여 예산 안으로
+    monkeypatch.setattr(file_rotator, "CLOSED_GRACE_SECONDS", 0)
+    rotator.enforce_disk_budget()
+    assert not (config.RESPONSE_DIR / current).exists()
+    assert rotator.usage["responses"]["live_bytes"] <= 10_000
+    assert rotator.early_archived == 1
+    assert list((config.RESPONSE_DIR / "archive").glob(f"{current}_*.zip"))
+
+    # 새 구간이 다시 넘치면 다음 번호로
+    write_files(config.RESPONSE_DIR / f"{current}.1", count=30, size=1000)
+    rotator.enforce_disk_budget()
+    assert (config.RESPONSE_DIR / ACTIVE_PERIOD_FILE).read_text() == f"{current}.2"
+
+def test_log_sinks_follow_split_period(config):
+    config.LOG_DIR_MAX_BYTES = 1000
+    rotator = make_rotator(config)
+    app_logger = ApplicationLogger()
+    app_logger.config = config
+    current = config.current_period_name()
+    write_files(config.LOG_DIR / current, count=3, size=1000)
+
+    rotator.enforce_disk_budget()
+    assert app_logger._get_period_directory() == config.LOG_DIR / f"{current}.1"
+
+def test_stale_split_marker_is_ignored_in_next_period(config):
+    (config.RESPONSE_DIR / ACTIVE_PERIOD_FILE).write_text("2001-01-01.3")
+    assert config.active_period_name(config.RESPONSE_DIR) == config.current_period_name()
+
+def test_closed_period_size_is_cached(config, monkeypatch):
+    config.RESPONSE_DIR_MAX_BYTES = 1_000_000
+    rotator = make_rotator(config)
+    closed = config.RESPONSE_DIR / "2001-01-01"
+    write_files(closed, count=3, size=100, age=file_rotator.SETTLE_SECONDS + 60)
+    active = config.RESPONSE_DIR / config.current_period_name()
+    write_files(active, count=2, size=100, age=file_rotator.SETTLE_SECONDS + 60)
+    (active / "response_refs.jsonl").write_bytes(b"y" * 50)
+
+    rotator.enforce_disk_budget()
+    assert rotator._sizes[str(closed)] == 300
+    assert str(active / "response_0.json") in rotator._sizes
+    assert str(active / "response_refs.jsonl") not in rotator._sizes  # 계속 추가 기록되는 파일
+
+    # 두 번째 확인은 닫힌 디렉토리를 다시 순회하지 않음
+    def fail_walk(*args, **kwargs):
+        raise AssertionError("closed period was walked again")
+    monkeypatch.setattr(file_rotator.os, "walk", fail_walk)
+    (active / "response_refs.jsonl").write_bytes(b"y" * 80)
+    rotator.enforce_disk_budget()
+    assert rotator.usage["responses"]["live_bytes"] == 300 + 200 + 80
+
+def test_early_archive_takes_oldest_period_first(config):
+    config.RESPONSE_DIR_MAX_BYTES = 9000
+    rotator = make_rotator(config)
+    for name in ("2001-01-03", "2001-01-01", "2001-01-02"):
+        write_files(config.RESPONSE_DIR / name, count=4, size=1000, age=60)
+
+    rotator.enforce_disk_budget()
+    assert not (config.RESPONSE_DIR / "2001-01-01").exists()
+    assert (config.RESPONSE_DIR / "2001-01-02").exists()
+    assert (config.RESPONSE_DIR / "2001-01-03").exists()
+    assert rotator.early_archived == 1
+    assert rotator.usage["responses"]["live_bytes"] == 8000
+
+def test_recently_modified_period_is_not_archived(config):
+    config.RESPONSE_DIR_MAX_BYTES = 1000
+    rotator = make_rotator(config)
+    write_files(config.RESPONSE_DIR / "2001-01-01", count=4, size=1000)
+
+    rotator.enforce_disk_budget()
+    assert (config.RESPONSE_DIR / "2001-01-01").exists()
+    assert rotator.early_archived == 0
+
+def test_archive_budget_prunes_oldest_zip(config):
+    config.LOG_ARCHIVE_MAX_BYTES = 2500
+    rotator = make_rotator(config)
+    archive_dir = config.LOG_DIR / "archive"
+    now = time.time()
+    for i, name in enumerate(("old.zip", "middle.zip", "new.zip")):
+        path = archive_dir / name
+        path.write_bytes(b"z" * 1000)
+        os.utime(path, (now - 300 + i * 100, now - 300 + i * 100))
+
+    rotator.enforce_disk_budget()
+    assert sorted(p.name for p in archive_dir.iterdir()) == ["middle.zip", "new.zip"]
+    assert rotator.archives_pruned == 1
+    assert rotator.usage["logs"]["archive_bytes"] == 2000
+
+def test_idempotency_directory_counts_but_is_not_archived(config):
+    config.RESPONSE_DIR_MAX_BYTES = 1000
+    rotator = make_rotator(config)
+    write_files(config.RESPONSE_DIR / "idempotency", count=3, size=1000, age=3600)
+
+    rotator.enforce_disk_budget()
+    assert len(list((config.RESPONSE_DIR / "idempotency").iterdir())) == 3
+    assert not list((config.RESPONSE_DIR / "archive").iterdir())
+    assert rotator.usage["responses"]["live_bytes"] == 3000
+    assert rotator.periods_split == 0
@@ -0,0 +1,101 @@
+"""OCRRouter.recognize: 라우팅, 저신뢰도 재처리, Mistral 장애 시 로컬 대체"""
+import asyncio
+
+import pytest
+
+import ocr_backends
+from ocr_backends import AUTO, LOCAL, MISTRAL, ImageStats, OCRResult, OCRRouter
+
+DOCUMENT = {"type": "image_url", "image_url": "data:image/png;base64,"}
+
+
+class UpstreamError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"upstream returned {status_code}")
+        self.status_code = status_code
+
+
+class FakeMistral:
+    name = MISTRAL
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.calls = 0
+
+    async def recognize(self, document: dict) -> OCRResult:
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return OCRResult("mistral text", self.name)
+
+
+class FakeLocal:
+    name = LOCAL
+    available = True
+    saturated = False
+
+    def __init__(self, confidence: float = 0.95):
+        self.confidence = confidence
+        self.calls = 0
+
+    async def recognize(self, content: bytes) -> OCRResult:
+        self.calls += 1
+        return OCRResult("local text", self.name, self.confidence)
+
+
+def make_router(config, mode: str, mistral: FakeMistral, local: FakeLocal, fallback: bool = True) -> OCRRouter:
+    router = OCRRouter()
+    config.OCR_FALLBACK_LOCAL = fallback
+    router.config = config
+    router.mode = mode
+    router.mistral = mistral
+    router.local = local
+    return router
+
+
+def test_falls_back_to_local_when_mistral_unavailable(config):
+    router = make_router(config, MISTRAL, FakeMistral(UpstreamError(503)), FakeLocal())
+
+    result = asyncio.run(router.recognize(b"image", DOCUMENT))
+
+    assert result.backend == LOCAL
+    assert router.counts["fallback"] == 1
+    assert router.counts[LOCAL] == 1
+
+
+def test_no_fallback_when_disabled(config):
+    router = make_router(config, MISTRAL, FakeMistral(UpstreamError(503)), FakeLocal(), fallback=False)
+
+    with pytest.raises(UpstreamError):
+        asyncio.run(router.recognize(b"image", DOCUMENT))
+    assert router.local.calls == 0
+
+
+def test_no_fallback_for_client_errors(config):
+    router = make_router(config, MISTRAL, FakeMistral(UpstreamError(400)), FakeLocal())
+
+    with pytest.raises(UpstreamError):
+        asyncio.run(router.recognize(b"image", DOCUMENT))
+    assert router.local.calls == 0
+
+
+@pytest.mark.parametrize("confidence, backend", [(0.95, LOCAL), (0.3, MISTRAL)])
+def test_auto_routes_easy_images_locally(config, monkeypatch, confidence, backend):
+    monkeypatch.setattr(ocr_backends, "image_stats", lambda content: ImageStats(pixels=500_000, contrast=90))
+    router = make_router(config, AUTO, FakeMistral(), FakeLocal(confidence))
+
+    result = asyncio.run(router.recognize(b"image", DOCUMENT))
+
+    assert result.backend == backend
+    assert router.local.calls == 1
+    assert router.mistral.calls == (backend == MISTRAL)
+
+
+def test_auto_sends_large_images_to_mistral(config, monkeypatch):
+    monkeypatch.setattr(ocr_backends, "image_stats", lambda content: ImageStats(pixels=12_000_000, contrast=90))
+    router = make_router(config, AUTO, FakeMistral(), FakeLocal())
+
+    result = asyncio.run(router.recognize(b"image", DOCUMENT))
+
+    assert result.backend == MISTRAL
+    assert router.local.calls == 0
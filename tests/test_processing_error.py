@@ -0,0 +1,52 @@
+"""processing_error: 요청 거절은 트레이스백 없이 응답 로그 한 줄로 기록"""
+import pytest
+
+import main
+from tenants import QuotaExceededError
+from timing import StageTimer
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = {"error": [], "response": []}
+    monkeypatch.setattr(main.app_logger, "log_error", lambda **kw: calls["error"].append(kw))
+    monkeypatch.setattr(main.app_logger, "log_app_response", lambda **kw: calls["response"].append(kw))
+    return calls
+
+
+def test_quota_rejection_is_logged_without_traceback(calls):
+    exc = main.processing_error("req-1", StageTimer(), QuotaExceededError("rate limit", retry_after=2.4))
+
+    assert exc.status_code == 429
+    assert exc.headers["Retry-After"] == "2"
+    assert calls["error"] == []
+    assert len(calls["response"]) == 1
+    assert calls["response"][0]["response_status"] == "rejected"
+    assert "traceback" not in calls["response"][0]
+
+
+def test_unexpected_error_keeps_traceback(calls):
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError as e:
+        exc = main.processing_error("req-2", StageTimer(), e)
+
+    assert exc.status_code == 500
+    assert calls["response"] == []
+    assert "RuntimeError: boom" in calls["error"][0]["traceback"]
+
+
+def test_url_fetch_client_error_is_rejection(calls):
+    exc = main.processing_error("req-3", StageTimer(), main.URLFetchError("not an image", status_code=415))
+
+    assert exc.status_code == 415
+    assert calls["error"] == []
+    assert calls["response"][0]["response_status"] == "rejected"
+
+
+def test_url_fetch_upstream_error_keeps_traceback(calls):
+    exc = main.processing_error("req-4", StageTimer(), main.URLFetchError("upstream down", status_code=502))
+
+    assert exc.status_code == 502
+    assert calls["response"] == []
+    assert len(calls["error"]) == 1
@@ -0,0 +1,24 @@
+import pytest
+
+from prompt_compaction import estimate_tokens, truncate_to_budget
+
+@pytest.mark.parametrize("text", [
+    "A" * 400,
+    "가" * 100,
+    "홍길동 Hong Gildong 대표이사 CEO " * 20,
+    "첫 줄\n" + "나" * 200,
+    "\n".join(f"{i}번째 줄 line {i}" for i in range(100)),
+])
+@pytest.mark.parametrize("budget", [9, 20, 64])
+def test_truncated_text_fits_budget(text, budget):
+    result, truncated = truncate_to_budget(text, budget)
+    assert truncated
+    assert estimate_tokens(result) <= budget
+
+def test_first_line_keeps_as_much_as_budget_allows():
+    assert truncate_to_budget("가" * 100, 20)[0] == "가" * 20
+    assert truncate_to_budget("A" * 400, 20)[0] == "A" * 80
+
+def test_text_within_budget_is_unchanged():
+    text = "Acme Corp\n홍길동\n010-1234-5678"
+    assert truncate_to_budget(text, 1024) == (text, False)
@@ -0,0 +1,34 @@
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+class StageTimer:
+    """요청 단위 단계별 처리 시간 측정 (monotonic clock 사용)"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """with 블록 구간의 소요 시간을 해당 단계에 누적"""
+        stage_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - stage_start) * 1000
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+    def total_ms(self) -> float:
+        """요청 시작부터 현재까지의 경과 시간 (ms)"""
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def as_dict(self) -> Dict[str, float]:
+        """로그/응답 파일 기록용 단계별 시간 (ms, 소수점 2자리)"""
+        return {name: round(duration, 2) for name, duration in self.stages.items()}
+
+    def server_timing_header(self) -> str:
+        """Server-Timing 헤더 값 생성 (예: "ocr;dur=812.31, chat;dur=1033.02, total;dur=1901.77")"""
+        entries = [f"{name};dur={duration:.2f}" for name, duration in self.stages.items()]
+        entries.append(f"total;dur={self.total_ms():.2f}")
+        return ", ".join(entries)
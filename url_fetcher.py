@@ -0,0 +1,210 @@
+import asyncio
+import ipaddress
+import os
+import re
+import socket
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from loguru import logger
+from config import get_config
+
+MAX_REDIRECTS = 5
+
+class URLFetchError(Exception):
+    """URL 이미지 가져오기 실패 (status_code는 클라이언트에 반환할 HTTP 상태)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def extract_google_drive_id(url: str) -> Optional[str]:
+    """Extract file ID from Google Drive URL."""
+    patterns = [
+        r'/file/d/([a-zA-Z0-9-_]+)',
+        r'id=([a-zA-Z0-9-_]+)',
+        r'/open\?id=([a-zA-Z0-9-_]+)'
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+    return None
+
+def get_google_drive_download_url(file_id: str) -> str:
+    """Convert Google Drive file ID to direct download URL."""
+    return f"https://drive.google.com/uc?export=download&id={file_id}"
+
+def is_google_drive_url(url: str) -> bool:
+    return 'drive.google.com' in url
+
+def resolve_download_url(url: str) -> str:
+    """URL 검증 및 Google Drive 링크를 직접 다운로드 URL로 변환"""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        raise URLFetchError("Only http(s) URLs are supported")
+
+    if is_google_drive_url(url):
+        file_id = extract_google_drive_id(url)
+        if not file_id:
+            raise URLFetchError("Could not extract Google Drive file ID")
+        return get_google_drive_download_url(file_id)
+    return url
+
+def is_public_address(address: str) -> bool:
+    """
+    공인 인터넷 주소인지 확인 (loopback, RFC1918 사설망, link-local(169.254.169.254 메타데이터 포함),
+    CGNAT, 멀티캐스트, 예약 대역은 False)
+
+    >>> [is_public_address(a) for a in ("8.8.8.8", "127.0.0.1", "10.0.0.5", "169.254.169.254", "::ffff:192.168.0.1")]
+    [True, False, False, False, False]
+    """
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+async def resolve_public_host(host: str, port: int) -> List[str]:
+    """호스트의 모든 주소를 조회하여 하나라도 비공개 주소면 거부 (SSRF 방지)"""
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        raise URLFetchError(f"Could not resolve host: {host}")
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    if not addresses:
+        raise URLFetchError(f"Could not resolve host: {host}")
+    for address in addresses:
+        if not is_public_address(address):
+            raise URLFetchError(f"URL host resolves to a non-public address: {host}", status_code=403)
+    return addresses
+
+def filename_from_url(url: str) -> str:
+    return os.path.basename(urlparse(url).path) or "downloaded_image.jpg"
+
+class URLFetcher:
+    """커넥션 풀을 재사용하는 비동기 이미지 다운로더 (크기 제한/타임아웃 적용)"""
+
+    def __init__(self):
+        self.config = get_config()
+        self.client = None  # httpx.AsyncClient (start() 시 생성)
+
+    async def start(self):
+        """HTTP 클라이언트 생성 (lifespan 시작 시)"""
+        if self.client is None:
+            import httpx
+            self.client = httpx.AsyncClient(
+                timeout=self.config.URL_FETCH_TIMEOUT,
+                follow_redirects=False,  # 리다이렉트마다 대상 주소를 검사하기 위해 직접 처리
+                limits=httpx.Limits(max_connections=self.config.URL_FETCH_MAX_CONNECTIONS)
+            )
+            logger.info("URL fetcher client started")
+
+    async def close(self):
+        """HTTP 클라이언트 종료 (lifespan 종료 시)"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            logger.info("URL fetcher client closed")
+
+    async def fetch(self, url: str) -> Tuple[bytes, str]:
+        """이미지를 스트리밍으로 다운로드하여 (bytes, content_type) 반환"""
+        import httpx
+        
+        await self.start()
+        download_url = resolve_download_url(url)
+        max_bytes = self.config.URL_FETCH_MAX_BYTES
+
+        try:
+            async with self._open(download_url) as response:
+                if response.status_code >= 400:
+                    raise URLFetchError(f"Upstream returned {response.status_code}", status_code=502)
+
+                declared_size = response.headers.get("content-length")
+                if declared_size and declared_size.isdigit() and int(declared_size) > max_bytes:
+                    raise URLFetchError(f"Image exceeds {max_bytes} bytes", status_code=413)
+
+                content_type = response.headers.get("content-type", "").split(";")[0].strip()
+                if not content_type.startswith("image/"):
+                    # Drive 등은 application/octet-stream을 반환하므로 확장자로 추정
+                    content_type = self._guess_content_type(url, content_type)
+
+                chunks = []
+                received = 0
+                async for chunk in response.aiter_bytes():
+                    received += len(chunk)
+                    if received > max_bytes:
+                        raise URLFetchError(f"Image exceeds {max_bytes} bytes", status_code=413)
+                    chunks.append(chunk)
+        except httpx.TimeoutException:
+            raise URLFetchError("Timed out fetching image URL", status_code=504)
+        except httpx.HTTPError as e:
+            raise URLFetchError(f"Failed to fetch image URL: {str(e)}", status_code=502)
+
+        return b"".join(chunks), content_type
+
+    @asynccontextmanager
+    async def _open(self, url: str):
+        """리다이렉트를 직접 따라가며 매 단계 공인 주소인지 확인한 응답 스트림"""
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await self.client.send(await self._build_request(url), stream=True)
+            location = response.headers.get("location")
+            if not (response.is_redirect and location):
+                break
+            await response.aclose()
+            url = urljoin(url, location)
+            if urlparse(url).scheme not in ("http", "https"):
+                raise URLFetchError("Redirect to a non-http(s) URL", status_code=502)
+        else:
+            raise URLFetchError(f"Too many redirects (> {MAX_REDIRECTS})", status_code=502)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+    async def _build_request(self, url: str):
+        """
+        확인한 IP로 직접 연결하는 요청 (조회와 연결 사이 DNS 응답이 바뀌는 rebinding 방지)
+
+        Host 헤더와 TLS SNI/인증서 검증은 원래 호스트 이름을 사용합니다.
+        """
+        parsed = urlparse(url)
+        host = parsed.hostname
+        if not host:
+            raise URLFetchError("URL has no host")
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        if self.config.URL_FETCH_ALLOW_PRIVATE:
+            return self.client.build_request("GET", url)
+        address = (await resolve_public_host(host, port))[0]
+        ip_host = f"[{address}]" if ":" in address else address
+        pinned = parsed._replace(netloc=f"{ip_host}:{port}").geturl()
+        return self.client.build_request(
+            "GET", pinned, headers={"Host": parsed.netloc.rsplit("@", 1)[-1]}, extensions={"sni_hostname": host}
+        )
+
+    def _guess_content_type(self, url: str, content_type: str) -> str:
+        ext_types = {
+            '.jpg': 'image/jpeg',
+            '.jpeg': 'image/jpeg',
+            '.png': 'image/png',
+            '.gif': 'image/gif',
+            '.bmp': 'image/bmp',
+            '.webp': 'image/webp'
+        }
+        ext = Path(urlparse(url).path).suffix.lower()
+        if ext in ext_types:
+            return ext_types[ext]
+        if content_type in ("application/octet-stream", "binary/octet-stream", ""):
+            return "image/jpeg"
+        raise URLFetchError(f"URL did not return an image (Content-Type: {content_type})", status_code=415)
+
+# Singleton pattern for URL fetcher
+_url_fetcher = None
+
+def get_url_fetcher() -> URLFetcher:
+    global _url_fetcher
+    if _url_fetcher is None:
+        _url_fetcher = URLFetcher()
+    return _url_fetcher